@@ -0,0 +1,27 @@
+-- 0002_audit_chain_head.sql
+-- Purpose: keep the audit hash-chain head in a dedicated row so appends are linearizable.
+-- Every append updates this row (taking its row lock) and inserts into audit_log in the same
+-- statement; concurrent writers queue on the row lock instead of reading a stale head.
+
+create table if not exists audit_chain_head (
+  shard integer primary key,
+  last_id bigint,
+  prev_hash text not null,
+  entry_hash text not null,
+  updated_at timestamptz not null default now()
+);
+
+comment on table audit_chain_head is
+'Current head of the audit_log hash chain (shard 0). entry_hash is the hash the next entry chains from; "GENESIS" when the log is empty.';
+
+-- Seed from the newest existing entry so the chain continues where the old code left it.
+insert into audit_chain_head (shard, last_id, prev_hash, entry_hash)
+select 0, h.id, h.prev_hash, h.entry_hash
+from (
+  select id, prev_hash, entry_hash from audit_log order by id desc limit 1
+) h
+on conflict (shard) do nothing;
+
+insert into audit_chain_head (shard, last_id, prev_hash, entry_hash)
+values (0, null, 'GENESIS', 'GENESIS')
+on conflict (shard) do nothing;
@@ -0,0 +1,18 @@
+-- 0003_audit_events_keyset_indexes.sql
+-- Purpose: indexes for keyset-paginated, filtered /events queries.
+-- /events orders by id desc and pages with "id < cursor", so each equality filter needs an
+-- index whose trailing column is id: the query becomes one backward range scan that stops
+-- after LIMIT rows, whatever the page depth.
+-- Runs inside the migration transaction, so builds are not CONCURRENTLY; on a large live
+-- table, pre-create these with CREATE INDEX CONCURRENTLY under the same names first.
+
+create index if not exists idx_audit_subject_id on audit_log (subject, id);
+create index if not exists idx_audit_event_type_id on audit_log (event_type, id);
+create index if not exists idx_audit_request_id_id on audit_log (request_id, id)
+  where request_id is not null;
+-- Denials are the rare, interesting case; allowed events are served by the primary key.
+create index if not exists idx_audit_denied_id on audit_log (id) where not decision;
+
+-- Superseded by the composites above (same leading column), and each one costs every append.
+drop index if exists idx_audit_subject;
+drop index if exists idx_audit_request_id;
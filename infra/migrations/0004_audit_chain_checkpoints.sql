@@ -0,0 +1,18 @@
+-- 0004_audit_chain_checkpoints.sql
+-- Purpose: record verified prefixes of the audit hash chain so verification can resume.
+-- A row means every audit_log entry with id <= last_id was re-hashed and linked correctly,
+-- ending in entry_hash. The verifier resumes from the newest checkpoint whose row is unchanged.
+
+create table if not exists audit_chain_checkpoints (
+  id bigserial primary key,
+  last_id bigint not null,
+  entry_hash text not null,
+  rows_verified bigint not null,
+  verified_at timestamptz not null default now()
+);
+
+create index if not exists idx_audit_chain_checkpoints_last_id
+  on audit_chain_checkpoints (last_id desc);
+
+comment on table audit_chain_checkpoints is
+'Verified audit_log chain prefixes (id <= last_id ends in entry_hash). Written by the chain verifier.';
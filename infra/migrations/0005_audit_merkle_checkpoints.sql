@@ -0,0 +1,38 @@
+-- 0005_audit_merkle_checkpoints.sql
+-- Purpose: Merkle checkpoints over audit_log for O(log n) inclusion proofs.
+-- audit_merkle_blocks: consecutive runs of audit_log rows (in id order) with the Merkle root of
+--   their entry hashes. Blocks are sealed only when full and never change afterwards.
+-- audit_merkle_checkpoints: Merkle root over the first block_count block roots.
+
+create table if not exists audit_merkle_blocks (
+  block_no bigint primary key,
+  first_id bigint not null,
+  last_id bigint not null unique,
+  size integer not null,
+  root text not null,
+  created_at timestamptz not null default now()
+);
+
+create table if not exists audit_merkle_checkpoints (
+  id bigserial primary key,
+  block_count bigint not null unique,
+  last_id bigint not null,
+  root text not null,
+  created_at timestamptz not null default now()
+);
+
+comment on table audit_merkle_blocks is
+'Sealed blocks of audit_log entries: root = RFC 6962-style Merkle root over sha256(0x00 || entry_hash).';
+comment on table audit_merkle_checkpoints is
+'Merkle root over audit_merkle_blocks roots 0..block_count-1; proofs are issued against the newest row.';
+
+-- Both tables are append-only, like audit_log itself.
+drop trigger if exists trg_audit_merkle_blocks_no_update on audit_merkle_blocks;
+create trigger trg_audit_merkle_blocks_no_update
+  before update or delete on audit_merkle_blocks
+  for each row execute function prevent_audit_update_delete();
+
+drop trigger if exists trg_audit_merkle_checkpoints_no_update on audit_merkle_checkpoints;
+create trigger trg_audit_merkle_checkpoints_no_update
+  before update or delete on audit_merkle_checkpoints
+  for each row execute function prevent_audit_update_delete();
@@ -0,0 +1,32 @@
+-- 0006_audit_chain_shards.sql
+-- Purpose: optional sharded hash chains (AUDIT_CHAIN_SHARDS > 1).
+-- Each audit_log row records the shard whose chain it belongs to; every shard has its own
+-- audit_chain_head row (the service creates heads 1..N-1 at startup, chaining from
+-- "GENESIS:<n>"), so appends to different shards no longer serialize on one row lock.
+-- Existing rows and the existing head are shard 0, whose chain is unchanged.
+
+alter table audit_log add column if not exists shard integer not null default 0;
+comment on column audit_log.shard is 'Hash-chain shard; prev_hash links to the previous entry of the same shard.';
+create index if not exists idx_audit_shard_id on audit_log (shard, id);
+
+alter table audit_chain_checkpoints add column if not exists shard integer not null default 0;
+create index if not exists idx_audit_chain_checkpoints_shard_last_id
+  on audit_chain_checkpoints (shard, last_id desc);
+drop index if exists idx_audit_chain_checkpoints_last_id;
+
+-- Combined roots: one hash over a consistent cut of every shard head, recorded periodically.
+create table if not exists audit_chain_roots (
+  id bigserial primary key,
+  heads jsonb not null,
+  watermark bigint not null,
+  root text not null,
+  created_at timestamptz not null default now()
+);
+
+comment on table audit_chain_roots is
+'root = sha256(canonical_json([[shard, last_id, entry_hash], ...])) over all shard heads at one cut; watermark = highest id below which every row was committed.';
+
+drop trigger if exists trg_audit_chain_roots_no_update on audit_chain_roots;
+create trigger trg_audit_chain_roots_no_update
+  before update or delete on audit_chain_roots
+  for each row execute function prevent_audit_update_delete();
@@ -0,0 +1,117 @@
+-- 0007_partition_audit_log.sql
+-- Purpose: turn audit_log into a table range-partitioned by month on created_at.
+--
+-- The existing heap is not rewritten. It is renamed to audit_log_legacy and attached as the
+-- first partition, covering everything before the start of next month (UTC); monthly
+-- partitions follow. Its indexes are renamed and adopted by the parent's equivalent indexes,
+-- so the only builds on existing data are the (id, created_at) primary key the partitioned
+-- table requires and the partition-bound check performed by ATTACH (a sequential scan).
+-- On very large tables, pre-build that index CONCURRENTLY as audit_log_legacy_pkey_idx first
+-- and run this migration in a quiet period: it holds an exclusive lock on audit_log.
+--
+-- Hash chain: ids keep coming from audit_log_id_seq (now owned by the parent) and rows keep
+-- every column, so prev_hash/entry_hash and the chain heads are unaffected. Global uniqueness
+-- of entry_hash cannot be declared on a partitioned table (unique keys must include
+-- created_at); the legacy partition keeps its constraint and chain verification covers the rest.
+-- Append-only: the trigger moves to the parent and is cloned onto every partition.
+
+do $$
+declare
+  bound timestamptz := (date_trunc('month', now() at time zone 'UTC') + interval '1 month')
+                       at time zone 'UTC';
+begin
+  if exists (select 1 from pg_partitioned_table where partrelid = 'audit_log'::regclass) then
+    return;
+  end if;
+
+  alter table audit_log rename to audit_log_legacy;
+  drop trigger if exists trg_audit_no_update on audit_log_legacy;
+  alter table audit_log_legacy alter column id drop default;
+  alter sequence audit_log_id_seq owned by none;
+
+  alter index if exists idx_audit_created_at rename to idx_audit_legacy_created_at;
+  alter index if exists idx_audit_subject_id rename to idx_audit_legacy_subject_id;
+  alter index if exists idx_audit_event_type_id rename to idx_audit_legacy_event_type_id;
+  alter index if exists idx_audit_request_id_id rename to idx_audit_legacy_request_id_id;
+  alter index if exists idx_audit_denied_id rename to idx_audit_legacy_denied_id;
+  alter index if exists idx_audit_shard_id rename to idx_audit_legacy_shard_id;
+
+  -- A partition's primary key must match the parent's, which has to include created_at.
+  alter table audit_log_legacy drop constraint if exists audit_log_pkey;
+  if to_regclass('audit_log_legacy_pkey_idx') is null then
+    create unique index audit_log_legacy_pkey_idx on audit_log_legacy (id, created_at);
+  end if;
+  alter table audit_log_legacy
+    add constraint audit_log_legacy_pkey primary key using index audit_log_legacy_pkey_idx;
+
+  create table audit_log (
+    id bigint not null default nextval('audit_log_id_seq'),
+    event_type text not null,
+    subject text not null,
+    decision boolean not null,
+    details jsonb not null default '{}'::jsonb,
+    prev_hash text not null,
+    entry_hash text not null,
+    created_at timestamptz not null default now(),
+    request_id text,
+    shard integer not null default 0,
+    primary key (id, created_at)
+  ) partition by range (created_at);
+  alter sequence audit_log_id_seq owned by audit_log.id;
+
+  create index idx_audit_created_at on audit_log (created_at desc);
+  create index idx_audit_subject_id on audit_log (subject, id);
+  create index idx_audit_event_type_id on audit_log (event_type, id);
+  create index idx_audit_request_id_id on audit_log (request_id, id) where request_id is not null;
+  create index idx_audit_denied_id on audit_log (id) where not decision;
+  create index idx_audit_shard_id on audit_log (shard, id);
+
+  execute format(
+    'alter table audit_log attach partition audit_log_legacy for values from (minvalue) to (%L)',
+    bound
+  );
+
+  create trigger trg_audit_no_update
+    before update or delete on audit_log
+    for each row execute function prevent_audit_update_delete();
+end $$;
+
+comment on table audit_log is
+'Append-only audit log, range-partitioned by month on created_at (UTC). entry_hash = sha256(prev_hash || "|" || canonical_json({event_type, subject, decision, details})); prev_hash links to the previous entry of the same shard.';
+
+-- Creates the monthly partitions for the current month and the next `months_ahead` months
+-- (UTC) that do not exist yet; returns how many were created. Safe to call repeatedly and
+-- concurrently. Called by scripts/migrate.py and periodically by mcp-audit.
+create or replace function audit_log_ensure_partitions(months_ahead integer default 3)
+returns integer
+language plpgsql
+as $$
+declare
+  first_month timestamp := date_trunc('month', now() at time zone 'UTC');
+  month_start timestamp;
+  part_name text;
+  created integer := 0;
+begin
+  perform pg_advisory_xact_lock(hashtext('audit_log_ensure_partitions'));
+  for i in 0..months_ahead loop
+    month_start := first_month + make_interval(months => i);
+    part_name := format('audit_log_%s', to_char(month_start, 'YYYY_MM'));
+    continue when to_regclass(part_name) is not null;
+    begin
+      execute format(
+        'create table %I partition of audit_log for values from (%L) to (%L)',
+        part_name,
+        month_start at time zone 'UTC',
+        (month_start + interval '1 month') at time zone 'UTC'
+      );
+      created := created + 1;
+    exception when invalid_object_definition then
+      -- Range already covered, i.e. by audit_log_legacy (it ends at the month after migration).
+      null;
+    end;
+  end loop;
+  return created;
+end;
+$$;
+
+select audit_log_ensure_partitions(3);
@@ -0,0 +1,49 @@
+-- 0008_audit_rollup_hourly.sql
+-- Purpose: hourly allowed/denied counts per event_type, maintained incrementally on append.
+--
+-- A statement-level trigger with a transition table folds every INSERT or COPY into
+-- audit_log (/log, /log/batch, group commit) into one upsert per (hour, event_type, shard)
+-- touched by the statement, in the same transaction, so the rollup commits or rolls back
+-- with the events. Keying by shard keeps appends to different chain shards off each
+-- other's rollup rows. Buckets are UTC hours.
+-- Rows appended before this migration are not counted: run scripts/backfill_audit_rollups.py,
+-- which recomputes settled hours from audit_log and is safe to re-run.
+
+create table if not exists audit_rollup_hourly (
+  bucket timestamptz not null,
+  event_type text not null,
+  shard integer not null default 0,
+  allowed bigint not null default 0,
+  denied bigint not null default 0,
+  primary key (bucket, event_type, shard)
+);
+
+comment on table audit_rollup_hourly is
+'Per UTC hour, event_type and chain shard: number of audit_log events with decision true (allowed) and false (denied).';
+
+create or replace function audit_rollup_hourly_apply()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into audit_rollup_hourly as r (bucket, event_type, shard, allowed, denied)
+  select date_trunc('hour', created_at, 'UTC'),
+         event_type,
+         shard,
+         count(*) filter (where decision),
+         count(*) filter (where not decision)
+  from new_rows
+  group by 1, 2, 3
+  order by 1, 2, 3
+  on conflict (bucket, event_type, shard) do update
+    set allowed = r.allowed + excluded.allowed,
+        denied = r.denied + excluded.denied;
+  return null;
+end;
+$$;
+
+drop trigger if exists trg_audit_rollup_hourly on audit_log;
+create trigger trg_audit_rollup_hourly
+  after insert on audit_log
+  referencing new table as new_rows
+  for each statement execute function audit_rollup_hourly_apply();
@@ -0,0 +1,43 @@
+-- 0009_audit_archive_segments.sql
+-- Purpose: catalog of audit_log rows moved to cold-tier segment files.
+--
+-- scripts/archive_audit_log.py copies sealed, consecutive runs of Merkle blocks older than the
+-- retention window into compressed NDJSON segment files (one zstd frame per block) with a
+-- fixed-width offset index, and records each segment here. Once every row of a monthly
+-- partition is in a segment, the partition is detached and dropped; row-level DELETE stays
+-- forbidden. Segments cover consecutive id ranges: segment n+1 starts right after segment n.
+--
+-- Hash chain: `shards` holds, per chain shard present in the segment, its first prev_hash and
+-- last entry_hash; `heads` holds every shard's chain position at the end of the segment, so the
+-- database part of each chain can be verified from the newest segment without reading files.
+-- file_sha256 and index_sha256 pin the files' content.
+
+create table if not exists audit_archive_segments (
+  segment_no bigint primary key,
+  first_id bigint not null unique,
+  last_id bigint not null unique,
+  rows bigint not null,
+  first_block_no bigint not null,
+  last_block_no bigint not null,
+  min_created_at timestamptz not null,
+  max_created_at timestamptz not null,
+  file_name text not null unique,
+  file_sha256 text not null,
+  file_bytes bigint not null,
+  index_sha256 text not null,
+  shards jsonb not null,
+  heads jsonb not null,
+  created_at timestamptz not null default now(),
+  check (first_id <= last_id)
+);
+
+create index if not exists idx_audit_archive_created on audit_archive_segments (max_created_at, min_created_at);
+
+comment on table audit_archive_segments is
+'Cold-tier segment files of audit_log rows first_id..last_id (Merkle blocks first_block_no..last_block_no). shards: {"<shard>": {rows, first_id, first_prev_hash, last_id, last_entry_hash}}; heads: [[shard, last_id, entry_hash]] of every shard at the end of the segment.';
+
+-- The catalog is append-only, like the log it replaces.
+drop trigger if exists trg_audit_archive_segments_no_update on audit_archive_segments;
+create trigger trg_audit_archive_segments_no_update
+  before update or delete on audit_archive_segments
+  for each row execute function prevent_audit_update_delete();
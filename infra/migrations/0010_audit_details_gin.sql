@@ -0,0 +1,16 @@
+-- 0010_audit_details_gin.sql
+-- Purpose: index audit_log.details for GET /events/search.
+--
+-- jsonb_path_ops stores one hash per (key path, scalar value) leaf. It serves containment
+-- (details @> '{"policy":{"reasons":["x"]}}') and jsonpath equality
+-- (details @@ '$.user_id == "u1"') and is smaller and faster to search than the default
+-- jsonb_ops. It cannot answer key-existence operators (?, ?|, ?&) or range comparisons, which
+-- /events/search therefore does not offer.
+--
+-- Created on the partitioned parent, so every existing and future monthly partition gets its
+-- own index. On large tables, build the legacy partition's index first without blocking writes:
+--   create index concurrently audit_log_legacy_details_path_ops_idx
+--     on audit_log_legacy using gin (details jsonb_path_ops);
+-- This migration then attaches it instead of building it under lock.
+
+create index if not exists idx_audit_details_path_ops on audit_log using gin (details jsonb_path_ops);
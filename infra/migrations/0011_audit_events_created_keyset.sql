@@ -0,0 +1,19 @@
+-- 0011_audit_events_created_keyset.sql
+-- Purpose: keyset index for /events pages filtered by a created_at range.
+--
+-- ids and created_at (the inserting transaction's start time) are correlated but not in
+-- the same order, so no index can return a created_at range in id order: such a filter
+-- used to fall back to a backward primary-key scan that skips every row newer than
+-- created_to before the first match. Pages with a created_at filter are ordered by
+-- (created_at, id) instead and page on that pair, which this index answers as one backward
+-- range scan that stops after LIMIT rows, whatever the page depth.
+--
+-- It supersedes idx_audit_created_at (same leading column), which is dropped.
+-- Created on the partitioned parent, so every monthly partition gets its own index. On large
+-- tables, pre-build the legacy partition's index first without blocking writes:
+--   create index concurrently audit_log_legacy_created_at_id_idx
+--     on audit_log_legacy (created_at, id);
+-- This migration then attaches it instead of building it under lock.
+
+create index if not exists idx_audit_created_at_id on audit_log (created_at, id);
+drop index if exists idx_audit_created_at;
@@ -0,0 +1,25 @@
+-- 0012_audit_merkle_nodes.sql
+-- Purpose: store the complete subtrees of the checkpoint tree so proofs read O(log n) hashes.
+--
+-- (level, idx) is the Merkle root over audit_merkle_blocks roots idx * 2^level up to
+-- (idx + 1) * 2^level - 1; level 0 repeats the block roots. Only complete subtrees are stored,
+-- so a row never changes once written. Every checkpoint root and every checkpoint_path sibling
+-- is a fold of at most O(log n) of these rows (see services/mcp-audit/audit_merkle.py).
+--
+-- Existing blocks are backfilled by the next seal round in mcp-audit, which reads their roots
+-- once; until then proofs fall back to reading all block roots.
+
+create table if not exists audit_merkle_nodes (
+  level integer not null,
+  idx bigint not null,
+  hash text not null,
+  primary key (level, idx)
+);
+
+comment on table audit_merkle_nodes is
+'Complete subtrees of the Merkle tree over audit_merkle_blocks roots: root of blocks [idx << level, (idx + 1) << level).';
+
+drop trigger if exists trg_audit_merkle_nodes_no_update on audit_merkle_nodes;
+create trigger trg_audit_merkle_nodes_no_update
+  before update or delete on audit_merkle_nodes
+  for each row execute function prevent_audit_update_delete();
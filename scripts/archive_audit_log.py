@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Move old audit_log rows to compressed, content-hashed segment files (cold tier).
+
+`run` (default) writes segments of sealed Merkle blocks whose rows are all older
+than the retention window, in id order, and records each one in
+audit_archive_segments (migration 0009). Rows are re-hashed and chain-checked as
+they are written. It then detaches and drops every monthly partition whose rows
+are all archived in segments at least --drop-grace-minutes old, so mcp-audit
+replicas (which re-read the catalog every AUDIT_ARCHIVE_REFRESH_S) serve them
+from the files before they leave the database.
+
+`verify` re-checks every segment file against the catalog: file hashes, row
+hashes, chain links from one segment to the next and the recorded boundary
+hashes. POST /verify covers the database part of the chain from the newest
+segment's heads. Prints a JSON report and exits 1 on any problem.
+
+Environment:
+- DATABASE_URL (required unless --dsn is given)
+- AUDIT_ARCHIVE_DIR (segment directory unless --dir is given; mcp-audit reads the same one)
+
+Usage:
+    python scripts/archive_audit_log.py [run] [--retention-days 90] [--max-rows 1000000]
+        [--max-segments 0] [--level 10] [--drop-grace-minutes 60] [--no-drop]
+    python scripts/archive_audit_log.py verify
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import psycopg
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "services" / "mcp-audit"))
+
+from audit_archive import (  # noqa: E402
+    SegmentInfo,
+    archive_once,
+    drop_archived_partitions,
+    load_catalog,
+    verify_segment,
+)
+
+
+def run(conn: psycopg.Connection, directory: Path, args: argparse.Namespace) -> int:
+    cutoff = datetime.now(UTC) - timedelta(days=args.retention_days)
+    written = 0
+    while args.max_segments <= 0 or written < args.max_segments:
+        t0 = time.perf_counter()
+        info = archive_once(conn, directory, cutoff, args.max_rows, args.level)
+        if info is None:
+            break
+        written += 1
+        print(
+            f"segment {info['segment_no']}: ids {info['first_id']}..{info['last_id']},"
+            f" {info['rows']} rows, {info['file_bytes']} bytes in"
+            f" {time.perf_counter() - t0:.1f}s -> {info['file_name']}"
+        )
+    print(f"Archived {written} segment(s) older than {cutoff.isoformat()}")
+    if not args.no_drop:
+        grace = timedelta(minutes=args.drop_grace_minutes)
+        for name, upper, max_id in drop_archived_partitions(conn, cutoff, grace):
+            print(f"dropped partition {name} (before {upper.isoformat()}, max id {max_id})")
+    return 0
+
+
+def verify(conn: psycopg.Connection, directory: Path) -> int:
+    segments = load_catalog(conn)
+    report = []
+    heads: dict[int, tuple[int, str]] = {}
+    prev: SegmentInfo | None = None
+    for segment in segments:
+        problems = verify_segment(directory, segment, heads)
+        if prev is not None and (
+            segment.first_id <= prev.last_id or segment.first_block_no != prev.last_block_no + 1
+        ):
+            problems.append("not_contiguous_with_previous_segment")
+        report.append(
+            {
+                "segment_no": segment.segment_no,
+                "first_id": segment.first_id,
+                "last_id": segment.last_id,
+                "rows": segment.rows,
+                "ok": not problems,
+                "problems": problems[:100],
+            }
+        )
+        heads = segment.end_heads
+        prev = segment
+    ok = all(s["ok"] for s in report)
+    print(json.dumps({"ok": ok, "segments": report}, indent=2))
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", nargs="?", choices=("run", "verify"), default="run")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--dir", default=os.environ.get("AUDIT_ARCHIVE_DIR", ""))
+    parser.add_argument(
+        "--retention-days", type=float, default=90, help="rows kept in the database"
+    )
+    parser.add_argument("--max-rows", type=int, default=1_000_000, help="rows per segment")
+    parser.add_argument("--max-segments", type=int, default=0, help="0 = until caught up")
+    parser.add_argument("--level", type=int, default=10, help="zstd compression level")
+    parser.add_argument("--drop-grace-minutes", type=float, default=60)
+    parser.add_argument("--no-drop", action="store_true", help="keep archived partitions")
+    args = parser.parse_args()
+    if not args.dsn:
+        print("DATABASE_URL or --dsn is required", file=sys.stderr)
+        return 2
+    if not args.dir:
+        print("AUDIT_ARCHIVE_DIR or --dir is required", file=sys.stderr)
+        return 2
+    directory = Path(args.dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        if args.command == "verify":
+            return verify(conn, directory)
+        return run(conn, directory, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
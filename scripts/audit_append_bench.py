@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Per-append latency of the audit_log write path, measured directly against Postgres.
+
+Appends events one at a time on a single connection (no contention, so the numbers
+are round trips plus server work) in three modes and reports p50/p99/mean latency:
+
+- legacy: BEGIN; SELECT head FOR UPDATE; INSERT; UPDATE head; COMMIT (5 round trips)
+- cte: the single-statement append used by /log (audit_chain.APPEND_SQL), autocommit,
+  unprepared (1 round trip, parsed and planned every time)
+- cte_prepared: the same statement as a server-side prepared statement, which is how
+  /log runs it (1 round trip, planned once per connection)
+
+Every mode chains correctly, so the table stays verifiable; rows are written with
+event_type "append_bench". Run it against a local or staging database only: audit_log
+is append-only, so the rows cannot be removed. For end-to-end /log latency through
+the service, use scripts/audit_load_test.py --writers 1.
+
+Environment:
+- DATABASE_URL (required unless --dsn is given)
+
+Usage:
+    python scripts/audit_append_bench.py [--count 2000] [--modes legacy cte cte_prepared]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import psycopg
+from psycopg.types.json import Json
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "services" / "mcp-audit"))
+
+from audit_chain import APPEND_SQL, chain_hash, payload  # noqa: E402
+
+MODES = ("legacy", "cte", "cte_prepared")
+EVENT_TYPE = "append_bench"
+
+
+def _event(i: int) -> dict[str, Any]:
+    return {"subject": f"bench-{i % 16}", "decision": i % 7 != 0, "details": {"seq": i}}
+
+
+def _append_legacy(conn: psycopg.Connection, i: int) -> None:
+    evt = _event(i)
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("SELECT entry_hash FROM audit_chain_head WHERE shard = 0 FOR UPDATE")
+        row = cur.fetchone()
+        assert row is not None
+        prev = row[0]
+        entry = chain_hash(
+            prev, payload(EVENT_TYPE, evt["subject"], evt["decision"], evt["details"])
+        )
+        cur.execute(
+            "INSERT INTO audit_log (event_type, subject, decision, details, prev_hash, entry_hash)"
+            " VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
+            (EVENT_TYPE, evt["subject"], evt["decision"], Json(evt["details"]), prev, entry),
+        )
+        new = cur.fetchone()
+        assert new is not None
+        cur.execute(
+            "UPDATE audit_chain_head SET prev_hash = %s, entry_hash = %s, last_id = %s,"
+            " updated_at = now() WHERE shard = 0",
+            (prev, entry, new[0]),
+        )
+
+
+def _append_cte(conn: psycopg.Connection, i: int, prepare: bool) -> None:
+    evt = _event(i)
+    with conn.cursor() as cur:
+        cur.execute(
+            APPEND_SQL,
+            {
+                "payload": payload(EVENT_TYPE, evt["subject"], evt["decision"], evt["details"]),
+                "event_type": EVENT_TYPE,
+                "subject": evt["subject"],
+                "decision": evt["decision"],
+                "details": Json(evt["details"]),
+                "request_id": None,
+                "shard": 0,
+            },
+            prepare=prepare,
+        )
+        if cur.fetchone() is None:
+            raise RuntimeError("audit_chain_head row missing (run migrations)")
+
+
+def run(dsn: str, mode: str, count: int) -> dict[str, Any]:
+    # prepare_threshold=None disables psycopg's automatic preparation, so "cte" really
+    # is unprepared; "cte_prepared" asks for it explicitly like the service does.
+    with psycopg.connect(dsn, autocommit=mode != "legacy", prepare_threshold=None) as conn:
+        latencies = []
+        for i in range(count + count // 10):
+            t0 = time.perf_counter()
+            if mode == "legacy":
+                _append_legacy(conn, i)
+            else:
+                _append_cte(conn, i, prepare=mode == "cte_prepared")
+            if i >= count // 10:  # the first 10% warm up caches and the connection
+                latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+
+    return {
+        "mode": mode,
+        "appends": len(latencies),
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--count", type=int, default=2000, help="measured appends per mode")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+    if not args.dsn:
+        print("DATABASE_URL or --dsn is required", file=sys.stderr)
+        return 2
+
+    print(f"{'mode':>14} {'appends':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for mode in args.modes:
+        res = run(args.dsn, mode, max(1, args.count))
+        print(
+            f"{res['mode']:>14} {res['appends']:>8} {res['p50_ms']:>8}"
+            f" {res['p99_ms']:>8} {res['mean_ms']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Sustained-append load test for mcp-audit /log (or /log/batch with --batch N).
+
+For each writer count, runs that many concurrent clients posting events for a fixed
+duration and reports appends/s and latency percentiles. With DATABASE_URL (or
+--dsn) set, it then checks that the rows written during the run form unforked
+hash chains, one per shard: every row's prev_hash equals the entry_hash of the
+previous row of its shard, and entry_hash = sha256(prev_hash + "|" + canonical
+payload).
+
+With --batch N each request posts N events to /log/batch, so "appends" counts
+events rather than requests and the latency columns are per batch.
+
+Usage:
+    python scripts/audit_load_test.py [--url http://localhost:8080/mcp-audit]
+        [--writers 10 50 200] [--duration 15] [--batch 500] [--dsn postgresql://...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from hashlib import sha256
+from typing import Any
+
+import httpx
+
+
+def _payload(i: int, writer: int) -> dict[str, Any]:
+    return {
+        "event_type": "load_test",
+        "subject": f"writer-{writer}",
+        "decision": i % 7 != 0,
+        "details": {"seq": i, "writer": writer},
+    }
+
+
+async def _writer(
+    client: httpx.AsyncClient,
+    url: str,
+    writer: int,
+    deadline: float,
+    latencies: list[float],
+    batch: int,
+) -> tuple[int, int]:
+    """Post until `deadline`; returns (events appended, failed requests)."""
+    appended = errors = 0
+    i = 0
+    while time.perf_counter() < deadline:
+        if batch:
+            body: Any = [_payload(i + j, writer) for j in range(batch)]
+        else:
+            body = _payload(i, writer)
+        t0 = time.perf_counter()
+        resp = await client.post(url, json=body)
+        if resp.status_code == 200:
+            latencies.append(time.perf_counter() - t0)
+            appended += batch or 1
+        else:
+            errors += 1
+        i += batch or 1
+    return appended, errors
+
+
+def _pct(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] * 1000
+
+
+async def run(url: str, writers: int, duration: float, batch: int = 0) -> dict[str, Any]:
+    limits = httpx.Limits(max_connections=writers, max_keepalive_connections=writers)
+    latencies: list[float] = []
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        t0 = time.perf_counter()
+        deadline = t0 + duration
+        results = await asyncio.gather(
+            *(_writer(client, url, w, deadline, latencies, batch) for w in range(writers))
+        )
+        elapsed = time.perf_counter() - t0
+    latencies.sort()
+    appends = sum(a for a, _ in results)
+    return {
+        "writers": writers,
+        "appends": appends,
+        "errors": sum(e for _, e in results),
+        "appends_per_s": round(appends / elapsed, 1),
+        "p50_ms": round(_pct(latencies, 0.50), 2),
+        "p99_ms": round(_pct(latencies, 0.99), 2),
+    }
+
+
+def verify_chain(dsn: str, since_id: int) -> tuple[int, int]:
+    """Return (rows checked, broken links) for audit_log rows with id > since_id."""
+    import psycopg
+
+    checked = broken = 0
+    with psycopg.connect(dsn) as conn:
+        prevs: dict[int, str] = {}
+        with conn.cursor() as cur:
+            cur.execute(
+                "select distinct on (shard) shard, entry_hash from audit_log"
+                " where id <= %s order by shard, id desc",
+                (since_id,),
+            )
+            prevs.update(cur.fetchall())
+        with conn.cursor(name="audit_load_verify") as cur:
+            cur.execute(
+                "select shard, event_type, subject, decision, details, prev_hash, entry_hash"
+                " from audit_log where id > %s order by id",
+                (since_id,),
+            )
+            for shard, event_type, subject, decision, details, prev_hash, entry_hash in cur:
+                prev = prevs.get(shard, "GENESIS" if shard == 0 else f"GENESIS:{shard}")
+                payload = json.dumps(
+                    {
+                        "event_type": event_type,
+                        "subject": subject,
+                        "decision": decision,
+                        "details": details,
+                    },
+                    sort_keys=True,
+                    separators=(",", ":"),
+                )
+                expected = sha256((prev_hash + "|" + payload).encode("utf-8")).hexdigest()
+                if prev_hash != prev or entry_hash != expected:
+                    broken += 1
+                prevs[shard] = entry_hash
+                checked += 1
+    return checked, broken
+
+
+def _max_id(dsn: str) -> int:
+    import psycopg
+
+    with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("select coalesce(max(id), 0) from audit_log")
+        return int(cur.fetchone()[0])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--url", default=os.environ.get("MCP_AUDIT_URL", "http://localhost:8080/mcp-audit")
+    )
+    parser.add_argument("--writers", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per writer count")
+    parser.add_argument(
+        "--batch", type=int, default=0, help="events per request to /log/batch (0 = use /log)"
+    )
+    parser.add_argument(
+        "--dsn", default=os.environ.get("DATABASE_URL", ""), help="enables chain verification"
+    )
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/") + ("/log/batch" if args.batch else "/log")
+    header = ("writers", "appends", "errors", "appends/s", "p50 ms", "p99 ms", "chain")
+    print(" ".join(f"{h:>{w}}" for h, w in zip(header, (8, 9, 7, 10, 8, 8, 10), strict=True)))
+    for writers in args.writers:
+        start_id = _max_id(args.dsn) if args.dsn else 0
+        res = asyncio.run(run(url, writers, args.duration, args.batch))
+        chain = "-"
+        if args.dsn:
+            checked, broken = verify_chain(args.dsn, start_id)
+            chain = "ok" if broken == 0 else f"{broken} BROKEN"
+            if checked < res["appends"]:
+                chain += f" ({checked} rows)"
+        print(
+            f"{res['writers']:>8} {res['appends']:>9} {res['errors']:>7} {res['appends_per_s']:>10}"
+            f" {res['p50_ms']:>8} {res['p99_ms']:>8} {chain:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Backfill the hourly audit rollup (audit_rollup_hourly) from audit_log.
+
+Recomputes allowed/denied counts for every settled UTC hour in the range, one
+step of hours per transaction, overwriting existing rollup rows with exact
+counts. Re-running is harmless, so the job also reconciles a range. Hours newer
+than the settle margin are left to the append trigger; run the job again later
+to cover them if they hold events written before migration 0008.
+
+Environment:
+- DATABASE_URL (required unless --dsn is given)
+
+Usage:
+    python scripts/backfill_audit_rollups.py [--since 2026-01-01T00:00:00Z]
+        [--until 2026-02-01T00:00:00Z] [--step-hours 24]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import psycopg
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "services" / "mcp-audit"))
+
+from audit_rollups import backfill, hour_floor, settled_until  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--since", type=datetime.fromisoformat, help="default: oldest event")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="default: last settled hour")
+    parser.add_argument("--step-hours", type=int, default=24, help="hours per transaction")
+    args = parser.parse_args()
+    if not args.dsn:
+        print("DATABASE_URL or --dsn is required", file=sys.stderr)
+        return 2
+
+    until = min(hour_floor(args.until), settled_until()) if args.until else settled_until()
+    step = timedelta(hours=max(1, args.step_hours))
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        since = args.since
+        if since is None:
+            since = conn.execute("SELECT min(created_at) FROM audit_log").fetchone()[0]
+            if since is None:
+                print("audit_log is empty")
+                return 0
+        lo = hour_floor(since)
+        total = 0
+        while lo < until:
+            hi = min(lo + step, until)
+            t0 = time.perf_counter()
+            written = backfill(conn, lo, hi)
+            total += written
+            print(
+                f"{lo.isoformat()} .. {hi.isoformat()}: {written} rows in {time.perf_counter() - t0:.1f}s"
+            )
+            lo = hi
+    print(f"Backfill complete: {total} rollup rows written up to {until.isoformat()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled policy rule engine against per-request interpretation.
+
+Compares, on the same payloads:
+- legacy:      the original validators.evaluate rule loop (deny[].equals, required, max_risk)
+- interpreted: a dict-walking interpreter for the full model-policy.yml grammar that
+               splits paths and resolves value_from on every call
+- compiled:    policy_compiler.compile_policy closures
+
+With --scaling, instead times the field-indexed dispatch against a linear scan of
+the same compiled rules on synthetic policies of 10 to 10,000 rules.
+
+Usage:
+    python scripts/bench_policy_engine.py [--policy policies/model-policy.yml] [--iterations 200000]
+    python scripts/bench_policy_engine.py --scaling [--iterations 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import operator
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "services" / "mcp-policy"))
+
+from policy_compiler import compile_policy  # noqa: E402
+
+_MISSING = object()
+
+
+def _get(doc: Any, path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return _MISSING
+        doc = doc.get(key, _MISSING)
+    return doc
+
+
+_OPS = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "in": lambda a, b: a in b,
+    "not_in": lambda a, b: a not in b,
+    "contains": lambda a, b: b in a,
+}
+
+
+def _test(cond: dict[str, Any], policy: dict[str, Any], doc: dict[str, Any]) -> bool:
+    actual = _get(doc, cond["field"])
+    if actual is _MISSING:
+        return False
+    expected = _get(policy, cond["value_from"]) if "value_from" in cond else cond["value"]
+    try:
+        return bool(_OPS[cond["op"]](actual, expected))
+    except TypeError:
+        return False
+
+
+def interpret(policy: dict[str, Any], doc: dict[str, Any]) -> tuple[bool, int]:
+    """Reference interpreter: returns (denied, violated require count)."""
+    for rule in policy.get("deny") or []:
+        if "when" in rule and not _test(rule["when"], policy, doc):
+            continue
+        if _test(rule, policy, doc):
+            return True, 0
+    violated = 0
+    for rule in policy.get("require") or []:
+        if "when" in rule and not _test(rule["when"], policy, doc):
+            continue
+        if _get(doc, rule["field"]) is not _MISSING and not _test(rule, policy, doc):
+            violated += 1
+    return False, violated
+
+
+def legacy(policy: dict[str, Any], doc: dict[str, Any]) -> tuple[bool, int]:
+    """The rule loop validators.evaluate shipped with before the compiler."""
+    for rule in policy.get("deny", []) or []:
+        field = rule.get("field")
+        equals = rule.get("equals")
+        if field and equals is not None and str(doc.get(field)) == str(equals):
+            return True, 0
+    req_fields = policy.get("required", []) or []
+    missing = [f for f in req_fields if doc.get(f) in (None, "")]
+    return False, len(missing)
+
+
+def payloads() -> list[dict[str, Any]]:
+    return [
+        {
+            "flags": {"contains_forbidden_data": False},
+            "metrics": {"accuracy": 0.97},
+            "context": {"safety_critical": True},
+            "risk": {"score": 12},
+        },
+        {
+            "flags": {"contains_forbidden_data": False},
+            "metrics": {"accuracy": 0.90},
+            "context": {"safety_critical": True},
+            "risk": {"score": 30},
+        },
+        {
+            "flags": {"contains_forbidden_data": True},
+            "metrics": {"accuracy": 0.99},
+            "risk": {"score": 5},
+        },
+        {"model_class": "vision", "use_case": "general", "risk": {"score": 70}},
+    ]
+
+
+def bench(name: str, fn, docs: list[dict[str, Any]], iterations: int) -> float:
+    n = len(docs)
+    t0 = time.perf_counter_ns()
+    for i in range(iterations):
+        fn(docs[i % n])
+    per_call = (time.perf_counter_ns() - t0) / iterations
+    print(f"{name:<12} {per_call:10.0f} ns/eval  {1e9 / per_call:12.0f} evals/s")
+    return per_call
+
+
+def synthetic_policy(n_rules: int) -> dict[str, Any]:
+    """A large multi-business-unit policy: mostly equality denylists, some ranges and requires."""
+    deny: list[dict[str, Any]] = []
+    require: list[dict[str, Any]] = []
+    for i in range(n_rules):
+        bu = f"bu{i % 25}"
+        kind = i % 10
+        if kind < 5:
+            deny.append({"field": "model_id", "op": "eq", "value": f"blocked-model-{i}"})
+        elif kind < 7:
+            deny.append({"field": f"{bu}.use_case", "op": "in", "value": [f"uc-{i}", f"uc-{i}-b"]})
+        elif kind < 9:
+            deny.append({"field": f"{bu}.metrics.m{i % 7}", "op": "lt", "value": 0.1})
+        else:
+            require.append({"field": f"{bu}.attestations.a{i % 5}", "op": "eq", "value": True})
+    return {"deny": deny, "require": require}
+
+
+def scaling(iterations: int) -> int:
+    docs = [
+        {"model_id": "resnet-50", "bu3": {"use_case": "chat", "metrics": {"m1": 0.9}}},
+        {"model_id": "blocked-model-0", "bu0": {"use_case": "uc-5"}},
+        {"model_id": "gpt-x", "bu7": {"attestations": {"a2": True}, "metrics": {"m4": 0.5}}},
+    ]
+    print(f"{'rules':>7} {'linear ns':>12} {'indexed ns':>12} {'speedup':>9}")
+    for n_rules in (10, 100, 1_000, 10_000):
+        compiled = compile_policy(synthetic_policy(n_rules))
+        for doc in docs:
+            assert compiled.first_deny(doc) == compiled.first_deny_linear(doc)
+            assert compiled.violations(doc) == compiled.violations_linear(doc)
+
+        def linear(doc: dict[str, Any], c=compiled) -> None:
+            if c.first_deny_linear(doc) is None:
+                c.violations_linear(doc)
+
+        def indexed(doc: dict[str, Any], c=compiled) -> None:
+            if c.first_deny(doc) is None:
+                c.violations(doc)
+
+        n = len(docs)
+        timings = []
+        for fn in (linear, indexed):
+            t0 = time.perf_counter_ns()
+            for i in range(iterations):
+                fn(docs[i % n])
+            timings.append((time.perf_counter_ns() - t0) / iterations)
+        print(
+            f"{n_rules:>7} {timings[0]:>12.0f} {timings[1]:>12.0f} {timings[0] / timings[1]:>8.1f}x"
+        )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--policy", type=Path, default=REPO_ROOT / "policies" / "model-policy.yml")
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--scaling", action="store_true", help="run the 10..10,000 rule sweep")
+    args = parser.parse_args()
+    if args.scaling:
+        return scaling(args.iterations or 20_000)
+    args.iterations = args.iterations or 200_000
+
+    policy = yaml.safe_load(args.policy.read_text(encoding="utf-8")) or {}
+    compiled = compile_policy(policy)
+    docs = payloads()
+
+    # Sanity check: both full-grammar engines must agree before timing them.
+    for doc in docs:
+        denied, violated = interpret(policy, doc)
+        c_denied = compiled.first_deny(doc) is not None
+        c_violated = 0 if c_denied else len(compiled.violations(doc))
+        if (denied, bool(violated)) != (c_denied, bool(c_violated)):
+            print(f"MISMATCH for {doc}: interpreted={denied, violated}", file=sys.stderr)
+            return 1
+
+    def run_compiled(doc: dict[str, Any]) -> None:
+        if compiled.first_deny(doc) is None:
+            compiled.violations(doc)
+
+    print(f"policy={args.policy} iterations={args.iterations}")
+    bench("legacy", lambda d: legacy(policy, d), docs, args.iterations)
+    slow = bench("interpreted", lambda d: interpret(policy, d), docs, args.iterations)
+    fast = bench("compiled", run_compiled, docs, args.iterations)
+    print(f"compiled speedup over interpreted: {slow / fast:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Concurrency-scaling benchmark for the database-backed read endpoints.
+
+For each concurrency level, runs that many clients issuing GET requests against
+one URL for a fixed duration and reports requests/s and latency percentiles.
+With --metrics-url pointing at the same service's /metrics, it also reports the
+mean time requests waited for a pooled connection (db_pool_acquire_wait_seconds)
+during the level.
+
+To compare before/after the async port, run it against a build of each at the
+same concurrency levels. Sync handlers plateau at roughly the smaller of the
+server's worker thread pool (40 threads) and the connection pool size; async
+handlers scale until DB_POOL_MAX_SIZE connections or the database saturate, and
+the pool wait column shows which of the two is the limit.
+
+Usage:
+    python scripts/db_concurrency_bench.py --url "http://localhost:8002/events?limit=20"
+        [--concurrency 10 50 200 400] [--duration 15]
+        [--metrics-url http://localhost:8002/metrics]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any
+
+import httpx
+
+WAIT_METRIC = "db_pool_acquire_wait_seconds"
+
+
+async def _client(
+    client: httpx.AsyncClient, url: str, deadline: float, latencies: list[float]
+) -> int:
+    """GET until `deadline`; returns failed requests."""
+    errors = 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            resp = await client.get(url)
+        except httpx.HTTPError:
+            errors += 1
+            continue
+        if resp.status_code == 200:
+            latencies.append(time.perf_counter() - t0)
+        else:
+            errors += 1
+    return errors
+
+
+def _pct(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] * 1000
+
+
+async def run(url: str, concurrency: int, duration: float) -> dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: list[float] = []
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        t0 = time.perf_counter()
+        deadline = t0 + duration
+        errors = await asyncio.gather(
+            *(_client(client, url, deadline, latencies) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_pct(latencies, 0.50), 2),
+        "p99_ms": round(_pct(latencies, 0.99), 2),
+    }
+
+
+def pool_wait(metrics_url: str) -> tuple[float, float] | None:
+    """(sum, count) of the acquire-wait histogram, or None if the service has none."""
+    try:
+        text = httpx.get(metrics_url, timeout=10.0).text
+    except httpx.HTTPError:
+        return None
+    values = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(" ")
+        if name in (f"{WAIT_METRIC}_sum", f"{WAIT_METRIC}_count"):
+            values[name] = float(value)
+    if len(values) != 2:
+        return None
+    return values[f"{WAIT_METRIC}_sum"], values[f"{WAIT_METRIC}_count"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", required=True, help="full GET URL, including query string")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200, 400])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per level")
+    parser.add_argument("--metrics-url", default="", help="service /metrics for pool wait times")
+    args = parser.parse_args()
+
+    header = ("clients", "requests", "errors", "req/s", "p50 ms", "p99 ms", "pool wait ms")
+    widths = (8, 9, 7, 9, 8, 8, 13)
+    print(" ".join(f"{h:>{w}}" for h, w in zip(header, widths, strict=True)))
+    for concurrency in args.concurrency:
+        before = pool_wait(args.metrics_url) if args.metrics_url else None
+        res = asyncio.run(run(args.url, concurrency, args.duration))
+        after = pool_wait(args.metrics_url) if before else None
+        wait = "-"
+        if before and after and after[1] > before[1]:
+            wait = f"{(after[0] - before[0]) / (after[1] - before[1]) * 1000:.2f}"
+        print(
+            f"{res['concurrency']:>8} {res['requests']:>9} {res['errors']:>7} {res['rps']:>9}"
+            f" {res['p50_ms']:>8} {res['p99_ms']:>8} {wait:>13}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Replay recorded model_inference decisions from audit_log against a candidate policy.
+
+Streams rows through a server-side cursor, evaluates them in a process pool with a
+bounded number of chunks in flight, and prints a decision diff summary as JSON.
+Memory use is independent of table size; resume a long run with --since-id set to
+the previous run's last_id.
+
+Environment:
+- DATABASE_URL (required unless --dsn is given)
+
+Usage:
+    python scripts/replay_policy.py --candidate policies/bundles/next [--workers 8]
+        [--chunk-size 5000] [--since-id 0] [--until-id N] [--limit N] [--exact-only]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "services" / "mcp-policy"))
+
+from policy_replay import replay  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--candidate", type=Path, required=True, help="directory with the policy files"
+    )
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 = in-process")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--since-id", type=int, default=0)
+    parser.add_argument("--until-id", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--exact-only", action="store_true", help="skip events without policy_input"
+    )
+    parser.add_argument("--samples", type=int, default=20, help="flipped decisions to include")
+    args = parser.parse_args()
+    if not args.dsn:
+        print("DATABASE_URL or --dsn is required", file=sys.stderr)
+        return 2
+    for name in ("model-policy.yml", "risk-matrix.yml"):
+        if not (args.candidate / name).is_file():
+            print(f"{args.candidate / name} not found", file=sys.stderr)
+            return 2
+
+    t0 = time.perf_counter()
+    summary = replay(
+        args.dsn,
+        str(args.candidate),
+        bundle=args.candidate.name,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        since_id=args.since_id,
+        until_id=args.until_id,
+        limit=args.limit,
+        exact_only=args.exact_only,
+        sample_size=args.samples,
+    )
+    elapsed = time.perf_counter() - t0
+    out = summary.to_dict()
+    out["elapsed_s"] = round(elapsed, 3)
+    out["rows_per_s"] = round((summary.replayed + summary.skipped) / elapsed) if elapsed else 0
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Verify the audit_log hash chain in parallel, resuming from the last checkpoint.
+
+Splits the id range into segments, re-hashes each segment in a process pool (one
+database connection per worker, rows streamed through a server-side cursor) and
+stitches the segment boundaries together. A clean run records a checkpoint in
+audit_chain_checkpoints, so the next run only re-hashes rows appended since.
+Prints the report as JSON and exits 1 if the chain is broken.
+
+Environment:
+- DATABASE_URL (required unless --dsn is given)
+
+Usage:
+    python scripts/verify_audit_chain.py [--full] [--workers 8] [--segment-rows 1000000]
+        [--chunk-size 5000] [--no-checkpoint]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "services" / "mcp-audit"))
+
+from audit_chain import verify_chain  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--full", action="store_true", help="ignore checkpoints, start at GENESIS")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 = in-process")
+    parser.add_argument("--segment-rows", type=int, default=1_000_000, help="ids per segment")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per fetch")
+    parser.add_argument("--no-checkpoint", action="store_true", help="do not record a checkpoint")
+    args = parser.parse_args()
+    if not args.dsn:
+        print("DATABASE_URL or --dsn is required", file=sys.stderr)
+        return 2
+
+    report = verify_chain(
+        args.dsn,
+        full=args.full,
+        workers=args.workers,
+        segment_rows=args.segment_rows,
+        chunk_size=args.chunk_size,
+        save_checkpoint=not args.no_checkpoint,
+    )
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import asyncio
 import contextvars
 import csv
 import io
@@ -5,21 +6,119 @@ import json
 import logging
 import os
 import time
-from hashlib import sha256
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import uuid4
 
-from audit_schema import AuditEvent, AuditIn
-from fastapi import FastAPI, HTTPException, Query, Response
+import psycopg
+from audit_archive import Archive
+from audit_chain import (
+    APPEND_SQL,
+    VerifyJobs,
+    canonical_json,
+    chain_hash,
+    ensure_shard_heads,
+    payload,
+    shard_for,
+    snapshot_heads_async,
+    verify_chain,
+)
+from audit_columnar import ColumnarExport
+from audit_columnar import available as columnar_available
+from audit_db import MeteredPool, PoolConfig, render_pool_metrics
+from audit_group_commit import GroupCommitWriter, QueueFull, render_metrics
+from audit_merkle import MerkleSealer, ProofError, inclusion_proof, latest_checkpoint
+from audit_partitions import PartitionMaintainer
+from audit_rollups import stats as rollup_stats
+from audit_schema import AuditBatchOut, AuditEvent, AuditIn
+from audit_search import SearchError, details_conditions
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from psycopg import types as psycopg_types
-from psycopg_pool import ConnectionPool
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
 try:
     DATABASE_URL = os.environ["DATABASE_URL"]
 except KeyError as exc:
     raise RuntimeError("DATABASE_URL environment variable is required") from exc
-pool = ConnectionPool(conninfo=DATABASE_URL, max_size=10, open=True)
+# Autocommit: every append is a single self-contained statement (one round trip);
+# multi-statement work opens an explicit conn.transaction(). Handlers are async and
+# share this pool; background threads open their own short-lived connections.
+pool = MeteredPool(DATABASE_URL, PoolConfig.from_env(), kwargs={"autocommit": True})
+AUDIT_BATCH_MAX = int(os.environ.get("AUDIT_BATCH_MAX", "10000"))
+AUDIT_EXPORT_CHUNK_ROWS = int(os.environ.get("AUDIT_EXPORT_CHUNK_ROWS", "2000"))
+AUDIT_EXPORT_ROW_GROUP_ROWS = int(os.environ.get("AUDIT_EXPORT_ROW_GROUP_ROWS", "20000"))
+AUDIT_VERIFY_WORKERS = int(os.environ.get("AUDIT_VERIFY_WORKERS", "2"))
+AUDIT_VERIFY_SEGMENT_ROWS = int(os.environ.get("AUDIT_VERIFY_SEGMENT_ROWS", "1000000"))
+AUDIT_MERKLE_BLOCK_SIZE = int(os.environ.get("AUDIT_MERKLE_BLOCK_SIZE", "1024"))
+AUDIT_MERKLE_INTERVAL_S = float(os.environ.get("AUDIT_MERKLE_INTERVAL_S", "60"))
+AUDIT_CHAIN_SHARDS = max(1, int(os.environ.get("AUDIT_CHAIN_SHARDS", "1")))
+AUDIT_SHARD_KEY = os.environ.get("AUDIT_SHARD_KEY", "subject")
+if AUDIT_SHARD_KEY not in ("subject", "event_type"):
+    raise RuntimeError("AUDIT_SHARD_KEY must be 'subject' or 'event_type'")
+AUDIT_GROUP_COMMIT = os.environ.get("AUDIT_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+AUDIT_GROUP_COMMIT_MAX_BATCH = int(os.environ.get("AUDIT_GROUP_COMMIT_MAX_BATCH", "256"))
+AUDIT_GROUP_COMMIT_INTERVAL_MS = float(os.environ.get("AUDIT_GROUP_COMMIT_INTERVAL_MS", "5"))
+AUDIT_GROUP_COMMIT_QUEUE_DEPTH = int(os.environ.get("AUDIT_GROUP_COMMIT_QUEUE_DEPTH", "10000"))
+AUDIT_STATS_MAX_HOURS = int(os.environ.get("AUDIT_STATS_MAX_HOURS", "744"))
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.environ.get("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+AUDIT_PARTITION_INTERVAL_S = float(os.environ.get("AUDIT_PARTITION_INTERVAL_S", "21600"))
+AUDIT_ARCHIVE_DIR = os.environ.get("AUDIT_ARCHIVE_DIR", "")
+AUDIT_ARCHIVE_SCAN_ROWS = int(os.environ.get("AUDIT_ARCHIVE_SCAN_ROWS", "100000"))
+AUDIT_ARCHIVE_REFRESH_S = float(os.environ.get("AUDIT_ARCHIVE_REFRESH_S", "60"))
+AUDIT_SEARCH_TIMEOUT_MS = int(os.environ.get("AUDIT_SEARCH_TIMEOUT_MS", "5000"))
 
-app = FastAPI(title="mcp-audit")
+
+def _connect() -> psycopg.Connection:
+    """Dedicated sync connection for background threads (closed when the `with` exits)."""
+    return psycopg.connect(DATABASE_URL, autocommit=True)
+
+
+def _init_shard_heads() -> None:
+    with _connect() as conn:
+        ensure_shard_heads(conn, AUDIT_CHAIN_SHARDS)
+
+
+merkle_sealer = MerkleSealer(_connect, AUDIT_MERKLE_BLOCK_SIZE, AUDIT_MERKLE_INTERVAL_S)
+partition_maintainer = PartitionMaintainer(
+    _connect, AUDIT_PARTITION_MONTHS_AHEAD, AUDIT_PARTITION_INTERVAL_S
+)
+# Cold-tier segments (scripts/archive_audit_log.py); ids up to its watermark are read from files.
+archive = Archive(AUDIT_ARCHIVE_DIR, AUDIT_ARCHIVE_REFRESH_S) if AUDIT_ARCHIVE_DIR else None
+# Loop the group-commit writer thread submits its batches to (set by lifespan).
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    global _loop
+    _loop = asyncio.get_running_loop()
+    await pool.open()
+    try:
+        await run_in_threadpool(_init_shard_heads)
+    except Exception as e:
+        _logger.error("audit_shard_heads_init_failed: %s", e)
+    if group_commit is not None:
+        group_commit.start()
+    merkle_sealer.start()
+    partition_maintainer.start()
+    try:
+        yield
+    finally:
+        partition_maintainer.stop()
+        merkle_sealer.stop()
+        if group_commit is not None:
+            # The writer's last flush runs on this loop, so join it from a worker thread.
+            await run_in_threadpool(group_commit.stop)
+        await pool.close()
+        if archive is not None:
+            archive.close()
+
+
+app = FastAPI(title="mcp-audit", lifespan=lifespan)
 
 _request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
@@ -78,139 +177,724 @@ async def add_security_headers(request, call_next):
 
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
     return {"ok": True}
 
 
-def canonical_json(value) -> str:
+def event_payload(evt: AuditIn) -> str:
+    """Canonical JSON of the hashed fields of an event."""
+    return payload(evt.event_type, evt.subject, evt.decision, evt.details)
+
+
+def event_shard(evt: AuditIn) -> int:
+    """Chain shard of an event (always 0 unless AUDIT_CHAIN_SHARDS > 1)."""
+    key = evt.subject if AUDIT_SHARD_KEY == "subject" else evt.event_type
+    return shard_for(key, AUDIT_CHAIN_SHARDS)
+
 
-    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+EVENT_COLUMNS = (
+    "id, event_type, subject, decision, details, prev_hash, entry_hash, created_at,"
+    " request_id, shard"
+)
+
+
+def _event_row(r) -> dict:
+    return {
+        "id": r[0],
+        "event_type": r[1],
+        "subject": r[2],
+        "decision": r[3],
+        "details": r[4],
+        "prev_hash": r[5],
+        "entry_hash": r[6],
+        "created_at": r[7].isoformat(),
+        "request_id": r[8],
+        "shard": r[9],
+    }
+
+
+def _current_request_id() -> str | None:
+    """X-Request-ID of the request being served, stored with the event (not hashed)."""
+    rid = _request_id_var.get()
+    return None if rid == "-" else rid
 
 
 @app.post("/log", response_model=AuditEvent)
-def log_event(evt: AuditIn):
+async def log_event(evt: AuditIn):
+    request_id = _current_request_id()
+    if group_commit is not None:
+        return await _log_grouped(evt, request_id)
     try:
-        with pool.connection() as conn, conn.cursor() as cur:
-            cur.execute("SELECT entry_hash FROM audit_log ORDER BY id DESC LIMIT 1")
-            row = cur.fetchone()
-            prev_hash = row[0] if row else "GENESIS"
-
-            payload_str = canonical_json(
+        async with pool.connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                APPEND_SQL,
                 {
+                    "payload": event_payload(evt),
                     "event_type": evt.event_type,
                     "subject": evt.subject,
                     "decision": evt.decision,
-                    "details": evt.details,
-                }
-            )
-            entry_hash = sha256((prev_hash + "|" + payload_str).encode("utf-8")).hexdigest()
-
-            cur.execute(
-                """
-                INSERT INTO audit_log (event_type, subject, decision, details, prev_hash, entry_hash)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id, event_type, subject, decision, details, prev_hash, entry_hash, created_at
-                """,
-                (
-                    evt.event_type,
-                    evt.subject,
-                    evt.decision,
-                    psycopg_types.json.Json(evt.details),
-                    prev_hash,
-                    entry_hash,
-                ),
+                    "details": psycopg_types.json.Json(evt.details),
+                    "request_id": request_id,
+                    "shard": event_shard(evt),
+                },
+                prepare=True,
             )
-            r = cur.fetchone()
-            return {
-                "id": r[0],
-                "event_type": r[1],
-                "subject": r[2],
-                "decision": r[3],
-                "details": r[4],
-                "prev_hash": r[5],
-                "entry_hash": r[6],
-                "created_at": r[7].isoformat(),
-            }
+            r = await cur.fetchone()
     except Exception as e:
         _logger.error("log_event failed: %s", str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="audit_failed") from e
+    if r is None:
+        _logger.error("log_event failed: audit_chain_head row missing (run migrations)")
+        raise HTTPException(status_code=500, detail="audit_failed")
+    return _event_row(r)
+
+
+def _parse_batch(body: bytes, content_type: str) -> list[AuditIn]:
+    """Parse a JSON array or NDJSON body into validated events (HTTP errors on bad input)."""
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="invalid_json") from e
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="expected_non_empty_array")
+    if len(items) > AUDIT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"batch_too_large:max={AUDIT_BATCH_MAX}")
+    events = []
+    for i, item in enumerate(items):
+        try:
+            events.append(AuditIn.model_validate(item))
+        except ValidationError as e:
+            errors = [{**err, "loc": [i, *err["loc"]]} for err in e.errors(include_url=False)]
+            raise HTTPException(status_code=422, detail=errors) from e
+    return events
+
+
+def _chain_rows(
+    events: list[AuditIn],
+    request_ids: list[str | None],
+    shards: list[int],
+    ids: list[int],
+    heads: dict[int, str],
+) -> list[dict]:
+    """Assign ids and link every event to the previous one of its shard (advances `heads`)."""
+    rows = []
+    for row_id, evt, rid, shard in zip(ids, events, request_ids, shards, strict=True):
+        prev = heads[shard]
+        entry_hash = chain_hash(prev, event_payload(evt))
+        heads[shard] = entry_hash
+        rows.append(
+            {
+                "id": row_id,
+                "event_type": evt.event_type,
+                "subject": evt.subject,
+                "decision": evt.decision,
+                "details": evt.details,
+                "prev_hash": prev,
+                "entry_hash": entry_hash,
+                "request_id": rid,
+                "shard": shard,
+            }
+        )
+    return rows
+
+
+COPY_SQL = (
+    "COPY audit_log (id, event_type, subject, decision, details, prev_hash, entry_hash,"
+    " request_id, shard) FROM STDIN"
+)
+
+
+async def _append_chain(events: list[AuditIn], request_ids: list[str | None]) -> list[dict]:
+    """Chain `events` from their shards' heads in-process and write them with one COPY.
+
+    Returns the inserted rows in order. The heads involved are locked FOR UPDATE, in
+    shard order so concurrent batches cannot deadlock, for the whole transaction;
+    single-event appends and other batches queue behind them exactly as they do
+    behind each other. Ids are ascending in event order, so within every shard id
+    order is still chain order.
+    """
+    shards = [event_shard(evt) for evt in events]
+    async with pool.connection() as conn, conn.transaction(), conn.cursor() as cur:
+        await cur.execute(
+            "SELECT shard, entry_hash, now() FROM audit_chain_head WHERE shard = ANY(%s)"
+            " ORDER BY shard FOR UPDATE",
+            (sorted(set(shards)),),
+            prepare=True,
+        )
+        locked = await cur.fetchall()
+        if len(locked) != len(set(shards)):
+            raise RuntimeError("audit_chain_head row missing (run migrations)")
+        heads = {shard: entry_hash for shard, entry_hash, _ in locked}
+        created_at = locked[0][2].isoformat()
+        await cur.execute(
+            "SELECT nextval('audit_log_id_seq') FROM generate_series(1, %s)",
+            (len(events),),
+            prepare=True,
+        )
+        ids = sorted(r[0] for r in await cur.fetchall())
+        # Hashing a large batch takes milliseconds; keep it off the event loop.
+        rows = await run_in_threadpool(_chain_rows, events, request_ids, shards, ids, heads)
+
+        async with cur.copy(COPY_SQL) as copy:
+            for r in rows:
+                await copy.write_row(
+                    (
+                        r["id"],
+                        r["event_type"],
+                        r["subject"],
+                        r["decision"],
+                        canonical_json(r["details"]),
+                        r["prev_hash"],
+                        r["entry_hash"],
+                        r["request_id"],
+                        r["shard"],
+                    )
+                )
+
+        last = {r["shard"]: r for r in rows}
+        await cur.executemany(
+            """
+            UPDATE audit_chain_head
+               SET prev_hash = %s, entry_hash = %s, last_id = %s, updated_at = now()
+             WHERE shard = %s
+            """,
+            [(r["prev_hash"], r["entry_hash"], r["id"], shard) for shard, r in last.items()],
+        )
+    for r in rows:
+        r["created_at"] = created_at
+    return rows
+
+
+async def _append_batch(events: list[AuditIn], request_id: str | None) -> dict:
+    rows = await _append_chain(events, [request_id] * len(events))
+    return {
+        "count": len(rows),
+        "first_id": rows[0]["id"],
+        "last_id": rows[-1]["id"],
+        "prev_hash": rows[0]["prev_hash"],
+        "created_at": rows[0]["created_at"],
+        "entries": [
+            {"id": r["id"], "entry_hash": r["entry_hash"], "shard": r["shard"]} for r in rows
+        ],
+    }
+
+
+def _write_group(items: list[tuple[AuditIn, str | None]]) -> list[dict]:
+    """Runs on the writer thread: the append itself runs on the event loop's pool."""
+    assert _loop is not None
+    coro = _append_chain([evt for evt, _ in items], [rid for _, rid in items])
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+group_commit: GroupCommitWriter[tuple[AuditIn, str | None], dict] | None = (
+    GroupCommitWriter(
+        _write_group,
+        max_batch=AUDIT_GROUP_COMMIT_MAX_BATCH,
+        interval_ms=AUDIT_GROUP_COMMIT_INTERVAL_MS,
+        queue_depth=AUDIT_GROUP_COMMIT_QUEUE_DEPTH,
+    )
+    if AUDIT_GROUP_COMMIT
+    else None
+)
+
+
+async def _log_grouped(evt: AuditIn, request_id: str | None) -> dict:
+    """Append through the group-commit writer; returns once the shared commit is durable."""
+    assert group_commit is not None
+    try:
+        fut = group_commit.submit((evt, request_id))
+    except QueueFull as e:
+        _logger.warning("log_event rejected: %s", e)
+        raise HTTPException(status_code=503, detail="audit_queue_full") from e
+    try:
+        return await asyncio.wrap_future(fut)
+    except Exception as e:
+        _logger.error("log_event failed: %s", str(e))
+        raise HTTPException(status_code=500, detail="audit_failed") from e
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Chain sharding, group-commit, archive and connection-pool metrics in Prometheus text format."""
+    lines = [
+        "# TYPE audit_chain_shards gauge",
+        f"audit_chain_shards {AUDIT_CHAIN_SHARDS}",
+        "# TYPE audit_group_commit_enabled gauge",
+        f"audit_group_commit_enabled {int(group_commit is not None)}",
+    ]
+    if archive is not None:
+        lines += [
+            "# HELP audit_archive_segments Archived segments known to this replica.",
+            "# TYPE audit_archive_segments gauge",
+            f"audit_archive_segments {len(archive.segments)}",
+            "# HELP audit_archive_last_id Highest id served from archived segments.",
+            "# TYPE audit_archive_last_id gauge",
+            f"audit_archive_last_id {archive.watermark}",
+        ]
+    body = "\n".join(lines) + "\n" + render_pool_metrics(pool.stats())
+    if group_commit is not None:
+        body += render_metrics(group_commit.stats())
+    return body
+
+
+@app.post("/log/batch", response_model=AuditBatchOut)
+async def log_batch(request: Request):
+    """Append many events atomically: JSON array, or NDJSON with an ndjson content type."""
+    events = _parse_batch(await request.body(), request.headers.get("content-type", ""))
+    try:
+        return await _append_batch(events, _current_request_id())
+    except Exception as e:
+        _logger.error("log_batch failed: %s", str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail="audit_failed") from e
+
+
+def _event_filters(
+    before_id: int | None,
+    subject: str | None,
+    event_type: str | None,
+    decision: bool | None,
+    request_id: str | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+    before_created_at: datetime | None = None,
+) -> tuple[list[str], list]:
+    """WHERE conditions and parameters for /events; each maps onto a migration 0003 index.
+
+    With `before_created_at` (the cursor row's created_at) the cursor is the pair
+    (created_at, id), which pages in the order of the migration 0011 index.
+    Otherwise before_id is an id cursor: on id-ordered pages, and on time-ordered
+    pages that have moved on to the archive, which holds only ids below every
+    database row.
+    """
+    conds: list[str] = []
+    params: list = []
+    if before_created_at is not None and before_id is not None:
+        # The plain bound lets the planner prune partitions; the row comparison is the cursor.
+        conds += ["created_at <= %s", "(created_at, id) < (%s, %s)"]
+        params += [before_created_at, before_created_at, before_id]
+        before_id = None
+    for cond, value in (
+        ("id < %s", before_id),
+        ("subject = %s", subject),
+        ("event_type = %s", event_type),
+        ("decision = %s", decision),
+        ("request_id = %s", request_id),
+        ("created_at >= %s", created_from),
+        ("created_at < %s", created_to),
+    ):
+        if value is not None:
+            conds.append(cond)
+            params.append(value)
+    return conds, params
+
+
+def _next_cursor(rows: list[dict], limit: int, archive_cursor: int | None) -> int | None:
+    """X-Next-Cursor of a page: its last id when full, else where an archive scan stopped."""
+    if len(rows) == limit:
+        return rows[-1]["id"]
+    return archive_cursor
+
+
+async def _cursor_created_at(
+    cur: Any, before_id: int, created_from: datetime | None, created_to: datetime | None
+) -> datetime | None:
+    """created_at of the cursor row, or None if no row in the range has that id."""
+    conds, params = _event_filters(None, None, None, None, None, created_from, created_to)
+    where = "".join(f" AND {c}" for c in conds)
+    await cur.execute(
+        f"SELECT created_at FROM audit_log WHERE id = %s{where}", (before_id, *params)
+    )
+    row = await cur.fetchone()
+    return None if row is None else row[0]
 
 
 @app.get("/events", response_model=list[AuditEvent])
-def events(limit: int = Query(default=100, ge=1, le=1000), offset: int = Query(default=0, ge=0)):
+async def events(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0, le=10_000, description="Deprecated: use before_id"),
+    before_id: int | None = Query(default=None, ge=1, description="Keyset cursor (X-Next-Cursor)"),
+    subject: str | None = Query(default=None, max_length=500),
+    event_type: str | None = Query(default=None, max_length=200),
+    decision: bool | None = None,
+    request_id: str | None = Query(default=None, max_length=200),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    """Newest-first page of events. Pass the X-Next-Cursor header back as before_id.
+
+    created_from is inclusive and created_to exclusive (ISO 8601).
+
+    Keyset pagination on id keeps every page an index range scan; OFFSET is still
+    accepted for old clients but capped, since it reads and discards every skipped
+    row. ids and created_at are not in the same order, so with a created_at filter
+    the database rows are ordered by (created_at, id) instead and the cursor id
+    stands for its row's pair (migration 0011); a cursor that names no row in the
+    range is rejected rather than paged by id.
+    With AUDIT_ARCHIVE_DIR set, a page that runs past the rows kept in the database
+    continues in the archived segments, in id order; their ids are all below the
+    database rows', so a cursor at or below the archive watermark pages the archive.
+    Filtered reads there scan at most AUDIT_ARCHIVE_SCAN_ROWS rows per request, so
+    a page can come back short with X-Next-Cursor set to where the scan stopped.
+    """
+    by_time = created_from is not None or created_to is not None
     try:
-        with pool.connection() as conn, conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, event_type, subject, decision, details, prev_hash, entry_hash, created_at
-                FROM audit_log
-                ORDER BY id DESC
-                LIMIT %s OFFSET %s
-                """,
-                (limit, offset),
+        async with pool.connection() as conn, conn.cursor() as cur:
+            if archive is not None:
+                await archive.refresh(cur)
+            watermark = archive.watermark if archive is not None else 0
+            before_created_at = None
+            if by_time and before_id is not None and before_id > watermark:
+                before_created_at = await _cursor_created_at(
+                    cur, before_id, created_from, created_to
+                )
+                if before_created_at is None:
+                    raise HTTPException(status_code=400, detail="invalid_cursor")
+            conds, params = _event_filters(
+                before_id,
+                subject,
+                event_type,
+                decision,
+                request_id,
+                created_from,
+                created_to,
+                before_created_at,
             )
-            rows = cur.fetchall()
-            return [
-                {
-                    "id": r[0],
-                    "event_type": r[1],
-                    "subject": r[2],
-                    "decision": r[3],
-                    "details": r[4],
-                    "prev_hash": r[5],
-                    "entry_hash": r[6],
-                    "created_at": r[7].isoformat(),
-                }
-                for r in rows
-            ]
+            if watermark:
+                conds.append("id > %s")
+                params.append(watermark)
+            where = f"WHERE {' AND '.join(conds)}" if conds else ""
+            order = "created_at DESC, id DESC" if by_time else "id DESC"
+            await cur.execute(
+                f"SELECT {EVENT_COLUMNS} FROM audit_log {where}"  # fixed fragments only
+                f" ORDER BY {order} LIMIT %s OFFSET %s",
+                (*params, limit, offset),
+            )
+            rows = [_event_row(r) for r in await cur.fetchall()]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="list_failed") from e
+    cursor = None
+    if archive is not None and archive.watermark and len(rows) < limit and offset == 0:
+        filters = {
+            "subject": subject,
+            "event_type": event_type,
+            "decision": decision,
+            "request_id": request_id,
+            "created_from": created_from,
+            "created_to": created_to,
+        }
+        try:
+            cold, cursor = await run_in_threadpool(
+                archive.events, before_id, limit - len(rows), filters, AUDIT_ARCHIVE_SCAN_ROWS
+            )
+        except Exception as e:
+            _logger.error("archive read failed: %s", str(e), exc_info=True)
+            raise HTTPException(status_code=500, detail="archive_read_failed") from e
+        rows.extend(cold)
+    cursor = _next_cursor(rows, limit, cursor)
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = str(cursor)
+    return rows
 
 
-@app.get("/export")
-def export(fmt: str = Query(default="json", pattern="^(json|csv)$")):
+@app.get("/events/search", response_model=list[AuditEvent])
+async def search_events(
+    response: Response,
+    contains: str | None = Query(
+        default=None, max_length=4000, description="JSON object details must contain"
+    ),
+    eq: Sequence[str] = Query(default=(), description="details path equality, e.g. a.b=x"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    before_id: int | None = Query(default=None, ge=1, description="Keyset cursor (X-Next-Cursor)"),
+    subject: str | None = Query(default=None, max_length=500),
+    event_type: str | None = Query(default=None, max_length=200),
+    decision: bool | None = None,
+    request_id: str | None = Query(default=None, max_length=200),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    """Newest-first events whose details match JSONB containment and/or path equality.
+
+    Every request needs at least one details filter the GIN index (migration 0010)
+    can answer; the /events filters narrow it further. Searches rows still in the
+    database only and give up after AUDIT_SEARCH_TIMEOUT_MS.
+    """
+    try:
+        details_conds, details_params = details_conditions(contains, list(eq))
+    except SearchError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    conds, params = _event_filters(
+        before_id, subject, event_type, decision, request_id, created_from, created_to
+    )
+    where = " AND ".join(details_conds + conds)
     try:
-        with pool.connection() as conn, conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, event_type, subject, decision, details, prev_hash, entry_hash, created_at FROM audit_log ORDER BY id ASC"
+        async with pool.connection() as conn, conn.transaction(), conn.cursor() as cur:
+            await cur.execute(
+                "SELECT set_config('statement_timeout', %s, true)", (str(AUDIT_SEARCH_TIMEOUT_MS),)
             )
-            rows = cur.fetchall()
-            data = [
-                {
-                    "id": r[0],
-                    "event_type": r[1],
-                    "subject": r[2],
-                    "decision": r[3],
-                    "details": r[4],
-                    "prev_hash": r[5],
-                    "entry_hash": r[6],
-                    "created_at": r[7].isoformat(),
-                }
-                for r in rows
-            ]
-        if fmt == "json":
-            import json
-
-            return Response(content=json.dumps(data), media_type="application/json")
-        else:
-            buf = io.StringIO()
-            writer = csv.DictWriter(
-                buf,
-                fieldnames=[
-                    "id",
-                    "event_type",
-                    "subject",
-                    "decision",
-                    "details",
-                    "prev_hash",
-                    "entry_hash",
-                    "created_at",
-                ],
+            await cur.execute(
+                f"SELECT {EVENT_COLUMNS} FROM audit_log WHERE {where}"  # fixed fragments only
+                " ORDER BY id DESC LIMIT %s",
+                (*details_params, *params, limit),
             )
-            writer.writeheader()
-            for row in data:
-                row = {**row, "details": canonical_json(row["details"])}
-                writer.writerow(row)
-            return Response(content=buf.getvalue(), media_type="text/csv")
+            rows = await cur.fetchall()
+    except psycopg.errors.QueryCanceled as e:
+        raise HTTPException(status_code=503, detail="search_timeout") from e
+    except Exception as e:
+        _logger.error("search_events failed: %s", str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail="search_failed") from e
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1][0])
+    return [_event_row(r) for r in rows]
+
+
+EXPORT_FIELDS = (
+    "id",
+    "event_type",
+    "subject",
+    "decision",
+    "details",
+    "prev_hash",
+    "entry_hash",
+    "created_at",
+    "request_id",
+    "shard",
+)
+
+
+def _export_json(rows: list, first: bool) -> str:
+    body = ",".join(json.dumps(_event_row(r)) for r in rows)
+    return body if first else "," + body
+
+
+def _export_ndjson(rows: list, first: bool) -> str:
+    return "".join(json.dumps(_event_row(r)) + "\n" for r in rows)
+
+
+def _export_csv(rows: list, first: bool) -> str:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS)
+    for r in rows:
+        row = _event_row(r)
+        writer.writerow({**row, "details": canonical_json(row["details"])})
+    return buf.getvalue()
+
+
+def _csv_header() -> str:
+    buf = io.StringIO()
+    csv.DictWriter(buf, fieldnames=EXPORT_FIELDS).writeheader()
+    return buf.getvalue()
+
+
+class _TextExport:
+    """Text encoder: fixed opening and closing text around per-chunk formatted rows."""
+
+    def __init__(self, opening: str, format_chunk: Callable[[list, bool], str], closing: str):
+        self.opening = opening
+        self.format_chunk = format_chunk
+        self.closing = closing
+        self._first = True
+
+    def begin(self) -> str:
+        return self.opening
+
+    def write(self, rows: list) -> str:
+        out = self.format_chunk(rows, self._first)
+        self._first = False
+        return out
+
+    def end(self) -> str:
+        return self.closing
+
+
+# fmt -> (media type, encoder factory); encoders expose begin(), write(rows) and end()
+_EXPORT_FORMATS: dict[str, tuple[str, Callable[[], Any]]] = {
+    "json": ("application/json", lambda: _TextExport("[", _export_json, "]")),
+    "ndjson": ("application/x-ndjson", lambda: _TextExport("", _export_ndjson, "")),
+    "csv": ("text/csv", lambda: _TextExport(_csv_header(), _export_csv, "")),
+    "parquet": ("application/vnd.apache.parquet", lambda: ColumnarExport("parquet")),
+    "arrow": ("application/vnd.apache.arrow.stream", lambda: ColumnarExport("arrow")),
+}
+_COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+async def _export_stream(
+    fmt: str,
+    since_id: int,
+    until_id: int | None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> AsyncIterator[str | bytes]:
+    """Yield the export in chunks of AUDIT_EXPORT_CHUNK_ROWS rows.
+
+    Rows come from a named (server-side) cursor, so only one chunk is ever held in
+    memory. Columnar formats fetch AUDIT_EXPORT_ROW_GROUP_ROWS rows at a time and
+    encode each fetch as one Parquet row group or Arrow record batch. Chunks are
+    encoded in a worker thread to keep the event loop free. The first item is
+    yielded right after the query starts, which lets the caller surface connection
+    and query errors before the response is committed.
+
+    With several chain shards, rows commit out of id order; the export stops at the
+    committed-id watermark so that `since_id` resumption never skips a late commit.
+    A created_at range only scans the monthly partitions it overlaps.
+    """
+    encoder = _EXPORT_FORMATS[fmt][1]()
+    chunk_rows = (
+        AUDIT_EXPORT_ROW_GROUP_ROWS if fmt in _COLUMNAR_FORMATS else AUDIT_EXPORT_CHUNK_ROWS
+    )
+    async with pool.connection() as conn:
+        if AUDIT_CHAIN_SHARDS > 1:
+            watermark = (await snapshot_heads_async(conn))[1]
+            until_id = watermark if until_id is None else min(until_id, watermark)
+        conds = ["id > %s"]
+        params: list = [since_id]
+        for cond, value in (
+            ("id <= %s", until_id),
+            ("created_at >= %s", created_from),
+            ("created_at < %s", created_to),
+        ):
+            if value is not None:
+                conds.append(cond)
+                params.append(value)
+        sql = f"SELECT {EVENT_COLUMNS} FROM audit_log WHERE {' AND '.join(conds)} ORDER BY id"
+        async with conn.transaction(), conn.cursor(name="audit_export") as cur:
+            cur.itersize = chunk_rows
+            await cur.execute(sql, params)
+            yield encoder.begin()
+            while rows := await cur.fetchmany(chunk_rows):
+                yield await run_in_threadpool(encoder.write, rows)
+    yield encoder.end()
+
+
+async def _prepend(
+    head: str | bytes, rest: AsyncIterator[str | bytes]
+) -> AsyncIterator[str | bytes]:
+    yield head
+    async for item in rest:
+        yield item
+
+
+async def _archived_entries(first_id: int, last_id: int) -> list[tuple[int, str]] | None:
+    if archive is None or last_id > archive.watermark:
+        return None
+    return await run_in_threadpool(archive.entries, first_id, last_id)
+
+
+@app.get("/events/{event_id}/proof")
+async def event_proof(event_id: int):
+    """Merkle inclusion proof of one event against the latest checkpoint root."""
+    try:
+        async with pool.connection() as conn, conn.cursor() as cur:
+            if archive is not None:
+                await archive.refresh(cur)
+            return await inclusion_proof(cur, event_id, _archived_entries)
+    except ProofError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except Exception as e:
+        _logger.error("event_proof failed: %s", str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail="proof_failed") from e
+
+
+@app.get("/merkle/root")
+async def merkle_root():
+    """Latest Merkle checkpoint; publish `root` out of band so proofs can be checked against it."""
+    try:
+        async with pool.connection() as conn, conn.cursor() as cur:
+            checkpoint = await latest_checkpoint(cur)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="checkpoint_failed") from e
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="no_checkpoint")
+    return checkpoint
+
+
+@app.get("/stats")
+async def stats(
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    event_type: str | None = Query(default=None, max_length=200),
+):
+    """Allowed/denied counts per hour and event_type, read from the hourly rollup.
+
+    The range defaults to the last 24 hours and is widened to whole UTC hours
+    (created_from inclusive, created_to exclusive).
+    """
+    end = created_to or datetime.now(UTC)
+    start = created_from or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="invalid_range")
+    if end - start > timedelta(hours=AUDIT_STATS_MAX_HOURS):
+        raise HTTPException(
+            status_code=400, detail=f"range_too_large:max_hours={AUDIT_STATS_MAX_HOURS}"
+        )
+    try:
+        async with pool.connection() as conn, conn.cursor() as cur:
+            return await rollup_stats(cur, start, end, event_type)
+    except Exception as e:
+        _logger.error("stats failed: %s", str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail="stats_failed") from e
+
+
+@app.get("/export")
+async def export(
+    fmt: str = Query(default="json", pattern="^(json|csv|ndjson|parquet|arrow)$"),
+    since_id: int = Query(default=0, ge=0, description="Exclusive lower id bound"),
+    until_id: int | None = Query(default=None, ge=0, description="Inclusive upper id bound"),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    """Stream events in id order; `since_id`/`until_id` select a range for incremental exports.
+
+    created_from (inclusive) and created_to (exclusive) restrict the export to a time
+    range, which prunes the scan to the matching monthly partitions.
+    `parquet` and `arrow` (IPC stream) are columnar and need pyarrow on the server.
+    """
+    if fmt in _COLUMNAR_FORMATS and not columnar_available():
+        raise HTTPException(status_code=501, detail="pyarrow_not_installed")
+    stream = _export_stream(fmt, since_id, until_id, created_from, created_to)
+    try:
+        head = await anext(stream)
     except Exception as e:
+        _logger.error("export failed: %s", str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="export_failed") from e
+    return StreamingResponse(_prepend(head, stream), media_type=_EXPORT_FORMATS[fmt][0])
+
+
+def _run_verify(full: bool) -> dict[str, Any]:
+    return verify_chain(
+        DATABASE_URL,
+        full=full,
+        workers=AUDIT_VERIFY_WORKERS,
+        segment_rows=AUDIT_VERIFY_SEGMENT_ROWS,
+    )
+
+
+verify_jobs = VerifyJobs(_run_verify)
+
+
+@app.post("/verify", status_code=202)
+async def verify(
+    full: bool = Query(default=False, description="Ignore checkpoints, start at GENESIS")
+):
+    """Start re-hashing the chain from the latest checkpoint (or from the start) in the background.
+
+    Poll GET /verify for the result.
+    """
+    job, started = verify_jobs.start(full)
+    if not started:
+        raise HTTPException(status_code=409, detail="verify_in_progress")
+    return job
+
+
+@app.get("/verify")
+async def verify_status():
+    """State of the latest verification job; `report` is set once it is done."""
+    job = verify_jobs.status()
+    if job is None:
+        raise HTTPException(status_code=404, detail="no_verify_job")
+    return job
@@ -0,0 +1,635 @@
+"""Cold-tier archive of `audit_log` in compressed segment files (migration 0009).
+
+A segment holds a consecutive run of sealed Merkle blocks whose rows are all
+older than the retention window. Rows are stored as NDJSON (canonical JSON, one
+event per line) compressed with zstd, one independent frame per block. A
+fixed-width index next to it maps each block's id range to its frame's byte
+offset: it is small enough to mmap and is searched by bisection, so reading
+one event decompresses one block. File names carry a sha256 prefix of the data
+file, and the catalog row in `audit_archive_segments` pins both files' hashes.
+
+Rows are checked as they are written: each one must re-hash to its entry_hash
+and link to the previous row of its shard, starting from the heads recorded
+with the previous segment. The catalog keeps every shard's boundary hashes, so
+`audit_chain.verify_chain` continues the database part of each chain from the
+archived head and `verify_segment` re-checks a file against its catalog row.
+Once every row of a monthly partition is archived, `drop_archived_partitions`
+detaches and drops it; row-level DELETE stays forbidden.
+
+zstandard is imported on first use: the service only needs it when
+AUDIT_ARCHIVE_DIR is set.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from hashlib import sha256
+from pathlib import Path
+from typing import Any
+
+from audit_chain import canonical_json, chain_hash, genesis, payload
+
+INDEX_MAGIC = b"AUDITIX1"
+# One record per frame (= one Merkle block): first_id, last_id, byte offset, byte length.
+INDEX_RECORD = struct.Struct("<qqQQ")
+DATA_SUFFIX = ".ndjson.zst"
+INDEX_SUFFIX = ".idx"
+
+# pg_try_advisory_lock key: one archiver at a time.
+ARCHIVE_LOCK_KEY = 0x61726368697665  # "archive"
+
+ROW_FIELDS = (
+    "id",
+    "event_type",
+    "subject",
+    "decision",
+    "details",
+    "prev_hash",
+    "entry_hash",
+    "created_at",
+    "request_id",
+    "shard",
+)
+ROWS_SQL = (
+    f"SELECT {', '.join(ROW_FIELDS)} FROM audit_log" " WHERE id > %s AND id <= %s ORDER BY id"
+)
+CATALOG_SQL = (
+    "SELECT segment_no, first_id, last_id, rows, first_block_no, last_block_no,"
+    " min_created_at, max_created_at, file_name, file_sha256, file_bytes, index_sha256,"
+    " shards, heads FROM audit_archive_segments WHERE segment_no > %s ORDER BY segment_no"
+)
+# Upper bound of every audit_log partition; NULL for MAXVALUE.
+PARTITIONS_SQL = r"""
+SELECT c.relname,
+       (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \(''([^'']+)''\)'))[1]::timestamptz,
+       i.inhdetachpending
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'audit_log'::regclass
+ORDER BY 2 NULLS LAST
+"""
+
+# shard -> (last_id, entry_hash)
+Heads = dict[int, tuple[int, str]]
+
+
+class ArchiveError(RuntimeError):
+    """A segment cannot be written, or a file does not match its catalog row."""
+
+
+class ArchiveUnavailable(RuntimeError):
+    """zstandard is not installed."""
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ArchiveUnavailable("zstandard is required for the audit archive") from e
+    return zstandard
+
+
+def _utc(ts: datetime) -> datetime:
+    return ts.astimezone(UTC) if ts.tzinfo else ts.replace(tzinfo=UTC)
+
+
+def row_dict(row: Any) -> dict[str, Any]:
+    """Event dict of a row selected in ROW_FIELDS order, as /events returns it."""
+    event = dict(zip(ROW_FIELDS, row, strict=True))
+    event["created_at"] = _utc(event["created_at"]).isoformat()
+    return event
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    """One `audit_archive_segments` row."""
+
+    segment_no: int
+    first_id: int
+    last_id: int
+    rows: int
+    first_block_no: int
+    last_block_no: int
+    min_created_at: datetime
+    max_created_at: datetime
+    file_name: str
+    file_sha256: str
+    file_bytes: int
+    index_sha256: str
+    shards: dict[str, Any]
+    heads: list[list[Any]]
+
+    @property
+    def end_heads(self) -> Heads:
+        return {int(s): (int(i), str(h)) for s, i, h in self.heads}
+
+
+class _ChainCheck:
+    """Re-hashes events in id order and links each to the previous event of its shard."""
+
+    def __init__(self, heads: Heads):
+        self.heads = dict(heads)
+        self.shards: dict[str, dict[str, Any]] = {}
+
+    def add(self, event: dict[str, Any]) -> str | None:
+        """Advance the shard's head; returns the break reason, if any."""
+        shard = event["shard"]
+        prev = self.heads.get(shard, (0, genesis(shard)))[1]
+        reason = None
+        if event["prev_hash"] != prev:
+            reason = "prev_hash_mismatch"
+        elif (
+            chain_hash(
+                event["prev_hash"],
+                payload(event["event_type"], event["subject"], event["decision"], event["details"]),
+            )
+            != event["entry_hash"]
+        ):
+            reason = "entry_hash_mismatch"
+        self.heads[shard] = (event["id"], event["entry_hash"])
+        own = self.shards.setdefault(
+            str(shard), {"rows": 0, "first_id": event["id"], "first_prev_hash": event["prev_hash"]}
+        )
+        own["rows"] += 1
+        own["last_id"] = event["id"]
+        own["last_entry_hash"] = event["entry_hash"]
+        return reason
+
+    def head_list(self) -> list[list[Any]]:
+        return [[shard, last_id, h] for shard, (last_id, h) in sorted(self.heads.items())]
+
+
+class SegmentWriter:
+    """Writes one segment file and its index: `add_block` per sealed block, then `finish`."""
+
+    def __init__(self, directory: Path, heads: Heads, level: int = 10):
+        self.directory = directory
+        self._compressor = _zstd().ZstdCompressor(level=level)
+        self._check = _ChainCheck(heads)
+        self._tmp = directory / f".segment-{uuid.uuid4().hex}.tmp"
+        self._data = open(self._tmp, "wb")  # noqa: SIM115 (finish/abort close it)
+        self._sha = sha256()
+        self._offset = 0
+        self._index = bytearray(INDEX_MAGIC)
+        self.rows = 0
+        self.blocks: list[int] = []
+        self.first_id: int | None = None
+        self.last_id: int | None = None
+        self.min_created_at: datetime | None = None
+        self.max_created_at: datetime | None = None
+
+    def add_block(self, block_no: int, rows: list[Any]) -> None:
+        """Append one block's rows (ROW_FIELDS order, id order) as one frame."""
+        lines = []
+        for row in rows:
+            created_at = _utc(row[7])
+            event = row_dict(row)
+            reason = self._check.add(event)
+            if reason is not None:
+                raise ArchiveError(f"chain break at id {event['id']}: {reason}")
+            lines.append(canonical_json(event) + "\n")
+            if self.min_created_at is None or created_at < self.min_created_at:
+                self.min_created_at = created_at
+            if self.max_created_at is None or created_at > self.max_created_at:
+                self.max_created_at = created_at
+        frame = self._compressor.compress("".join(lines).encode("utf-8"))
+        self._data.write(frame)
+        self._sha.update(frame)
+        self._index += INDEX_RECORD.pack(rows[0][0], rows[-1][0], self._offset, len(frame))
+        self._offset += len(frame)
+        self.rows += len(rows)
+        self.blocks.append(block_no)
+        if self.first_id is None:
+            self.first_id = rows[0][0]
+        self.last_id = rows[-1][0]
+
+    def finish(self) -> dict[str, Any]:
+        """Make the files durable under their final names; returns the catalog row."""
+        if not self.blocks:
+            raise ArchiveError("empty segment")
+        assert self.first_id is not None and self.last_id is not None
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._data.close()
+        digest = self._sha.hexdigest()
+        name = f"audit-{self.first_id:020d}-{self.last_id:020d}-{digest[:16]}"
+        index_tmp = self.directory / f".{name}{INDEX_SUFFIX}.tmp"
+        with open(index_tmp, "wb") as f:
+            f.write(self._index)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_tmp, self.directory / f"{name}{INDEX_SUFFIX}")
+        os.replace(self._tmp, self.directory / f"{name}{DATA_SUFFIX}")
+        _fsync_dir(self.directory)
+        return {
+            "first_id": self.first_id,
+            "last_id": self.last_id,
+            "rows": self.rows,
+            "first_block_no": self.blocks[0],
+            "last_block_no": self.blocks[-1],
+            "min_created_at": self.min_created_at,
+            "max_created_at": self.max_created_at,
+            "file_name": name,
+            "file_sha256": digest,
+            "file_bytes": self._offset,
+            "index_sha256": sha256(self._index).hexdigest(),
+            "shards": self._check.shards,
+            "heads": self._check.head_list(),
+        }
+
+    def abort(self) -> None:
+        self._data.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SegmentReader:
+    """Random access to one segment through its mmap'd index. Safe to share between threads."""
+
+    def __init__(self, directory: Path, file_name: str):
+        with open(directory / f"{file_name}{INDEX_SUFFIX}", "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._index[: len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self._index.close()
+            raise ArchiveError(f"{file_name}: not a segment index")
+        self.frames = (len(self._index) - len(INDEX_MAGIC)) // INDEX_RECORD.size
+        self._fd = os.open(directory / f"{file_name}{DATA_SUFFIX}", os.O_RDONLY)
+
+    def close(self) -> None:
+        self._index.close()
+        os.close(self._fd)
+
+    def frame(self, i: int) -> tuple[int, int, int, int]:
+        """(first_id, last_id, offset, length) of frame i."""
+        first_id, last_id, offset, length = INDEX_RECORD.unpack_from(
+            self._index, len(INDEX_MAGIC) + i * INDEX_RECORD.size
+        )
+        return first_id, last_id, offset, length
+
+    def find_frame(self, event_id: int) -> int:
+        """Index of the first frame whose last_id >= event_id (`frames` if none)."""
+        lo, hi = 0, self.frames
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.frame(mid)[1] < event_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def read_frame(self, i: int) -> list[dict[str, Any]]:
+        _, _, offset, length = self.frame(i)
+        data = _zstd().ZstdDecompressor().decompress(os.pread(self._fd, length, offset))
+        return [json.loads(line) for line in data.splitlines()]
+
+
+def _matches(event: dict[str, Any], filters: dict[str, Any]) -> bool:
+    for key in ("subject", "event_type", "decision", "request_id"):
+        if filters.get(key) is not None and event[key] != filters[key]:
+            return False
+    if filters.get("created_from") is not None or filters.get("created_to") is not None:
+        created_at = datetime.fromisoformat(event["created_at"])
+        if filters.get("created_from") is not None and created_at < _utc(filters["created_from"]):
+            return False
+        if filters.get("created_to") is not None and created_at >= _utc(filters["created_to"]):
+            return False
+    return True
+
+
+class Archive:
+    """Read side for mcp-audit: cached segment catalog plus lazily opened readers.
+
+    Every id up to `watermark` is served from segment files and everything
+    above it from the database, so a query sees each row exactly once even
+    while archived partitions still exist. The catalog is append-only; it is
+    re-read at most every `refresh_s` seconds.
+    """
+
+    def __init__(self, directory: str | Path, refresh_s: float = 60.0):
+        _zstd()  # fail at startup, not on the first cold read
+        self.directory = Path(directory)
+        self.refresh_s = refresh_s
+        self.segments: list[SegmentInfo] = []
+        self._refreshed_at = float("-inf")
+        self._readers: dict[int, SegmentReader] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def watermark(self) -> int:
+        return self.segments[-1].last_id if self.segments else 0
+
+    async def refresh(self, cur: Any) -> None:
+        """Pick up segments added since the last refresh (async cursor)."""
+        if time.monotonic() - self._refreshed_at < self.refresh_s:
+            return
+        await cur.execute("SELECT to_regclass('audit_archive_segments') IS NOT NULL")
+        row = await cur.fetchone()
+        if row is not None and row[0]:
+            last = self.segments[-1].segment_no if self.segments else -1
+            await cur.execute(CATALOG_SQL, (last,))
+            self.segments = self.segments + [SegmentInfo(*r) for r in await cur.fetchall()]
+        self._refreshed_at = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+
+    def reader(self, segment: SegmentInfo) -> SegmentReader:
+        with self._lock:
+            reader = self._readers.get(segment.segment_no)
+            if reader is None:
+                reader = SegmentReader(self.directory, segment.file_name)
+                self._readers[segment.segment_no] = reader
+            return reader
+
+    def _segment_index(self, event_id: int) -> int:
+        """Index of the first segment whose last_id >= event_id."""
+        lo, hi = 0, len(self.segments)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.segments[mid].last_id < event_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def entries(self, first_id: int, last_id: int) -> list[tuple[int, str]]:
+        """(id, entry_hash) of the archived rows with first_id <= id <= last_id."""
+        out: list[tuple[int, str]] = []
+        for segment in self.segments[self._segment_index(first_id) :]:
+            if segment.first_id > last_id:
+                break
+            reader = self.reader(segment)
+            for i in range(reader.find_frame(first_id), reader.frames):
+                if reader.frame(i)[0] > last_id:
+                    break
+                out.extend(
+                    (e["id"], e["entry_hash"])
+                    for e in reader.read_frame(i)
+                    if first_id <= e["id"] <= last_id
+                )
+        return out
+
+    def events(
+        self, before_id: int | None, limit: int, filters: dict[str, Any], scan_rows: int
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """Newest-first archived events with id < before_id that match `filters`.
+
+        Segments outside the created_from/created_to range are skipped without
+        being read. Reads at most about `scan_rows` rows: if that budget runs out
+        before the page is full, returns the id to resume from (pass it as
+        before_id); otherwise the second element is None.
+        """
+        before = self.watermark + 1 if before_id is None else min(before_id, self.watermark + 1)
+        created_from = filters.get("created_from")
+        created_to = filters.get("created_to")
+        out: list[dict[str, Any]] = []
+        scanned = 0
+        for s in range(min(self._segment_index(before), len(self.segments) - 1), -1, -1):
+            segment = self.segments[s]
+            if created_to is not None and segment.min_created_at >= _utc(created_to):
+                continue
+            if created_from is not None and segment.max_created_at < _utc(created_from):
+                continue
+            reader = self.reader(segment)
+            for i in range(min(reader.find_frame(before), reader.frames - 1), -1, -1):
+                first_id = reader.frame(i)[0]
+                if first_id >= before:
+                    continue
+                frame = reader.read_frame(i)
+                for event in reversed(frame):
+                    if event["id"] < before and _matches(event, filters):
+                        out.append(event)
+                        if len(out) == limit:
+                            return out, None
+                scanned += len(frame)
+                if scanned >= scan_rows and (s > 0 or i > 0):
+                    return out, first_id
+        return out, None
+
+
+def _file_problems(directory: Path, segment: SegmentInfo) -> list[str]:
+    data_path = directory / f"{segment.file_name}{DATA_SUFFIX}"
+    index_path = directory / f"{segment.file_name}{INDEX_SUFFIX}"
+    if not data_path.exists() or not index_path.exists():
+        return ["missing_file"]
+    problems = []
+    digest = sha256()
+    with open(data_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    if digest.hexdigest() != segment.file_sha256:
+        problems.append("file_sha256_mismatch")
+    if sha256(index_path.read_bytes()).hexdigest() != segment.index_sha256:
+        problems.append("index_sha256_mismatch")
+    return problems
+
+
+def verify_segment(directory: Path, segment: SegmentInfo, heads: Heads) -> list[str]:
+    """Problems found re-checking one segment against its catalog row (empty when clean).
+
+    `heads` are the chain heads before the segment: the previous segment's
+    `end_heads`, or {} for the first one. The files' hashes are checked first;
+    then every row is re-hashed and linked, and the shard boundaries and end
+    heads are compared with the catalog.
+    """
+    problems = _file_problems(directory, segment)
+    if problems:
+        return problems
+    check = _ChainCheck(heads)
+    reader = SegmentReader(directory, segment.file_name)
+    rows = 0
+    try:
+        if reader.frames != segment.last_block_no - segment.first_block_no + 1:
+            problems.append("block_count_mismatch")
+        for i in range(reader.frames):
+            first_id, last_id, _, _ = reader.frame(i)
+            events = reader.read_frame(i)
+            if not events or events[0]["id"] != first_id or events[-1]["id"] != last_id:
+                problems.append(f"index_mismatch:frame={i}")
+            for event in events:
+                reason = check.add(event)
+                if reason is not None:
+                    problems.append(f"{reason}:id={event['id']}")
+            rows += len(events)
+    finally:
+        reader.close()
+    if rows != segment.rows:
+        problems.append("row_count_mismatch")
+    if check.shards != segment.shards:
+        problems.append("shard_boundaries_mismatch")
+    if check.head_list() != segment.heads:
+        problems.append("heads_mismatch")
+    return problems
+
+
+def load_catalog(conn: Any) -> list[SegmentInfo]:
+    with conn.cursor() as cur:
+        cur.execute(CATALOG_SQL, (-1,))
+        return [SegmentInfo(*r) for r in cur.fetchall()]
+
+
+def archive_once(
+    conn: Any, directory: Path, cutoff: datetime, max_rows: int, level: int = 10
+) -> dict[str, Any] | None:
+    """Write the next segment and record it in the catalog.
+
+    The segment takes sealed Merkle blocks in order, starting right after the
+    newest segment, while every row of a block is older than `cutoff` and the
+    segment stays within `max_rows`. Returns the catalog row, or None when no
+    block qualified. `conn` must be in autocommit mode.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_lock(%s)", (ARCHIVE_LOCK_KEY,))
+        locked = cur.fetchone()
+        if locked is None or not locked[0]:
+            raise ArchiveError("another archiver is running")
+    try:
+        return _archive_once(conn, directory, _utc(cutoff), max(1, max_rows), level)
+    finally:
+        conn.execute("SELECT pg_advisory_unlock(%s)", (ARCHIVE_LOCK_KEY,))
+
+
+def _next_blocks(conn: Any, after_block_no: int, max_rows: int) -> list[tuple[int, int, int, int]]:
+    """(block_no, first_id, last_id, size) of the sealed blocks after `after_block_no`,
+    as many as fit in max_rows (at least one)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT block_no, first_id, last_id, size FROM audit_merkle_blocks"
+            " WHERE block_no > %s ORDER BY block_no LIMIT %s",
+            (after_block_no, max_rows),
+        )
+        blocks: list[tuple[int, int, int, int]] = []
+        total = 0
+        for block in cur.fetchall():
+            if blocks and total + block[3] > max_rows:
+                break
+            blocks.append(block)
+            total += block[3]
+    return blocks
+
+
+def _iter_blocks(
+    rows: Iterator[Any], blocks: list[tuple[int, int, int, int]]
+) -> Iterator[tuple[int, list[Any]]]:
+    """Group id-ordered rows into `blocks`, checking each block is complete."""
+    pending = next(rows, None)
+    for block_no, first_id, last_id, size in blocks:
+        block_rows = []
+        while pending is not None and pending[0] <= last_id:
+            block_rows.append(pending)
+            pending = next(rows, None)
+        if len(block_rows) != size or block_rows[0][0] != first_id:
+            raise ArchiveError(f"merkle block {block_no} does not match audit_log")
+        yield block_no, block_rows
+
+
+def _archive_once(
+    conn: Any, directory: Path, cutoff: datetime, max_rows: int, level: int
+) -> dict[str, Any] | None:
+    catalog = load_catalog(conn)
+    last = catalog[-1] if catalog else None
+    blocks = _next_blocks(conn, last.last_block_no if last else -1, max_rows)
+    if not blocks:
+        return None
+    after_id = last.last_id if last else 0
+    if blocks[0][1] <= after_id:
+        raise ArchiveError(f"block {blocks[0][0]} overlaps the archived ids (<= {after_id})")
+
+    writer = SegmentWriter(directory, last.end_heads if last else {}, level)
+    try:
+        with conn.transaction(), conn.cursor(name="audit_archive") as cur:
+            cur.itersize = 5000
+            cur.execute(ROWS_SQL, (after_id, blocks[-1][2]))
+            for block_no, block_rows in _iter_blocks(iter(cur), blocks):
+                if max(_utc(r[7]) for r in block_rows) >= cutoff:
+                    break
+                writer.add_block(block_no, block_rows)
+        if not writer.blocks:
+            writer.abort()
+            return None
+        info = writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+
+    info["segment_no"] = last.segment_no + 1 if last else 0
+    with conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO audit_archive_segments (segment_no, first_id, last_id, rows,"
+            " first_block_no, last_block_no, min_created_at, max_created_at, file_name,"
+            " file_sha256, file_bytes, index_sha256, shards, heads)"
+            " VALUES (%(segment_no)s, %(first_id)s, %(last_id)s, %(rows)s, %(first_block_no)s,"
+            " %(last_block_no)s, %(min_created_at)s, %(max_created_at)s, %(file_name)s,"
+            " %(file_sha256)s, %(file_bytes)s, %(index_sha256)s, %(shards_json)s,"
+            " %(heads_json)s)",
+            {
+                **info,
+                "shards_json": canonical_json(info["shards"]),
+                "heads_json": canonical_json(info["heads"]),
+            },
+        )
+    return info
+
+
+def drop_archived_partitions(
+    conn: Any, cutoff: datetime, grace: timedelta
+) -> list[tuple[str, datetime, int | None]]:
+    """Detach and drop the audit_log partitions whose rows are all archived.
+
+    A partition qualifies when its upper bound is at or before `cutoff`, so no
+    new row can land in it, and its highest id is covered by segments recorded
+    at least `grace` ago. The grace period lets services pick the segments up
+    (AUDIT_ARCHIVE_REFRESH_S) before the rows leave the database. Partitions
+    are detached CONCURRENTLY, so `conn` must be in autocommit mode. Returns
+    (name, upper bound, highest id) of every dropped partition.
+    """
+    from psycopg import sql
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT coalesce(max(last_id), 0) FROM audit_archive_segments"
+            " WHERE created_at <= now() - %s",
+            (grace,),
+        )
+        row = cur.fetchone()
+        watermark = int(row[0]) if row else 0
+        cur.execute(PARTITIONS_SQL)
+        partitions = cur.fetchall()
+    dropped = []
+    for name, upper, detach_pending in partitions:
+        if upper is None or upper > _utc(cutoff):
+            break
+        table = sql.Identifier(name)
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("SELECT max(id) FROM {}").format(table))
+            top = cur.fetchone()
+            if top is not None and top[0] is not None and top[0] > watermark:
+                continue
+            if detach_pending:  # a previous run was interrupted mid-detach
+                cur.execute(
+                    sql.SQL("ALTER TABLE audit_log DETACH PARTITION {} FINALIZE").format(table)
+                )
+            else:
+                cur.execute(
+                    sql.SQL("ALTER TABLE audit_log DETACH PARTITION {} CONCURRENTLY").format(table)
+                )
+            cur.execute(sql.SQL("DROP TABLE {}").format(table))
+        dropped.append((name, upper, top[0] if top else None))
+    return dropped
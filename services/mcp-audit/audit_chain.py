@@ -0,0 +1,501 @@
+"""Hash-chain primitives and a parallel, resumable verifier for `audit_log`.
+
+Every entry stores `entry_hash = sha256(prev_hash + "|" + payload)`, where
+`payload` is the canonical JSON of its hashed fields and `prev_hash` is the
+previous entry's `entry_hash`. In sharded mode every shard is an independent
+chain. Shard 0 starts from "GENESIS" and shard n from "GENESIS:<n>". Each
+`audit_chain_head` row is the head of one shard.
+
+Verification splits the id range into segments and re-hashes each one in a
+process pool. Each worker opens its own connection and streams its rows
+through a server-side cursor. A segment is only internally consistent on its
+own, so the parent stitches the results together: a segment's first
+`prev_hash` must equal the `entry_hash` that ends the segment before it. A
+clean run records a checkpoint (last id and hash) per shard. The next run
+starts from those checkpoints and only re-hashes rows appended since. Rows
+moved to the cold-tier archive are replaced by the chain heads recorded with
+the newest segment, which the database part of each chain must continue.
+
+Shards draw ids from one sequence, so a shard can commit id 11 while another
+shard still holds id 10 uncommitted. `snapshot_heads` takes a consistent cut
+of every head and the highest id below which every row is committed. Readers
+that need a gap-free id prefix (Merkle sealing, incremental export) stop at
+that watermark. The same cut yields the combined root that commits to all
+shard heads.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from hashlib import sha256
+from typing import Any
+
+_logger = logging.getLogger("app")
+
+GENESIS = "GENESIS"
+# Breaks listed in a report; the count is always exact.
+MAX_REPORTED_BREAKS = 100
+
+# (id, event_type, subject, decision, details, prev_hash, entry_hash) as selected from audit_log
+Row = tuple[int, str, str, bool, Any, str, str]
+
+# entry_hash = sha256(prev_hash + "|" + payload(...)), computed in SQL so that reading
+# and advancing the chain head and inserting the entry is one statement. The UPDATE takes the
+# shard's head row lock, so concurrent appends to a shard queue behind each other and each one
+# chains from the previously committed entry. The id is drawn in the SET list before the lock
+# is granted, but an append that waited behind a change to the head row is re-evaluated
+# against the new row and draws again, so within a shard id order is chain order (unused
+# draws leave gaps). Appends to different shards do not contend.
+# SET expressions see the old row, hence prev_hash = entry_hash.
+# In autocommit mode this is the whole append: one round trip, no separate head read or
+# COMMIT. Callers execute it with prepare=True so every pooled connection plans it once.
+APPEND_SQL = """
+WITH head AS (
+    UPDATE audit_chain_head
+       SET prev_hash = entry_hash,
+           entry_hash = encode(sha256(convert_to(entry_hash || '|' || %(payload)s, 'UTF8')), 'hex'),
+           last_id = nextval('audit_log_id_seq'),
+           updated_at = now()
+     WHERE shard = %(shard)s
+ RETURNING shard, last_id, prev_hash, entry_hash
+)
+INSERT INTO audit_log
+       (id, event_type, subject, decision, details, prev_hash, entry_hash, request_id, shard)
+SELECT head.last_id, %(event_type)s, %(subject)s, %(decision)s, %(details)s,
+       head.prev_hash, head.entry_hash, %(request_id)s, head.shard
+  FROM head
+RETURNING id, event_type, subject, decision, details, prev_hash, entry_hash, created_at,
+          request_id, shard
+"""
+
+ROWS_SQL = (
+    "SELECT id, event_type, subject, decision, details, prev_hash, entry_hash"
+    " FROM audit_log WHERE shard = %s AND id > %s AND id <= %s ORDER BY id"
+)
+
+
+def genesis(shard: int) -> str:
+    """prev_hash of the first entry of a shard's chain."""
+    return GENESIS if shard == 0 else f"{GENESIS}:{shard}"
+
+
+def shard_for(key: str, shards: int) -> int:
+    """Stable shard of `key` (same across processes and restarts, unlike hash())."""
+    if shards <= 1:
+        return 0
+    return int.from_bytes(sha256(key.encode("utf-8")).digest()[:8], "big") % shards
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def payload(event_type: str, subject: str, decision: bool, details: Any) -> str:
+    """Canonical JSON of the hashed fields of an event."""
+    return canonical_json(
+        {"event_type": event_type, "subject": subject, "decision": decision, "details": details}
+    )
+
+
+def chain_hash(prev_hash: str, payload_str: str) -> str:
+    """entry_hash for an event chained after `prev_hash`."""
+    return sha256((prev_hash + "|" + payload_str).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Segment:
+    """Verification result for the rows with lo < id <= hi."""
+
+    lo: int
+    hi: int
+    shard: int = 0
+    rows: int = 0
+    first_id: int | None = None
+    first_prev_hash: str | None = None
+    last_entry_hash: str | None = None
+    last_id: int | None = None
+    breaks: list[dict[str, Any]] = field(default_factory=list)
+    break_count: int = 0
+
+    def add_break(self, row_id: int, reason: str) -> None:
+        self.break_count += 1
+        if len(self.breaks) < MAX_REPORTED_BREAKS:
+            self.breaks.append({"id": row_id, "shard": self.shard, "reason": reason})
+
+
+def verify_rows(rows: Iterable[Row], lo: int = 0, hi: int = 0, shard: int = 0) -> Segment:
+    """Re-hash one shard's `rows` (in id order) and check the links between consecutive rows."""
+    seg = Segment(lo, hi, shard)
+    prev: str | None = None
+    for row_id, event_type, subject, decision, details, prev_hash, entry_hash in rows:
+        if prev is None:
+            seg.first_id = row_id
+            seg.first_prev_hash = prev_hash
+        elif prev_hash != prev:
+            seg.add_break(row_id, "prev_hash_mismatch")
+        if chain_hash(prev_hash, payload(event_type, subject, decision, details)) != entry_hash:
+            seg.add_break(row_id, "entry_hash_mismatch")
+        prev = entry_hash
+        seg.rows += 1
+        seg.last_id = row_id
+    seg.last_entry_hash = prev
+    return seg
+
+
+def iter_rows(conn: Any, shard: int, lo: int, hi: int, chunk_size: int) -> Iterator[Row]:
+    """Stream one shard's rows with lo < id <= hi in id order through a named cursor."""
+    with conn.transaction(), conn.cursor(name="audit_chain_verify") as cur:
+        cur.itersize = chunk_size
+        cur.execute(ROWS_SQL, (shard, lo, hi))
+        while rows := cur.fetchmany(chunk_size):
+            yield from rows
+
+
+def verify_range(dsn: str, shard: int, lo: int, hi: int, chunk_size: int = 5000) -> Segment:
+    """Process-pool worker: verify one segment over its own read-only connection."""
+    import psycopg
+
+    with psycopg.connect(dsn) as conn:
+        conn.read_only = True
+        return verify_rows(iter_rows(conn, shard, lo, hi, chunk_size), lo, hi, shard)
+
+
+def split_range(lo: int, hi: int, segment_rows: int) -> list[tuple[int, int]]:
+    """Split the id range (lo, hi] into consecutive segments of at most segment_rows ids."""
+    step = max(1, segment_rows)
+    return [(start, min(start + step, hi)) for start in range(lo, hi, step)]
+
+
+def stitch(segments: list[Segment], start_hash: str) -> tuple[int, list[dict[str, Any]], int, str]:
+    """Join one shard's segments (ordered by lo) into (rows, breaks, break count, final hash)."""
+    rows = 0
+    breaks: list[dict[str, Any]] = []
+    break_count = 0
+    prev = start_hash
+    for seg in segments:
+        rows += seg.rows
+        break_count += seg.break_count
+        if seg.rows == 0:
+            continue
+        if seg.first_prev_hash != prev:
+            break_count += 1
+            breaks.append({"id": seg.first_id, "shard": seg.shard, "reason": "prev_hash_mismatch"})
+        breaks.extend(seg.breaks)
+        assert seg.last_entry_hash is not None
+        prev = seg.last_entry_hash
+    breaks.sort(key=lambda b: b["id"])
+    return rows, breaks[:MAX_REPORTED_BREAKS], break_count, prev
+
+
+# (shard, lo, hi)
+Task = tuple[int, int, int]
+
+
+def verify_segments(dsn: str, tasks: list[Task], workers: int, chunk_size: int) -> list[Segment]:
+    if workers <= 0 or len(tasks) <= 1:
+        return [verify_range(dsn, shard, lo, hi, chunk_size) for shard, lo, hi in tasks]
+    # spawn, not fork: the service process runs background threads (pool, group commit).
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=ctx) as pool:
+        return list(
+            pool.map(
+                verify_range,
+                [dsn] * len(tasks),
+                [shard for shard, _, _ in tasks],
+                [lo for _, lo, _ in tasks],
+                [hi for _, _, hi in tasks],
+                [chunk_size] * len(tasks),
+            )
+        )
+
+
+# (shard, last_id, entry_hash) of audit_chain_head rows
+Head = tuple[int, int, str]
+
+
+# The cut rewrites every head row unchanged instead of only locking it. APPEND_SQL draws
+# its id in the SET list before it waits for the head row lock; a lock alone would let a
+# waiting append go ahead with an id drawn before the cut. A new row version makes Postgres
+# re-evaluate the waiting UPDATE against it, which redraws the id after the cut.
+# Rows are locked in shard order first so that concurrent cuts cannot deadlock.
+HEADS_SQL = """
+WITH locked AS (
+    SELECT shard FROM audit_chain_head ORDER BY shard FOR UPDATE
+)
+UPDATE audit_chain_head h
+   SET last_id = h.last_id
+  FROM locked
+ WHERE h.shard = locked.shard
+RETURNING h.shard, h.last_id, h.entry_hash
+"""
+
+
+def _cut(rows: list) -> tuple[list[Head], int]:
+    heads = sorted((shard, last_id or 0, entry_hash) for shard, last_id, entry_hash in rows)
+    return heads, max((last_id for _, last_id, _ in heads), default=0)
+
+
+def snapshot_heads(conn: Any) -> tuple[list[Head], int]:
+    """Consistent cut of all shard heads, plus the committed-id watermark.
+
+    The cut waits for in-flight appends (which hold their head row lock until
+    commit) and briefly holds off new ones. Appends that drew an id before the
+    cut but were still waiting for the lock redraw it afterwards (see
+    HEADS_SQL). Every id drawn before the cut then belongs to a committed row,
+    i.e. is <= max(last_id), or to a rolled-back or discarded draw that never
+    becomes visible. Ids drawn after the cut are larger.
+    """
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute(HEADS_SQL)
+        return _cut(cur.fetchall())
+
+
+async def snapshot_heads_async(conn: Any) -> tuple[list[Head], int]:
+    """snapshot_heads on an async connection."""
+    async with conn.transaction(), conn.cursor() as cur:
+        await cur.execute(HEADS_SQL)
+        return _cut(await cur.fetchall())
+
+
+def combined_root(heads: list[Head]) -> str:
+    """Hash committing to every shard head of one cut."""
+    return sha256(canonical_json([list(h) for h in heads]).encode("utf-8")).hexdigest()
+
+
+def record_combined_root(conn: Any) -> tuple[dict[str, Any] | None, int]:
+    """Snapshot the heads and store their combined root in audit_chain_roots.
+
+    Returns (new root row or None if no head moved since the last one, watermark).
+    """
+    heads, watermark = snapshot_heads(conn)
+    root = combined_root(heads)
+    with conn.cursor() as cur:
+        cur.execute("SELECT root FROM audit_chain_roots ORDER BY id DESC LIMIT 1")
+        last = cur.fetchone()
+        if last is not None and last[0] == root:
+            return None, watermark
+        cur.execute(
+            "INSERT INTO audit_chain_roots (heads, watermark, root) VALUES (%s, %s, %s)"
+            " RETURNING id, created_at",
+            (canonical_json([list(h) for h in heads]), watermark, root),
+        )
+        row = cur.fetchone()
+    assert row is not None
+    return {
+        "id": row[0],
+        "heads": [list(h) for h in heads],
+        "watermark": watermark,
+        "root": root,
+        "created_at": row[1].isoformat(),
+    }, watermark
+
+
+def ensure_shard_heads(conn: Any, shards: int) -> None:
+    """Create head rows for shards 1..shards-1 (shard 0 comes from migration 0002)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO audit_chain_head (shard, prev_hash, entry_hash)"
+            " SELECT s, 'GENESIS:' || s, 'GENESIS:' || s FROM generate_series(1, %s) AS s"
+            " ON CONFLICT (shard) DO NOTHING",
+            (shards - 1,),
+        )
+
+
+def _archived_heads(cur: Any) -> dict[int, tuple[int, str]]:
+    """Every shard's (last_id, entry_hash) at the end of the newest archive segment (migration 0009)."""
+    cur.execute("SELECT to_regclass('audit_archive_segments') IS NOT NULL")
+    row = cur.fetchone()
+    if row is None or not row[0]:
+        return {}
+    cur.execute("SELECT heads FROM audit_archive_segments ORDER BY segment_no DESC LIMIT 1")
+    row = cur.fetchone()
+    return {int(s): (int(i), str(h)) for s, i, h in row[0]} if row else {}
+
+
+def _start_point(
+    cur: Any, shard: int, full: bool, archived: tuple[int, str] | None
+) -> tuple[int, str, bool, bool]:
+    """(start id, start hash, resumed, from archive) for one shard.
+
+    The newest still-valid checkpoint past the archive, else the archived head
+    (rows up to it are no longer all in audit_log), else genesis.
+    """
+    archived_id = archived[0] if archived else 0
+    if not full:
+        cur.execute(
+            "SELECT last_id, entry_hash FROM audit_chain_checkpoints"
+            " WHERE shard = %s ORDER BY last_id DESC LIMIT 1",
+            (shard,),
+        )
+        checkpoint = cur.fetchone()
+        if checkpoint is not None and checkpoint[0] > archived_id:
+            # A checkpoint is only a valid starting point if the row it names is unchanged.
+            cur.execute("SELECT entry_hash FROM audit_log WHERE id = %s", (checkpoint[0],))
+            row = cur.fetchone()
+            if row is not None and row[0] == checkpoint[1]:
+                return checkpoint[0], checkpoint[1], True, False
+    if archived is not None:
+        return archived[0], archived[1], False, True
+    return 0, genesis(shard), False, False
+
+
+def verify_chain(
+    dsn: str,
+    full: bool = False,
+    workers: int = os.cpu_count() or 1,
+    segment_rows: int = 1_000_000,
+    chunk_size: int = 5000,
+    save_checkpoint: bool = True,
+) -> dict[str, Any]:
+    """Verify every shard's chain from its latest checkpoint (or from genesis with full=True).
+
+    Once rows are archived (audit_archive), a shard starts no earlier than its
+    archived head: the database part of the chain must link to it, and the
+    segment files are re-checked with audit_archive.verify_segment instead.
+    The upper bound of a shard is its head at the start of the run: every row of
+    the shard up to `audit_chain_head.last_id` is committed, because the head
+    moves in the append's own transaction. Rows appended during the run are left
+    for the next one.
+    """
+    import psycopg
+
+    t0 = time.perf_counter()
+    with psycopg.connect(dsn, autocommit=True) as conn, conn.cursor() as cur:
+        cur.execute("SELECT shard, last_id, entry_hash FROM audit_chain_head ORDER BY shard")
+        heads = [(shard, last_id or 0, entry_hash) for shard, last_id, entry_hash in cur.fetchall()]
+        if not heads:
+            raise RuntimeError("audit_chain_head row missing (run migrations)")
+        archived = _archived_heads(cur)
+        starts = {
+            shard: _start_point(cur, shard, full, archived.get(shard)) for shard, _, _ in heads
+        }
+
+    tasks = [
+        (shard, lo, hi)
+        for shard, head_id, _ in heads
+        for lo, hi in split_range(starts[shard][0], head_id, segment_rows)
+    ]
+    segments = verify_segments(dsn, tasks, workers, chunk_size)
+
+    shards = []
+    breaks: list[dict[str, Any]] = []
+    for shard, head_id, head_hash in heads:
+        start_id, start_hash, resumed, from_archive = starts[shard]
+        own = [seg for seg in segments if seg.shard == shard]
+        rows, shard_breaks, break_count, final_hash = stitch(own, start_hash)
+        if break_count == 0 and final_hash != head_hash:
+            break_count += 1
+            shard_breaks.append({"id": head_id, "shard": shard, "reason": "chain_head_mismatch"})
+        breaks.extend(shard_breaks)
+        shards.append(
+            {
+                "shard": shard,
+                "from_id": start_id,
+                "to_id": head_id,
+                "resumed_from_checkpoint": resumed,
+                "resumed_from_archive": from_archive,
+                "rows_verified": rows,
+                "segments": len(own),
+                "break_count": break_count,
+                "head_hash": head_hash,
+                "checkpoint": None,
+            }
+        )
+
+    if save_checkpoint:
+        _save_checkpoints(dsn, shards)
+    break_count = sum(s["break_count"] for s in shards)
+    breaks.sort(key=lambda b: b["id"])
+    return {
+        "ok": break_count == 0,
+        "rows_verified": sum(s["rows_verified"] for s in shards),
+        "segments": len(tasks),
+        "break_count": break_count,
+        "breaks": breaks[:MAX_REPORTED_BREAKS],
+        "shards": shards,
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+
+
+def _save_checkpoints(dsn: str, shards: list[dict[str, Any]]) -> None:
+    """Record a checkpoint for every clean shard that advanced; fills in `checkpoint`."""
+    import psycopg
+
+    clean = [s for s in shards if s["break_count"] == 0 and s["to_id"] > s["from_id"]]
+    if not clean:
+        return
+    with psycopg.connect(dsn, autocommit=True) as conn, conn.cursor() as cur:
+        for s in clean:
+            cur.execute(
+                "INSERT INTO audit_chain_checkpoints (shard, last_id, entry_hash, rows_verified)"
+                " VALUES (%s, %s, %s, %s) RETURNING verified_at",
+                (s["shard"], s["to_id"], s["head_hash"], s["rows_verified"]),
+            )
+            inserted = cur.fetchone()
+            assert inserted is not None
+            s["checkpoint"] = {
+                "last_id": s["to_id"],
+                "entry_hash": s["head_hash"],
+                "verified_at": inserted[0].isoformat(),
+            }
+
+
+class VerifyJobs:
+    """Runs one verification at a time in a background thread and keeps the latest job.
+
+    A full run can take hours, far longer than any client or proxy waits, so
+    POST /verify only starts a job and GET /verify polls it. `run(full)` is
+    verify_chain bound to the service's settings.
+    """
+
+    def __init__(self, run: Callable[[bool], dict[str, Any]]):
+        self.run = run
+        self._lock = threading.Lock()
+        self._job: dict[str, Any] | None = None
+
+    def start(self, full: bool) -> tuple[dict[str, Any], bool]:
+        """Start a job unless one is running; returns (job status, started)."""
+        with self._lock:
+            if self._job is not None and self._job["status"] == "running":
+                return dict(self._job), False
+            job: dict[str, Any] = {
+                "job_id": uuid.uuid4().hex,
+                "status": "running",
+                "full": full,
+                "started_at": datetime.now(UTC).isoformat(),
+                "finished_at": None,
+                "report": None,
+                "error": None,
+            }
+            self._job = job
+        threading.Thread(target=self._run, args=(job,), name="audit-verify", daemon=True).start()
+        return dict(job), True
+
+    def status(self) -> dict[str, Any] | None:
+        with self._lock:
+            return None if self._job is None else dict(self._job)
+
+    def _run(self, job: dict[str, Any]) -> None:
+        report = error = None
+        try:
+            report = self.run(job["full"])
+        except Exception as e:
+            _logger.error("verify failed: %s", e, exc_info=True)
+            error = "verify_failed"
+        if report is not None and not report["ok"]:
+            _logger.error("audit_chain_broken breaks=%d", report["break_count"])
+        with self._lock:
+            job.update(
+                status="failed" if error else "done",
+                finished_at=datetime.now(UTC).isoformat(),
+                report=report,
+                error=error,
+            )
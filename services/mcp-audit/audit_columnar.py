@@ -0,0 +1,146 @@
+"""Columnar `/export` formats: Parquet and the Arrow IPC stream format.
+
+Each chunk of rows from the export cursor becomes one Parquet row group (or one
+Arrow record batch) and is flushed to the response as soon as it is encoded, so
+memory stays bounded by the chunk size. `details` is kept as a canonical JSON
+string column; event_type and subject are dictionary-encoded, which readers such
+as pandas load as categoricals.
+
+pyarrow is imported on first use: it is heavy to import and only these two
+formats need it.
+"""
+
+import io
+from typing import Any
+
+from audit_chain import canonical_json
+
+# Rows arrive in audit_app.EVENT_COLUMNS order.
+COLUMNS = (
+    "id",
+    "event_type",
+    "subject",
+    "decision",
+    "details",
+    "prev_hash",
+    "entry_hash",
+    "created_at",
+    "request_id",
+    "shard",
+)
+DICTIONARY_COLUMNS = ("event_type", "subject")
+
+
+class ColumnarUnavailable(RuntimeError):
+    """pyarrow is not installed."""
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ColumnarUnavailable("pyarrow is required for parquet/arrow exports") from e
+    return pyarrow
+
+
+def available() -> bool:
+    try:
+        _pyarrow()
+    except ColumnarUnavailable:
+        return False
+    return True
+
+
+def arrow_schema() -> Any:
+    pa = _pyarrow()
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("event_type", categorical),
+            ("subject", categorical),
+            ("decision", pa.bool_()),
+            ("details", pa.string()),
+            ("prev_hash", pa.string()),
+            ("entry_hash", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("request_id", pa.string()),
+            ("shard", pa.int32()),
+        ]
+    )
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands out whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+class ColumnarExport:
+    """Incremental encoder: begin(), write(rows) per chunk, end(); each returns bytes."""
+
+    def __init__(self, fmt: str):
+        if fmt not in ("parquet", "arrow"):
+            raise ValueError(fmt)
+        self.fmt = fmt
+        self._pa = _pyarrow()
+        self._schema = arrow_schema()
+        self._sink = _Sink()
+        self._writer: Any = None
+
+    def begin(self) -> bytes:
+        pa = self._pa
+        if self.fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(
+                self._sink,
+                self._schema,
+                compression="zstd",
+                use_dictionary=list(DICTIONARY_COLUMNS),
+            )
+        else:
+            self._writer = pa.ipc.new_stream(self._sink, self._schema)
+        return self._sink.drain()
+
+    def write(self, rows: list) -> bytes:
+        self._writer.write_table(self.table(rows))
+        return self._sink.drain()
+
+    def end(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+    def table(self, rows: list) -> Any:
+        pa = self._pa
+        columns = list(zip(*rows, strict=True)) if rows else [()] * len(COLUMNS)
+        data = dict(zip(COLUMNS, columns, strict=True))
+        data["details"] = tuple(canonical_json(d or {}) for d in data["details"])
+        arrays = []
+        for field in self._schema:
+            values = list(data[field.name])
+            if field.name in DICTIONARY_COLUMNS:
+                arrays.append(pa.array(values, pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.Table.from_arrays(arrays, schema=self._schema)
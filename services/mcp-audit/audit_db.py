@@ -0,0 +1,172 @@
+"""Async connection pool configured from the environment, with acquire-wait metrics.
+
+Request handlers share one `AsyncConnectionPool`, so concurrency is bounded by
+DB_POOL_MAX_SIZE rather than by the server's worker thread pool. Every
+`connection()` records how long the caller waited for a connection; with the
+pool's own gauges this shows when the pool, not the database, is the bottleneck.
+
+Environment:
+- DB_POOL_MIN_SIZE (default 2), DB_POOL_MAX_SIZE (default 10)
+- DB_POOL_TIMEOUT_S (default 30): how long `connection()` waits before PoolTimeout
+- DB_POOL_MAX_LIFETIME_S (default 3600): connections are recycled after this age
+- DB_POOL_MAX_WAITING (default 0, unbounded): callers allowed to queue for a connection
+
+services/mcp-audit/audit_db.py and services/mcp-lineage/lineage_db.py are the
+same file: each service image copies only its own directory (see its
+Dockerfile), so the module cannot be shared. Change both; CI fails when they
+differ.
+"""
+
+import bisect
+import os
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from psycopg_pool import AsyncConnectionPool, PoolTimeout, TooManyRequests
+
+WAIT_BUCKETS_S: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+)  # fmt: skip
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    min_size: int = 2
+    max_size: int = 10
+    timeout_s: float = 30.0
+    max_lifetime_s: float = 3600.0
+    max_waiting: int = 0
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "PoolConfig":
+        max_size = max(1, int(environ.get("DB_POOL_MAX_SIZE", cls.max_size)))
+        return cls(
+            min_size=min(max_size, max(0, int(environ.get("DB_POOL_MIN_SIZE", cls.min_size)))),
+            max_size=max_size,
+            timeout_s=float(environ.get("DB_POOL_TIMEOUT_S", cls.timeout_s)),
+            max_lifetime_s=float(environ.get("DB_POOL_MAX_LIFETIME_S", cls.max_lifetime_s)),
+            max_waiting=max(0, int(environ.get("DB_POOL_MAX_WAITING", cls.max_waiting))),
+        )
+
+
+class MeteredPool:
+    """`AsyncConnectionPool` wrapper whose `connection()` times every acquire.
+
+    Counters are only touched from the event loop, so they need no lock.
+    """
+
+    def __init__(self, conninfo: str, config: PoolConfig, **kwargs: Any):
+        self.config = config
+        self.pool = AsyncConnectionPool(
+            conninfo,
+            min_size=config.min_size,
+            max_size=config.max_size,
+            timeout=config.timeout_s,
+            max_lifetime=config.max_lifetime_s,
+            max_waiting=config.max_waiting,
+            open=False,
+            **kwargs,
+        )
+        self.waits = [0] * (len(WAIT_BUCKETS_S) + 1)  # last slot is +Inf
+        self.wait_seconds = 0.0
+        self.acquired = 0
+        self.waiting = 0
+        self.in_use = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    async def open(self) -> None:
+        # Do not block startup on the database: the pool keeps reconnecting in the background.
+        await self.pool.open(wait=False)
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    def observe_wait(self, seconds: float) -> None:
+        self.waits[bisect.bisect_left(WAIT_BUCKETS_S, seconds)] += 1
+        self.wait_seconds += seconds
+        self.acquired += 1
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        t0 = time.perf_counter()
+        acquired = False
+        self.waiting += 1
+        try:
+            async with self.pool.connection() as conn:
+                acquired = True
+                self.waiting -= 1
+                self.observe_wait(time.perf_counter() - t0)
+                self.in_use += 1
+                try:
+                    yield conn
+                finally:
+                    self.in_use -= 1
+        except TooManyRequests:
+            if not acquired:
+                self.rejected += 1
+            raise
+        except PoolTimeout:
+            if not acquired:
+                self.timeouts += 1
+            raise
+        finally:
+            if not acquired:
+                self.waiting -= 1
+
+    def stats(self) -> dict[str, Any]:
+        pool = self.pool.get_stats()
+        return {
+            "min_size": self.config.min_size,
+            "max_size": self.config.max_size,
+            "size": pool.get("pool_size", 0),
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "connections_lost": pool.get("connections_lost", 0),
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "wait_seconds": self.wait_seconds,
+            "waits": list(self.waits),
+        }
+
+
+def render_pool_metrics(stats: dict[str, Any]) -> str:
+    """Prometheus text exposition of `MeteredPool.stats()`."""
+    p = "db_pool"
+    lines = [
+        f"# TYPE {p}_min_size gauge",
+        f"{p}_min_size {stats['min_size']}",
+        f"# TYPE {p}_max_size gauge",
+        f"{p}_max_size {stats['max_size']}",
+        f"# HELP {p}_size Connections open or being opened.",
+        f"# TYPE {p}_size gauge",
+        f"{p}_size {stats['size']}",
+        f"# HELP {p}_in_use Connections checked out; saturated when equal to max_size.",
+        f"# TYPE {p}_in_use gauge",
+        f"{p}_in_use {stats['in_use']}",
+        f"# HELP {p}_waiting Callers queued for a connection.",
+        f"# TYPE {p}_waiting gauge",
+        f"{p}_waiting {stats['waiting']}",
+        f"# TYPE {p}_connections_lost_total counter",
+        f"{p}_connections_lost_total {stats['connections_lost']}",
+        f"# HELP {p}_timeouts_total Acquires that gave up after DB_POOL_TIMEOUT_S.",
+        f"# TYPE {p}_timeouts_total counter",
+        f"{p}_timeouts_total {stats['timeouts']}",
+        f"# HELP {p}_rejected_total Acquires refused because DB_POOL_MAX_WAITING were queued.",
+        f"# TYPE {p}_rejected_total counter",
+        f"{p}_rejected_total {stats['rejected']}",
+        f"# HELP {p}_acquire_wait_seconds Time spent waiting for a pooled connection.",
+        f"# TYPE {p}_acquire_wait_seconds histogram",
+    ]
+    cumulative = 0
+    for bound, n in zip(WAIT_BUCKETS_S, stats["waits"], strict=False):
+        cumulative += n
+        lines.append(f'{p}_acquire_wait_seconds_bucket{{le="{bound:g}"}} {cumulative}')
+    lines.append(f'{p}_acquire_wait_seconds_bucket{{le="+Inf"}} {stats["acquired"]}')
+    lines.append(f"{p}_acquire_wait_seconds_sum {stats['wait_seconds']}")
+    lines.append(f"{p}_acquire_wait_seconds_count {stats['acquired']}")
+    return "\n".join(lines) + "\n"
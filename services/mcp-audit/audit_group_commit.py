@@ -0,0 +1,190 @@
+"""Group commit for single-event audit appends.
+
+Callers enqueue an event and wait on a Future. One writer thread drains the
+queue until it holds `max_batch` events or `interval_ms` has passed since the
+first event of the batch arrived. It then hands the whole batch to
+`write_batch`, which chains and commits it in one transaction. Every Future
+resolves only after that commit, with the caller's row or with the error that
+failed the batch. So a response still means the event is durable, while
+concurrent writers share one commit.
+"""
+
+import bisect
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Upper bounds of the batch-size histogram.
+BATCH_SIZE_BUCKETS: tuple[int, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_logger = logging.getLogger("app")
+
+
+class QueueFull(RuntimeError):
+    """The group-commit queue is at capacity (or the writer is stopped)."""
+
+
+class GroupCommitWriter(Generic[T, R]):
+    """Single writer thread that commits queued items in batches."""
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[T]], list[R]],
+        max_batch: int = 256,
+        interval_ms: float = 5.0,
+        queue_depth: int = 10_000,
+    ):
+        self.write_batch = write_batch
+        self.max_batch = max(1, max_batch)
+        self.interval_ms = max(0.0, interval_ms)
+        self._queue: queue.Queue[tuple[T, Future[R]]] = queue.Queue(maxsize=max(1, queue_depth))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.batches = 0
+        self.events = 0
+        self.failed_batches = 0
+        self.rejected = 0
+        self.last_batch_size = 0
+        self.flush_seconds = 0.0
+        self.batch_sizes = [0] * (len(BATCH_SIZE_BUCKETS) + 1)  # last slot is +Inf
+
+    def submit(self, item: T) -> Future[R]:
+        """Enqueue `item`; the Future resolves once its batch has committed."""
+        fut: Future[R] = Future()
+        if self._thread is None:
+            raise QueueFull("group commit writer is not running")
+        try:
+            self._queue.put_nowait((item, fut))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull("group commit queue is full") from None
+        return fut
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-group-commit", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop accepting work, flush what is queued and join the writer."""
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout=timeout)
+        # Anything enqueued while the writer was exiting would otherwise wait forever.
+        while True:
+            try:
+                _, fut = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            fut.set_exception(QueueFull("group commit writer stopped"))
+
+    def _collect(self) -> list[tuple[T, Future[R]]]:
+        try:
+            batch = [self._queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.interval_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # Past the deadline, still take whatever is already queued without waiting.
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: list[tuple[T, Future[R]]]) -> None:
+        t0 = time.perf_counter()
+        try:
+            results = self.write_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"write_batch returned {len(results)} rows for {len(batch)}")
+        except Exception as e:
+            _logger.error("audit_group_commit_failed size=%d: %s", len(batch), e)
+            with self._lock:
+                self.failed_batches += 1
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self.batches += 1
+            self.events += len(batch)
+            self.last_batch_size = len(batch)
+            self.flush_seconds += elapsed
+            self.batch_sizes[bisect.bisect_left(BATCH_SIZE_BUCKETS, len(batch))] += 1
+        for (_, fut), res in zip(batch, results, strict=True):
+            fut.set_result(res)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "max_batch": self.max_batch,
+                "interval_ms": self.interval_ms,
+                "queue_depth": self._queue.maxsize,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "events": self.events,
+                "failed_batches": self.failed_batches,
+                "rejected": self.rejected,
+                "last_batch_size": self.last_batch_size,
+                "flush_seconds": self.flush_seconds,
+                "batch_sizes": list(self.batch_sizes),
+            }
+
+
+def render_metrics(stats: dict[str, Any]) -> str:
+    """Prometheus text exposition of `GroupCommitWriter.stats()`."""
+    p = "audit_group_commit"
+    lines = [
+        f"# TYPE {p}_max_batch gauge",
+        f"{p}_max_batch {stats['max_batch']}",
+        f"# TYPE {p}_interval_milliseconds gauge",
+        f"{p}_interval_milliseconds {stats['interval_ms']}",
+        f"# TYPE {p}_queue_depth gauge",
+        f"{p}_queue_depth {stats['queue_depth']}",
+        f"# HELP {p}_queued Events waiting for the writer.",
+        f"# TYPE {p}_queued gauge",
+        f"{p}_queued {stats['queued']}",
+        f"# TYPE {p}_events_total counter",
+        f"{p}_events_total {stats['events']}",
+        f"# TYPE {p}_failed_batches_total counter",
+        f"{p}_failed_batches_total {stats['failed_batches']}",
+        f"# HELP {p}_rejected_total Events refused because the queue was full.",
+        f"# TYPE {p}_rejected_total counter",
+        f"{p}_rejected_total {stats['rejected']}",
+        f"# TYPE {p}_flush_seconds_total counter",
+        f"{p}_flush_seconds_total {stats['flush_seconds']}",
+        f"# HELP {p}_batch_size Events committed per transaction.",
+        f"# TYPE {p}_batch_size histogram",
+    ]
+    cumulative = 0
+    for bound, n in zip(BATCH_SIZE_BUCKETS, stats["batch_sizes"], strict=False):
+        cumulative += n
+        lines.append(f'{p}_batch_size_bucket{{le="{bound}"}} {cumulative}')
+    lines.append(f'{p}_batch_size_bucket{{le="+Inf"}} {stats["batches"]}')
+    lines.append(f"{p}_batch_size_sum {stats['events']}")
+    lines.append(f"{p}_batch_size_count {stats['batches']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,386 @@
+"""Merkle checkpoints over `audit_log` and logarithmic inclusion proofs.
+
+Entries are grouped, in id order, into sealed blocks of `block_size` rows.
+Each block stores the Merkle root over the leaves of its entries, where
+`leaf = sha256(0x00 || entry_hash)`. A checkpoint stores the Merkle root over
+all sealed block roots. Trees follow the RFC 6962 shape:
+`node = sha256(0x01 || left || right)`, and a subtree of n > 1 items splits
+at the largest power of two below n. Every hash is hex-encoded, and 0x00/0x01
+prefix the raw bytes of the hex digests.
+
+An inclusion proof is the sibling path of the entry within its block followed
+by the sibling path of the block within the checkpoint: O(log n) hashes in
+total. Because the entry hash commits to the event and to its predecessor,
+auditors verify a single event without reading the rest of the log.
+
+The complete subtrees of the checkpoint tree are stored as they are completed
+(`audit_merkle_nodes`, migration 0012). Every sibling on a checkpoint path and
+every checkpoint root is a fold of O(log n) of them, so neither sealing nor a
+proof reads all block roots.
+"""
+
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from contextlib import AbstractContextManager
+from hashlib import sha256
+from typing import Any
+
+from audit_chain import record_combined_root
+
+# Proof steps are (side, sibling hash); side says where the sibling sits.
+ProofStep = tuple[str, str]
+# (level, idx): the complete subtree over blocks idx << level .. ((idx + 1) << level) - 1
+Node = tuple[int, int]
+
+NODES_SQL = (
+    "SELECT level, idx, hash FROM audit_merkle_nodes"
+    " JOIN unnest(%s::integer[], %s::bigint[]) AS want(level, idx) USING (level, idx)"
+)
+
+# pg_advisory_xact_lock key serializing sealers across service replicas.
+SEAL_LOCK_KEY = 0x6D65726B6C65  # "merkle"
+
+_logger = logging.getLogger("app")
+
+
+def leaf_hash(entry_hash: str) -> str:
+    return sha256(b"\x00" + entry_hash.encode("ascii")).hexdigest()
+
+
+def node_hash(left: str, right: str) -> str:
+    return sha256(b"\x01" + left.encode("ascii") + right.encode("ascii")).hexdigest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly below n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def merkle_root(leaves: list[str]) -> str:
+    if not leaves:
+        raise ValueError("empty tree")
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split(len(leaves))
+    return node_hash(merkle_root(leaves[:k]), merkle_root(leaves[k:]))
+
+
+def merkle_path(leaves: list[str], index: int) -> list[ProofStep]:
+    """Sibling hashes from leaf `index` up to the root, bottom first."""
+    if not 0 <= index < len(leaves):
+        raise IndexError(index)
+    if len(leaves) == 1:
+        return []
+    k = _split(len(leaves))
+    if index < k:
+        return merkle_path(leaves[:k], index) + [("right", merkle_root(leaves[k:]))]
+    return merkle_path(leaves[k:], index - k) + [("left", merkle_root(leaves[:k]))]
+
+
+def fold_path(leaf: str, path: Iterable[Sequence[str]]) -> str:
+    """Root implied by `leaf` and its sibling path."""
+    h = leaf
+    for side, sibling in path:
+        h = node_hash(h, sibling) if side == "right" else node_hash(sibling, h)
+    return h
+
+
+def perfect_nodes(start: int, count: int) -> list[Node]:
+    """Complete subtrees covering blocks start .. start + count - 1, largest first.
+
+    Subtrees of the RFC 6962 shape start at a multiple of their size, so each
+    one is a stored node.
+    """
+    nodes: list[Node] = []
+    for level in range(count.bit_length() - 1, -1, -1):
+        if count >> level & 1:
+            nodes.append((level, start >> level))
+            start += 1 << level
+    return nodes
+
+
+def fold_nodes(hashes: list[str]) -> str:
+    """Root of the tree whose complete subtrees, largest first, have `hashes`."""
+    root = hashes[-1]
+    for h in reversed(hashes[:-1]):
+        root = node_hash(h, root)
+    return root
+
+
+def checkpoint_path_nodes(count: int, index: int) -> list[tuple[str, list[Node]]]:
+    """Sibling path of block `index` in the tree over `count` blocks, bottom first.
+
+    Each sibling is given as the nodes it folds from (see fold_nodes); at most
+    one sibling, the right-hand remainder, spans more than one node.
+    """
+    if not 0 <= index < count:
+        raise IndexError(index)
+    steps: list[tuple[str, list[Node]]] = []
+    start, n = 0, count
+    while n > 1:
+        k = _split(n)
+        if index < start + k:
+            steps.append(("right", perfect_nodes(start + k, n - k)))
+            n = k
+        else:
+            steps.append(("left", perfect_nodes(start, k)))
+            start, n = start + k, n - k
+    steps.reverse()
+    return steps
+
+
+def append_node(
+    frontier: list[tuple[Node, str]], block_no: int, root: str
+) -> list[tuple[Node, str]]:
+    """Add block `block_no` to `frontier` and return the nodes it completes.
+
+    `frontier` holds the complete subtrees of blocks 0 .. block_no - 1, largest
+    first (perfect_nodes(0, block_no)), and is updated in place.
+    """
+    node, h = (0, block_no), root
+    completed = [(node, h)]
+    while frontier and frontier[-1][0][0] == node[0]:
+        (level, idx), left = frontier.pop()
+        node, h = (level + 1, idx >> 1), node_hash(left, h)
+        completed.append((node, h))
+    frontier.append((node, h))
+    return completed
+
+
+def _node_params(nodes: list[Node]) -> tuple[list[int], list[int]]:
+    return [level for level, _ in nodes], [idx for _, idx in nodes]
+
+
+def verify_proof(entry_hash: str, proof: dict[str, Any]) -> bool:
+    """Check a /events/{id}/proof response: entry -> block root -> checkpoint root."""
+    block_root = fold_path(leaf_hash(entry_hash), proof["block_path"])
+    if block_root != proof["block"]["root"]:
+        return False
+    root = fold_path(block_root, proof["checkpoint_path"])
+    return root == proof["checkpoint"]["root"]
+
+
+def seal(conn: Any, block_size: int, upto_id: int, max_blocks: int = 1000) -> dict[str, Any] | None:
+    """Seal every complete block of rows with id <= upto_id and write a checkpoint.
+
+    `upto_id` must be a committed-id watermark (audit_chain.snapshot_heads): with
+    several chain shards, rows commit out of id order, and only below the
+    watermark is it guaranteed that a full block can never gain a row later.
+    Returns the new checkpoint, or None when no block was completed.
+    """
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (SEAL_LOCK_KEY,))
+        cur.execute(
+            "SELECT block_no, last_id FROM audit_merkle_blocks ORDER BY block_no DESC LIMIT 1"
+        )
+        last = cur.fetchone()
+        next_block, after_id = (last[0] + 1, last[1]) if last else (0, 0)
+        frontier, completed = _load_frontier(cur, next_block)
+        sealed = 0
+        while sealed < max_blocks:
+            cur.execute(
+                "SELECT id, entry_hash FROM audit_log WHERE id > %s AND id <= %s"
+                " ORDER BY id LIMIT %s",
+                (after_id, upto_id, block_size),
+            )
+            rows = cur.fetchall()
+            if len(rows) < block_size:
+                break
+            block_root = merkle_root([leaf_hash(h) for _, h in rows])
+            cur.execute(
+                "INSERT INTO audit_merkle_blocks (block_no, first_id, last_id, size, root)"
+                " VALUES (%s, %s, %s, %s, %s)",
+                (next_block, rows[0][0], rows[-1][0], len(rows), block_root),
+            )
+            completed += append_node(frontier, next_block, block_root)
+            after_id = rows[-1][0]
+            next_block += 1
+            sealed += 1
+        if completed:
+            cur.executemany(
+                "INSERT INTO audit_merkle_nodes (level, idx, hash) VALUES (%s, %s, %s)",
+                [(level, idx, h) for (level, idx), h in completed],
+            )
+        if sealed == 0:
+            return None
+        root = fold_nodes([h for _, h in frontier])
+        cur.execute(
+            "INSERT INTO audit_merkle_checkpoints (block_count, last_id, root)"
+            " VALUES (%s, %s, %s) RETURNING id, created_at",
+            (next_block, after_id, root),
+        )
+        row = cur.fetchone()
+    assert row is not None
+    return _checkpoint_dict((row[0], next_block, after_id, root, row[1]))
+
+
+def _load_frontier(
+    cur: Any, block_count: int
+) -> tuple[list[tuple[Node, str]], list[tuple[Node, str]]]:
+    """Frontier over `block_count` blocks, plus the nodes still missing for them.
+
+    Nodes are written with their blocks, so they only lag behind blocks sealed
+    before migration 0012; those are backfilled here from their roots, once.
+    """
+    cur.execute("SELECT coalesce(max(idx) + 1, 0) FROM audit_merkle_nodes WHERE level = 0")
+    row = cur.fetchone()
+    stored = int(row[0]) if row else 0
+    wanted = perfect_nodes(0, stored)
+    cur.execute(NODES_SQL, _node_params(wanted))
+    hashes = {(level, idx): h for level, idx, h in cur.fetchall()}
+    frontier = [(node, hashes[node]) for node in wanted]
+    missing: list[tuple[Node, str]] = []
+    if stored < block_count:
+        cur.execute(
+            "SELECT block_no, root FROM audit_merkle_blocks WHERE block_no >= %s ORDER BY block_no",
+            (stored,),
+        )
+        for block_no, root in cur.fetchall():
+            missing += append_node(frontier, block_no, root)
+    return frontier, missing
+
+
+def _checkpoint_dict(r: Any) -> dict[str, Any]:
+    return {
+        "id": r[0],
+        "block_count": r[1],
+        "last_id": r[2],
+        "root": r[3],
+        "created_at": r[4].isoformat(),
+    }
+
+
+async def latest_checkpoint(cur: Any) -> dict[str, Any] | None:
+    await cur.execute(
+        "SELECT id, block_count, last_id, root, created_at FROM audit_merkle_checkpoints"
+        " ORDER BY block_count DESC LIMIT 1"
+    )
+    r = await cur.fetchone()
+    return _checkpoint_dict(r) if r else None
+
+
+class ProofError(LookupError):
+    """No proof can be produced; `args[0]` is the API error detail."""
+
+
+async def inclusion_proof(
+    cur: Any,
+    event_id: int,
+    archived_entries: Callable[[int, int], Awaitable[list[Any] | None]] | None = None,
+) -> dict[str, Any]:
+    """Inclusion proof for `event_id` against the latest checkpoint (async cursor).
+
+    `archived_entries(first_id, last_id)` returns a block's (id, entry_hash)
+    rows from the cold-tier archive, or None when they are still in audit_log.
+    """
+    checkpoint = await latest_checkpoint(cur)
+    if checkpoint is None or event_id > checkpoint["last_id"]:
+        raise ProofError("event_not_checkpointed")
+    await cur.execute(
+        "SELECT block_no, first_id, last_id, size, root FROM audit_merkle_blocks"
+        " WHERE last_id >= %s ORDER BY last_id LIMIT 1",
+        (event_id,),
+    )
+    block = await cur.fetchone()
+    if block is None or block[1] > event_id:
+        raise ProofError("event_not_found")
+    block_no, first_id, last_id, size, block_root = block
+    entries = await archived_entries(first_id, last_id) if archived_entries else None
+    if entries is None:
+        await cur.execute(
+            "SELECT id, entry_hash FROM audit_log WHERE id >= %s AND id <= %s ORDER BY id",
+            (first_id, last_id),
+        )
+        entries = await cur.fetchall()
+    ids = [r[0] for r in entries]
+    if event_id not in ids:
+        raise ProofError("event_not_found")
+    leaves = [leaf_hash(h) for _, h in entries]
+    if len(leaves) != size or merkle_root(leaves) != block_root:
+        raise RuntimeError(f"merkle block {block_no} does not match audit_log")
+    index = ids.index(event_id)
+    return {
+        "id": event_id,
+        "entry_hash": entries[index][1],
+        "leaf_index": index,
+        "block": {
+            "block_no": block_no,
+            "first_id": first_id,
+            "last_id": last_id,
+            "size": size,
+            "root": block_root,
+        },
+        "block_path": merkle_path(leaves, index),
+        "checkpoint": checkpoint,
+        "checkpoint_path": await _checkpoint_path(cur, checkpoint["block_count"], block_no),
+    }
+
+
+async def _checkpoint_path(cur: Any, block_count: int, block_no: int) -> list[ProofStep]:
+    """Sibling path of a block from the stored subtrees it needs, O(log n) rows."""
+    steps = checkpoint_path_nodes(block_count, block_no)
+    wanted = [node for _, nodes in steps for node in nodes]
+    await cur.execute(NODES_SQL, _node_params(wanted))
+    hashes = {(level, idx): h for level, idx, h in await cur.fetchall()}
+    if len(hashes) == len(wanted):
+        return [(side, fold_nodes([hashes[n] for n in nodes])) for side, nodes in steps]
+    # Blocks sealed before migration 0012 that no seal round has backfilled yet.
+    await cur.execute(
+        "SELECT root FROM audit_merkle_blocks WHERE block_no < %s ORDER BY block_no",
+        (block_count,),
+    )
+    return merkle_path([r[0] for r in await cur.fetchall()], block_no)
+
+
+class MerkleSealer:
+    """Background thread that seals blocks and writes checkpoints every `interval_s`.
+
+    Each round first records the combined root of the chain shard heads, whose
+    cut also yields the committed-id watermark the blocks are sealed up to.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], AbstractContextManager[Any]],
+        block_size: int,
+        interval_s: float,
+    ):
+        self.connect = connect
+        self.block_size = max(1, block_size)
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_s <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-merkle", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> dict[str, Any] | None:
+        with self.connect() as conn:
+            _, watermark = record_combined_root(conn)
+            checkpoint = seal(conn, self.block_size, watermark)
+        if checkpoint is not None:
+            _logger.info(
+                "audit_merkle_checkpoint blocks=%d last_id=%d root=%s",
+                checkpoint["block_count"],
+                checkpoint["last_id"],
+                checkpoint["root"],
+            )
+        return checkpoint
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.run_once()
+            except Exception as e:
+                _logger.error("audit_merkle_seal_failed: %s", e)
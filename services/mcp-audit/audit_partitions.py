@@ -0,0 +1,74 @@
+"""Monthly partitions of `audit_log` (migration 0007).
+
+`audit_log` is range-partitioned on created_at, one partition per UTC month.
+Partitions are created ahead of time by the `audit_log_ensure_partitions(n)`
+SQL function; an insert whose created_at has no partition fails, so the
+service keeps `months_ahead` months in reserve from a background thread in
+addition to the call scripts/migrate.py makes on every deploy.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any
+
+_logger = logging.getLogger("app")
+
+
+def ensure_partitions(conn: Any, months_ahead: int) -> int | None:
+    """Create missing partitions through `months_ahead`; None before migration 0007."""
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("SELECT to_regproc('audit_log_ensure_partitions')")
+        row = cur.fetchone()
+        if row is None or row[0] is None:
+            return None
+        cur.execute("SELECT audit_log_ensure_partitions(%s)", (months_ahead,))
+        created = cur.fetchone()
+    assert created is not None
+    return int(created[0])
+
+
+class PartitionMaintainer:
+    """Background thread calling ensure_partitions at start and every `interval_s`."""
+
+    def __init__(
+        self,
+        connect: Callable[[], AbstractContextManager[Any]],
+        months_ahead: int,
+        interval_s: float,
+    ):
+        self.connect = connect
+        self.months_ahead = max(1, months_ahead)
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_s <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-partitions", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> int | None:
+        with self.connect() as conn:
+            created = ensure_partitions(conn, self.months_ahead)
+        if created:
+            _logger.info("audit_partitions_created count=%d", created)
+        return created
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                _logger.error("audit_partitions_failed: %s", e)
+            if self._stop.wait(self.interval_s):
+                return
@@ -0,0 +1,91 @@
+"""Hourly decision rollups over `audit_log` (migration 0008).
+
+`audit_rollup_hourly` holds allowed/denied counts per UTC hour, event_type and
+chain shard. A statement trigger keeps it current as events are appended;
+`backfill` recomputes settled hours from `audit_log` itself, for rows written
+before the trigger existed or to reconcile a range. Reads sum over shards, so
+their cost depends on the number of hours and event types, not on events.
+"""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+HOUR = timedelta(hours=1)
+
+# An hour is settled once no transaction that could still insert into it is open:
+# created_at is the inserting transaction's start time.
+SETTLE_MARGIN = timedelta(hours=1)
+
+STATS_SQL = """
+SELECT bucket, event_type, sum(allowed)::bigint, sum(denied)::bigint
+FROM audit_rollup_hourly
+WHERE bucket >= %s AND bucket < %s {event_filter}
+GROUP BY bucket, event_type
+ORDER BY bucket, event_type
+"""
+
+BACKFILL_SQL = """
+INSERT INTO audit_rollup_hourly AS r (bucket, event_type, shard, allowed, denied)
+SELECT date_trunc('hour', created_at, 'UTC'),
+       event_type,
+       shard,
+       count(*) FILTER (WHERE decision),
+       count(*) FILTER (WHERE NOT decision)
+FROM audit_log
+WHERE created_at >= %s AND created_at < %s
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+ON CONFLICT (bucket, event_type, shard) DO UPDATE
+  SET allowed = excluded.allowed, denied = excluded.denied
+"""
+
+
+def hour_floor(ts: datetime) -> datetime:
+    ts = ts.astimezone(UTC) if ts.tzinfo else ts.replace(tzinfo=UTC)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def hour_ceil(ts: datetime) -> datetime:
+    floor = hour_floor(ts)
+    return floor if floor == ts else floor + HOUR
+
+
+def settled_until(now: datetime | None = None) -> datetime:
+    """Start of the oldest hour that may still gain events."""
+    return hour_floor((now or datetime.now(UTC)) - SETTLE_MARGIN)
+
+
+async def stats(cur: Any, start: datetime, end: datetime, event_type: str | None) -> dict[str, Any]:
+    """Counts per hour bucket and event_type for [start, end), widened to whole hours."""
+    start, end = hour_floor(start), hour_ceil(end)
+    params: list = [start, end]
+    event_filter = ""
+    if event_type is not None:
+        event_filter = "AND event_type = %s"
+        params.append(event_type)
+    await cur.execute(STATS_SQL.format(event_filter=event_filter), params)
+    buckets = [
+        {"bucket": r[0].isoformat(), "event_type": r[1], "allowed": r[2], "denied": r[3]}
+        for r in await cur.fetchall()
+    ]
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "buckets": buckets,
+        "totals": {
+            "allowed": sum(b["allowed"] for b in buckets),
+            "denied": sum(b["denied"] for b in buckets),
+        },
+    }
+
+
+def backfill(conn: Any, start: datetime, end: datetime) -> int:
+    """Recompute the rollup rows of the hours in [start, end) from audit_log.
+
+    Rows are overwritten with exact counts, so re-running is harmless. Only pass
+    settled hours (see settled_until): the trigger may still add to newer ones.
+    Returns the number of rollup rows written.
+    """
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute(BACKFILL_SQL, (hour_floor(start), hour_floor(end)))
+        return int(cur.rowcount)
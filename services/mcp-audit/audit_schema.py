@@ -19,3 +19,20 @@ class AuditEvent(BaseModel):
     prev_hash: str
     entry_hash: str
     created_at: str
+    request_id: str | None = None
+    shard: int = 0
+
+
+class AuditBatchEntry(BaseModel):
+    id: int
+    entry_hash: str
+    shard: int = 0
+
+
+class AuditBatchOut(BaseModel):
+    count: int
+    first_id: int
+    last_id: int
+    prev_hash: str = Field(..., description="prev_hash of the first entry")
+    created_at: str
+    entries: list[AuditBatchEntry]
@@ -0,0 +1,111 @@
+"""Indexed search over `audit_log.details` (migration 0010).
+
+`details` has a GIN index with the jsonb_path_ops operator class, which stores
+one hash per (key path, scalar value) leaf. /events/search only builds filters
+that index can answer:
+
+- containment: `details @> <object>`, e.g. {"policy": {"reasons": ["x"]}}
+- path equality: `details @@ '$."a"."b" == <scalar>'`; in lax mode an array at
+  the path matches when any element equals the value
+
+A filter with no scalar leaf ({} or {"a": {}}) matches every row and makes
+the index read all of its entries, so it is rejected, as is a request without
+any details filter. Both kinds are ANDed with the other /events filters.
+"""
+
+import json
+import math
+from typing import Any
+
+from audit_chain import canonical_json
+
+MAX_EQ_FILTERS = 10
+
+
+class SearchError(ValueError):
+    """Filter rejected; `args[0]` is the API error detail."""
+
+
+def _no_constant(name: str) -> Any:
+    raise ValueError(name)
+
+
+def _finite(text: str) -> float:
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(text)
+    return value
+
+
+def _loads(raw: str) -> Any:
+    """json.loads that rejects NaN and infinite numbers, which jsonb cannot store."""
+    return json.loads(raw, parse_constant=_no_constant, parse_float=_finite)
+
+
+def _has_scalar_leaf(value: Any) -> bool:
+    if isinstance(value, dict):
+        return any(_has_scalar_leaf(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_scalar_leaf(v) for v in value)
+    return True
+
+
+def parse_contains(raw: str) -> dict[str, Any]:
+    """JSON object that details must contain."""
+    try:
+        value = _loads(raw)
+    except ValueError as e:
+        raise SearchError("invalid_contains") from e
+    if not isinstance(value, dict):
+        raise SearchError("invalid_contains")
+    if not _has_scalar_leaf(value):
+        raise SearchError("unindexable_filter")
+    return value
+
+
+def parse_eq(raw: str) -> tuple[list[str], Any]:
+    """`a.b=value` -> (["a", "b"], value).
+
+    The value is parsed as JSON when it is a JSON scalar (42, true, null,
+    "quoted") and taken as a plain string otherwise.
+    """
+    path, sep, text = raw.partition("=")
+    keys = path.split(".")
+    if not sep or not all(keys):
+        raise SearchError("invalid_eq")
+    try:
+        value = _loads(text)
+    except ValueError:
+        value = text
+    if isinstance(value, dict | list):
+        raise SearchError("invalid_eq")
+    return keys, value
+
+
+def jsonpath_predicate(terms: list[tuple[list[str], Any]]) -> str:
+    """One jsonpath predicate ANDing `$."k1"."k2" == value` for every term.
+
+    Keys and values are JSON-encoded, which is valid jsonpath literal syntax, so
+    no user input reaches the expression unquoted.
+    """
+    return " && ".join(
+        "$" + "".join(f".{json.dumps(k)}" for k in keys) + f" == {json.dumps(value)}"
+        for keys, value in terms
+    )
+
+
+def details_conditions(contains: str | None, eq: list[str]) -> tuple[list[str], list]:
+    """WHERE conditions and parameters for the details filters of /events/search."""
+    if contains is None and not eq:
+        raise SearchError("details_filter_required")
+    if len(eq) > MAX_EQ_FILTERS:
+        raise SearchError(f"too_many_filters:max={MAX_EQ_FILTERS}")
+    conds: list[str] = []
+    params: list = []
+    if contains is not None:
+        conds.append("details @> %s::jsonb")
+        params.append(canonical_json(parse_contains(contains)))
+    if eq:
+        conds.append("details @@ %s::jsonpath")
+        params.append(jsonpath_predicate([parse_eq(raw) for raw in eq]))
+    return conds, params
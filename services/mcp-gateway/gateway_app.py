@@ -9,7 +9,7 @@ from typing import Any
 from uuid import uuid4
 
 import httpx
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
@@ -37,6 +37,9 @@ ALLOWED_PATHS: dict[str, list[str]] = {
     "mcp-audit": [
         r"^/healthz$",
         r"^/log$",
+        r"^/log/batch$",
+        r"^/merkle/root$",
+        r"^/stats$",
         r"^/events.*$",
     ],
     "mcp-policy": [
@@ -44,11 +47,23 @@ ALLOWED_PATHS: dict[str, list[str]] = {
         r"^/validate$",  # Legacy endpoint
         r"^/models$",  # Legacy endpoint
         r"^/api/v1/policies/validate$",  # v1 API
+        r"^/api/v1/policies/validate:batch$",  # v1 API
         r"^/api/v1/policies/models$",  # v1 API
         r"^/api/v1/policies/register-model$",  # v1 API
+        r"^/api/v1/policies/version$",  # v1 API
+        r"^/api/v1/policies/cache$",  # v1 API
+        r"^/api/v1/policies/bundles$",  # v1 API
+        r"^/api/v1/policies/profile$",  # v1 API
+        r"^/api/v1/policies/shadow$",  # v1 API, GET only (see READ_ONLY_PATHS)
     ],
 }
 
+# Allowed paths that are forwarded for GET only: their other methods reconfigure the
+# service (e.g. PUT /api/v1/policies/shadow swaps the shadow bundle) and stay internal.
+READ_ONLY_PATHS: dict[str, list[str]] = {
+    "mcp-policy": [r"^/api/v1/policies/shadow$"],
+}
+
 app = FastAPI(title="mcp-gateway")
 
 # ---- Structured logging with correlation IDs ----
@@ -135,6 +150,9 @@ def _sanitize_path(path: str) -> str:
     return path
 
 
+_RESPONSE_HEADERS = {"x-next-cursor"}
+
+
 async def _proxy(service: str, path: str, req: Request):
     """
     Proxy requests to internal MCP services with SSRF mitigations.
@@ -142,8 +160,10 @@ async def _proxy(service: str, path: str, req: Request):
     SSRF Protections:
     1. Service whitelist: MCP_DIRECTORY enforces known internal services only (http:// scheme)
     2. Path validation: _sanitize_path() blocks traversal (..) and scheme injection (http://)
-    3. Path allowlist: ALLOWED_PATHS restricts endpoints per service (regex patterns)
-    4. Header filtering: Only safe headers forwarded (accept, content-type, x-request-id)
+    3. Path allowlist: ALLOWED_PATHS restricts endpoints per service (regex patterns);
+       READ_ONLY_PATHS limits some of them to GET
+    4. Header filtering: Only safe headers forwarded (accept, content-type, x-request-id,
+       x-policy-bundle)
     5. Redirect prevention: follow_redirects=False blocks redirect-based SSRF
     6. Env trust disabled: trust_env=False prevents proxy hijacking via environment
 
@@ -156,6 +176,7 @@ async def _proxy(service: str, path: str, req: Request):
         HTTPException(404): Service not found in MCP_DIRECTORY
         HTTPException(400): Invalid path (traversal or scheme injection)
         HTTPException(403): Path not in ALLOWED_PATHS for service
+        HTTPException(405): Method other than GET on a READ_ONLY_PATHS path
     """
     base = MCP_DIRECTORY.get(service)
     if not base:
@@ -166,6 +187,8 @@ async def _proxy(service: str, path: str, req: Request):
     patterns = ALLOWED_PATHS.get(service)
     if patterns is None or not any(re.match(p, spath) for p in patterns):
         raise HTTPException(status_code=403, detail="unauthorized_path")
+    if req.method != "GET" and any(re.match(p, spath) for p in READ_ONLY_PATHS.get(service, ())):
+        raise HTTPException(status_code=405, detail="method_not_allowed")
 
     # Build target URL (scheme, host, port already validated in MCP_DIRECTORY)
     url = base.rstrip("/") + spath
@@ -174,7 +197,7 @@ async def _proxy(service: str, path: str, req: Request):
     body_bytes = await req.body()
 
     # Only forward a minimal, explicit set of safe headers. Drop auth/cookies and hop-by-hop headers.
-    allowed = {"accept", "content-type", "x-request-id"}
+    allowed = {"accept", "content-type", "x-request-id", "x-policy-bundle"}
     headers = {k: v for k, v in req.headers.items() if k.lower() in allowed}
 
     timeout = httpx.Timeout(connect=2.0, read=10.0, write=10.0, pool=2.0)
@@ -189,9 +212,11 @@ async def _proxy(service: str, path: str, req: Request):
             params=dict(req.query_params),
         )
         # Return JSON if possible; do not forward upstream headers to avoid hop-by-hop/header conflicts
+        # except the keyset cursor of paginated listings (mcp-audit /events).
+        passthrough = {k: v for k, v in resp.headers.items() if k.lower() in _RESPONSE_HEADERS}
         try:
             data = resp.json()
-            return JSONResponse(content=data, status_code=resp.status_code)
+            return JSONResponse(content=data, status_code=resp.status_code, headers=passthrough)
         except Exception:
             return JSONResponse(
                 content={"status": resp.status_code, "body": resp.text},
@@ -273,28 +298,42 @@ async def register_model(reg: ModelRegistration):
     }
 
 
+def _policy_payload(req: InferenceRequest) -> dict[str, Any]:
+    """Gate input for an inference request (also recorded as `policy_input` in the audit)."""
+    payload: dict[str, Any] = {
+        "model_id": req.model_id,
+        "user_id": req.user_id,
+        "prompt_len": len(req.prompt),
+        "parameters": req.parameters,
+    }
+    if req.risk:
+        payload["risk"] = req.risk
+    return payload
+
+
 @app.post("/api/v1/models/infer")
-async def infer(req: InferenceRequest):
+async def infer(req: InferenceRequest, x_policy_bundle: str | None = Header(None)):
     """Policy-gated inference placeholder.
 
-    - Calls mcp-policy /validate with a payload derived from the request
+    - Calls mcp-policy /validate with a payload derived from the request, evaluated
+      against the tenant bundle named by X-Policy-Bundle when given
     - If allowed, emits an audit event and returns a simulated response
     """
     policy_url = f"{_service_url('mcp-policy')}/validate"
     audit_url = f"{_service_url('mcp-audit')}/log"
 
-    payload = {
-        "model_id": req.model_id,
-        "user_id": req.user_id,
-        "prompt_len": len(req.prompt),
-        "parameters": req.parameters,
-    }
-    if req.risk:
-        payload["risk"] = req.risk
+    payload = _policy_payload(req)
 
     timeout = httpx.Timeout(connect=2.0, read=10.0, write=10.0, pool=2.0)
     async with httpx.AsyncClient(timeout=timeout) as client:
-        pol_resp = await client.post(policy_url, json={"payload": payload})
+        policy_body: dict[str, Any] = {"payload": payload}
+        if x_policy_bundle:
+            policy_body["bundle"] = x_policy_bundle
+        pol_resp = await client.post(policy_url, json=policy_body)
+        if pol_resp.status_code in (400, 404):  # unknown or malformed policy bundle
+            raise HTTPException(
+                status_code=pol_resp.status_code, detail=pol_resp.json().get("detail")
+            )
         try:
             pol_resp.raise_for_status()
         except httpx.HTTPError as e:
@@ -312,6 +351,9 @@ async def infer(req: InferenceRequest):
                 "user_id": req.user_id,
                 "policy": policy,
                 "prompt_len": len(req.prompt),
+                # exact gate input, so decisions can be replayed against candidate policies
+                "policy_input": payload,
+                "policy_bundle": policy.get("policy_bundle"),
             },
         }
         _ = await client.post(audit_url, json=audit_payload)
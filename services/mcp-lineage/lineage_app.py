@@ -3,21 +3,33 @@ import json
 import logging
 import os
 import time
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from lineage_db import MeteredPool, PoolConfig, render_pool_metrics
 from lineage_schema import LineageIn, LineageRecord
 from psycopg import types as psycopg_types
-from psycopg_pool import ConnectionPool
 
 try:
     DATABASE_URL = os.environ["DATABASE_URL"]
 except KeyError as exc:
     raise RuntimeError("DATABASE_URL environment variable is required") from exc
 
-pool = ConnectionPool(conninfo=DATABASE_URL, max_size=10, open=True)
+pool = MeteredPool(DATABASE_URL, PoolConfig.from_env())
 
-app = FastAPI(title="mcp-lineage")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await pool.open()
+    try:
+        yield
+    finally:
+        await pool.close()
+
+
+app = FastAPI(title="mcp-lineage", lifespan=lifespan)
 
 _request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
@@ -76,15 +88,21 @@ async def add_security_headers(request, call_next):
 
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
     return {"ok": True}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Connection-pool metrics in Prometheus text format."""
+    return render_pool_metrics(pool.stats())
+
+
 @app.post("/register", response_model=LineageRecord)
-def register(lineage: LineageIn):
+async def register(lineage: LineageIn):
     try:
-        with pool.connection() as conn, conn.cursor() as cur:
-            cur.execute(
+        async with pool.connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 INSERT INTO model_lineage (model_id, version, artifacts, created_by, metadata)
                 VALUES (%s, %s, %s, %s, %s)
@@ -98,7 +116,7 @@ def register(lineage: LineageIn):
                     psycopg_types.json.Json(lineage.metadata),
                 ),
             )
-            row = cur.fetchone()
+            row = await cur.fetchone()
             return {
                 "id": row[0],
                 "model_id": row[1],
@@ -114,10 +132,10 @@ def register(lineage: LineageIn):
 
 
 @app.get("/lineage/{model_id}", response_model=list[LineageRecord])
-def get_lineage(model_id: str):
+async def get_lineage(model_id: str):
     try:
-        with pool.connection() as conn, conn.cursor() as cur:
-            cur.execute(
+        async with pool.connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 SELECT id, model_id, version, artifacts, created_by, metadata, created_at
                 FROM model_lineage
@@ -126,7 +144,7 @@ def get_lineage(model_id: str):
                 """,
                 (model_id,),
             )
-            rows = cur.fetchall()
+            rows = await cur.fetchall()
             return [
                 {
                     "id": r[0],
@@ -1,15 +1,37 @@
 import contextvars
 import json
 import logging
+import os
 import time
+from contextlib import asynccontextmanager
 from typing import Any
 from uuid import uuid4
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from policy_bundles import InvalidBundleName, UnknownBundle
+from policy_bundles import registry as bundles
+from policy_metrics import PHASE_US, metrics, rule_profile
+from policy_replay import replay
+from policy_shadow import shadow
 from pydantic import BaseModel, Field
-from validators import evaluate
+from validators import (
+    GateResult,
+    PolicySnapshot,
+    PolicyWatcher,
+    decision_cache_stats,
+    evaluate,
+    evaluate_batch,
+    get_snapshot,
+    refresh_public_key,
+    reload_policies,
+)
 
-app = FastAPI(title="mcp-policy")
+POLICY_BATCH_MAX = int(os.environ.get("POLICY_BATCH_MAX", "10000"))
+# Replay reads audit_log; without a DATABASE_URL the replay endpoint is disabled.
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+POLICY_REPLAY_MAX_ROWS = int(os.environ.get("POLICY_REPLAY_MAX_ROWS", "100000"))
+POLICY_REPLAY_WORKERS = int(os.environ.get("POLICY_REPLAY_WORKERS", "2"))
 
 _request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
@@ -38,6 +60,26 @@ if not _logger.handlers:
     _logger.addHandler(_h)
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Warm the snapshot so the first request does not pay for YAML parsing.
+    try:
+        get_snapshot()
+    except Exception as e:
+        _logger.error("policy_snapshot_initial_load_failed: %s", e)
+    watcher = PolicyWatcher(hooks=(bundles.refresh,))
+    watcher.start()
+    shadow.start()
+    try:
+        yield
+    finally:
+        shadow.stop()
+        watcher.stop()
+
+
+app = FastAPI(title="mcp-policy", lifespan=lifespan)
+
+
 @app.middleware("http")
 async def add_request_id(request, call_next):
     rid = request.headers.get("x-request-id") or str(uuid4())
@@ -69,6 +111,25 @@ async def add_security_headers(request, call_next):
 
 class ValidateIn(BaseModel):
     payload: dict[str, Any] = Field(default_factory=dict)
+    bundle: str | None = Field(None, description="Policy bundle (tenant) to evaluate against")
+
+
+class ValidateBatchIn(BaseModel):
+    payloads: list[dict[str, Any]] = Field(..., min_length=1, max_length=POLICY_BATCH_MAX)
+    bundle: str | None = Field(None, description="Policy bundle (tenant) to evaluate against")
+
+
+class ReplayIn(BaseModel):
+    bundle: str = Field(..., description="Candidate policy bundle to replay against")
+    since_id: int = Field(0, ge=0, description="Replay events with id greater than this")
+    until_id: int | None = Field(None, ge=0)
+    limit: int = Field(10000, ge=1, le=POLICY_REPLAY_MAX_ROWS)
+    exact_only: bool = Field(False, description="Skip events without a recorded policy_input")
+    sample_size: int = Field(20, ge=0, le=1000)
+
+
+class ShadowIn(BaseModel):
+    bundle: str | None = Field(None, description="Shadow bundle; null disables shadowing")
 
 
 class ModelRegistration(BaseModel):
@@ -91,21 +152,169 @@ def health():
     return {"ok": True}
 
 
-@app.post("/validate")
-def validate(inp: ValidateIn):
-    res = evaluate(inp.payload)
-    return {
+def _gate_response(res: GateResult) -> dict[str, Any]:
+    body = {
         "allowed": res.allowed,
         "reasons": res.reasons,
         "risk_score": res.risk_score,
         "within_sla": res.within_sla,
         "elapsed_ms": res.elapsed_ms,
+        "policy_version": res.policy_version,
+        "policy_bundle": res.policy_bundle,
     }
+    if res.profile is not None:
+        body["profile"] = res.profile
+    return body
+
+
+def _select_snapshot(header: str | None, body: str | None) -> PolicySnapshot | None:
+    """Resolve the X-Policy-Bundle header / `bundle` field; None selects the default policy."""
+    if header and body and header != body:
+        raise HTTPException(status_code=400, detail="policy_bundle_conflict")
+    name = header or body
+    if not name:
+        return None
+    try:
+        return bundles.get(name)
+    except InvalidBundleName as e:
+        raise HTTPException(status_code=400, detail="invalid_policy_bundle") from e
+    except UnknownBundle as e:
+        raise HTTPException(status_code=404, detail="policy_bundle_not_found") from e
+    except Exception as e:
+        _logger.error("policy_bundle_load_failed bundle=%s: %s", name, e)
+        raise HTTPException(status_code=500, detail="policy_bundle_load_failed") from e
+
+
+_PROFILE_QUERY = Query(None, description="Time each phase and rule (overrides POLICY_PROFILE)")
+
+
+@app.post("/validate")
+def validate(
+    inp: ValidateIn,
+    x_policy_bundle: str | None = Header(None),
+    profile: bool | None = _PROFILE_QUERY,
+):
+    snap = _select_snapshot(x_policy_bundle, inp.bundle)
+    res = evaluate(inp.payload, snap, profile)
+    shadow.submit(inp.payload, res, _request_id_var.get())
+    return _gate_response(res)
 
 
 @app.post("/api/v1/policies/validate")
-def validate_v1(inp: ValidateIn):
-    return validate(inp)
+def validate_v1(
+    inp: ValidateIn,
+    x_policy_bundle: str | None = Header(None),
+    profile: bool | None = _PROFILE_QUERY,
+):
+    return validate(inp, x_policy_bundle, profile)
+
+
+@app.post("/api/v1/policies/validate:batch")
+def validate_batch_v1(
+    inp: ValidateBatchIn,
+    x_policy_bundle: str | None = Header(None),
+    profile: bool | None = _PROFILE_QUERY,
+):
+    t0 = time.perf_counter_ns()
+    snap = _select_snapshot(x_policy_bundle, inp.bundle)
+    results = evaluate_batch(inp.payloads, snap, profile)
+    return {
+        "results": [_gate_response(r) for r in results],
+        "count": len(results),
+        "policy_version": results[0].policy_version,
+        "policy_bundle": results[0].policy_bundle,
+        "elapsed_ms": round((time.perf_counter_ns() - t0) / 1_000_000, 3),
+    }
+
+
+@app.get("/api/v1/policies/cache")
+def cache_stats_v1():
+    return {**decision_cache_stats(), "bundles": bundles.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_text():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/v1/policies/profile")
+def profile_v1(top: int = Query(20, ge=1, le=1000)):
+    """Slowest rules and phases by cumulative time, from profiled evaluations.
+
+    Rule timings only live here; /metrics exports evaluation and phase histograms per bundle.
+    """
+    return {"rules": rule_profile.summary(top), "phases": metrics.summary(PHASE_US, top)}
+
+
+@app.get("/api/v1/policies/shadow")
+def shadow_stats_v1(top: int = Query(20, ge=1, le=1000)):
+    return shadow.stats(top)
+
+
+@app.put("/api/v1/policies/shadow")
+def configure_shadow_v1(inp: ShadowIn):
+    if inp.bundle:
+        _select_snapshot(None, inp.bundle)  # load now so a bad name fails here, not in the worker
+    shadow.configure(inp.bundle or "")
+    _logger.info("policy_shadow_configured bundle=%s", inp.bundle or "-")
+    return shadow.stats()
+
+
+@app.get("/api/v1/policies/bundles")
+def list_bundles_v1():
+    return {"bundles": bundles.available(), **bundles.stats()}
+
+
+@app.get("/api/v1/policies/version")
+def policy_version_v1(x_policy_bundle: str | None = Header(None)):
+    snap = _select_snapshot(x_policy_bundle, None) or get_snapshot()
+    return {"version": snap.version, "bundle": snap.bundle, "loaded_at": snap.loaded_at}
+
+
+@app.post("/api/v1/policies/reload")
+def reload_policies_v1():
+    try:
+        snap, changed = reload_policies(force=True)
+        refresh_public_key(force=True)
+        bundles.clear()  # resident bundles reload lazily on next use
+    except Exception as e:
+        _logger.error("policy_reload_failed: %s", e)
+        raise HTTPException(status_code=500, detail="policy_reload_failed") from e
+    return {"version": snap.version, "loaded_at": snap.loaded_at, "changed": changed}
+
+
+@app.post("/api/v1/policies/replay")
+def replay_v1(inp: ReplayIn):
+    """Bounded replay of recorded inference decisions; use scripts/replay_policy.py for full runs."""
+    if not DATABASE_URL:
+        raise HTTPException(status_code=503, detail="replay_unavailable")
+    try:
+        candidate_dir = bundles.path(inp.bundle)
+    except InvalidBundleName as e:
+        raise HTTPException(status_code=400, detail="invalid_policy_bundle") from e
+    except UnknownBundle as e:
+        raise HTTPException(status_code=404, detail="policy_bundle_not_found") from e
+    t0 = time.perf_counter_ns()
+    try:
+        summary = replay(
+            DATABASE_URL,
+            candidate_dir,
+            bundle=inp.bundle,
+            workers=POLICY_REPLAY_WORKERS,
+            since_id=inp.since_id,
+            until_id=inp.until_id,
+            limit=inp.limit,
+            exact_only=inp.exact_only,
+            sample_size=inp.sample_size,
+        )
+    except Exception as e:
+        _logger.error("policy_replay_failed bundle=%s: %s", inp.bundle, e)
+        raise HTTPException(status_code=500, detail="policy_replay_failed") from e
+    return {
+        "bundle": inp.bundle,
+        **summary.to_dict(),
+        "elapsed_ms": round((time.perf_counter_ns() - t0) / 1_000_000, 3),
+    }
 
 
 @app.post("/api/v1/policies/register-model")
@@ -0,0 +1,126 @@
+"""Named, per-tenant policy bundles loaded lazily into a bounded LRU.
+
+A bundle is a subdirectory of POLICY_BUNDLES_DIR that holds its own
+`model-policy.yml` and `risk-matrix.yml`:
+
+    bundles/
+      acme/model-policy.yml
+      acme/risk-matrix.yml
+      globex/...
+
+Bundles are parsed and compiled on first use. At most POLICY_BUNDLE_CACHE_SIZE
+compiled snapshots stay resident; the least recently used one is dropped and
+simply reloaded if it is selected again.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Any
+
+from policy_cache import LRUCache
+from validators import PolicySnapshot, is_stale, load_snapshot
+
+# Directory of tenant bundles; empty disables bundle selection.
+POLICY_BUNDLES_DIR = os.environ.get("POLICY_BUNDLES_DIR", "")
+POLICY_BUNDLE_CACHE_SIZE = int(os.environ.get("POLICY_BUNDLE_CACHE_SIZE", "64"))
+
+BUNDLE_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_logger = logging.getLogger("app")
+
+
+class InvalidBundleName(ValueError):
+    pass
+
+
+class UnknownBundle(LookupError):
+    pass
+
+
+class BundleRegistry:
+    """Thread-safe, lazily populated LRU of compiled policy bundles."""
+
+    def __init__(self, root: str, maxsize: int):
+        self.root = root
+        self._cache = LRUCache(max(1, maxsize))
+        self._loads = 0
+        # One lock per bundle name so a slow load never blocks other tenants.
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, name: str) -> str:
+        """Directory of bundle `name`; raises InvalidBundleName / UnknownBundle."""
+        if not BUNDLE_NAME_RE.match(name):
+            raise InvalidBundleName(name)
+        if not self.root:
+            raise UnknownBundle(name)
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(path):
+            raise UnknownBundle(name)
+        return path
+
+    def _lock(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> PolicySnapshot:
+        """Return the compiled snapshot for bundle `name`, loading it on first use."""
+        if not BUNDLE_NAME_RE.match(name):
+            raise InvalidBundleName(name)
+        snap = self._cache.get(name)
+        if snap is not None:
+            return snap
+        path = self.path(name)
+        with self._lock(name):
+            snap = self._cache.get(name)  # another request may have loaded it meanwhile
+            if snap is None:
+                snap = load_snapshot(path, bundle=name)
+                self._cache.put(name, snap)
+                self._loads += 1
+                _logger.info("policy_bundle_loaded bundle=%s version=%s", name, snap.version)
+        return snap
+
+    def refresh(self) -> list[str]:
+        """Reload resident bundles whose files changed; drop ones that disappeared."""
+        reloaded = []
+        for name, snap in self._cache.items():
+            if not is_stale(snap):
+                continue
+            with self._lock(str(name)):
+                if not os.path.isdir(snap.source):
+                    self._cache.pop(name)
+                    _logger.info("policy_bundle_removed bundle=%s", name)
+                    continue
+                try:
+                    fresh = load_snapshot(snap.source, bundle=snap.bundle)
+                except Exception as e:  # keep serving the last good snapshot
+                    _logger.error("policy_bundle_reload_failed bundle=%s: %s", name, e)
+                    continue
+                self._cache.put(name, fresh)
+                reloaded.append(snap.bundle)
+                _logger.info("policy_bundle_loaded bundle=%s version=%s", name, fresh.version)
+        return reloaded
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def available(self) -> list[str]:
+        if not self.root or not os.path.isdir(self.root):
+            return []
+        return sorted(
+            entry.name
+            for entry in os.scandir(self.root)
+            if entry.is_dir() and BUNDLE_NAME_RE.match(entry.name)
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._cache.stats(),
+            "loads": self._loads,
+            "resident": {str(k): v.version for k, v in self._cache.items()},
+        }
+
+
+registry = BundleRegistry(POLICY_BUNDLES_DIR, POLICY_BUNDLE_CACHE_SIZE)
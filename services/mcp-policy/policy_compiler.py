@@ -0,0 +1,551 @@
+"""Compile model-policy.yml rules into predicate closures.
+
+Rule grammar (see policies/model-policy.yml):
+- `field`: dotted path into the payload, e.g. `metrics.accuracy`
+- `op`: one of gt, gte, lt, lte, eq, ne, in, not_in, contains
+- `value` (literal) or `value_from` (dotted path into the policy document itself)
+- `when`: optional guard with the same field/op/value shape; the rule is skipped unless it holds
+- a rule whose field is absent from the payload does not apply: deny rules never
+  match it and require rules are not violated, so one policy can gate payloads
+  that carry different evidence (e.g. /validate vs gateway inference). Fields
+  that must be present are listed under top-level `required`
+- legacy deny form `{field, equals}` compares string forms of a top-level value
+
+Everything that does not depend on the payload (path splitting, `value_from` lookups,
+operator selection, reason strings) happens once at compile time. Evaluation is a
+loop over closures that each return a reason string when the rule fires.
+"""
+
+import bisect
+import dataclasses
+import json
+import operator
+import sys
+import time
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+MISSING: Any = object()
+
+Accessor = Callable[[Mapping[str, Any]], Any]
+Predicate = Callable[[Mapping[str, Any]], bool]
+Rule = Callable[[Mapping[str, Any]], str | None]
+# (rule_id, field, op, elapsed_ns) recorded by the profiled scans
+RuleTiming = tuple[str, str, str, int]
+
+
+class PolicyCompileError(ValueError):
+    """Raised when a policy document cannot be compiled."""
+
+
+def _contains(actual: Any, expected: Any) -> bool:
+    return expected in actual
+
+
+def _in(actual: Any, expected: Any) -> bool:
+    return actual in expected
+
+
+def _not_in(actual: Any, expected: Any) -> bool:
+    return actual not in expected
+
+
+OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "in": _in,
+    "not_in": _not_in,
+    "contains": _contains,
+}
+
+_SYMBOLS = {
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "eq": "=",
+    "ne": "!=",
+    "in": " in ",
+    "not_in": " not_in ",
+    "contains": " contains ",
+}
+
+
+def accessor(path: str) -> Accessor:
+    """Build a closure that resolves a dotted path, returning MISSING if absent."""
+    keys = tuple(path.split("."))
+    if not path or not all(keys):
+        raise PolicyCompileError(f"invalid field path: {path!r}")
+
+    if len(keys) == 1:
+        (k0,) = keys
+
+        def get1(doc: Mapping[str, Any]) -> Any:
+            return doc.get(k0, MISSING)
+
+        return get1
+
+    if len(keys) == 2:
+        k0, k1 = keys
+
+        def get2(doc: Mapping[str, Any]) -> Any:
+            v = doc.get(k0, MISSING)
+            # Payloads are decoded JSON, so the plain dict check nearly always decides.
+            if isinstance(v, dict) or isinstance(v, Mapping):  # noqa: SIM101
+                return v.get(k1, MISSING)
+            return MISSING
+
+        return get2
+
+    def get_n(doc: Mapping[str, Any]) -> Any:
+        v: Any = doc
+        for k in keys:
+            if not (isinstance(v, dict) or isinstance(v, Mapping)):  # noqa: SIM101
+                return MISSING
+            v = v.get(k, MISSING)
+        return v
+
+    return get_n
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _resolve_value(spec: Mapping[str, Any], policy: Mapping[str, Any]) -> Any:
+    if "value_from" in spec:
+        ref = spec["value_from"]
+        if not isinstance(ref, str):
+            raise PolicyCompileError(f"value_from must be a dotted path, got {ref!r}")
+        value = accessor(ref)(policy)
+        if value is MISSING:
+            raise PolicyCompileError(f"value_from references unknown path: {ref}")
+    elif "value" in spec:
+        value = spec["value"]
+    else:
+        raise PolicyCompileError(f"condition on {spec.get('field')!r} has no value or value_from")
+    if spec.get("op") in ("in", "not_in"):
+        if not isinstance(value, list | tuple | set | frozenset):
+            raise PolicyCompileError(f"op {spec['op']} needs a list value")
+        try:
+            value = frozenset(value)
+        except TypeError:
+            value = tuple(value)
+    return value
+
+
+def _parse_condition(
+    spec: Mapping[str, Any], policy: Mapping[str, Any]
+) -> tuple[str, Callable[[Any, Any], bool], Any, str]:
+    field = spec.get("field")
+    op_name = spec.get("op")
+    if not isinstance(field, str):
+        raise PolicyCompileError(f"condition is missing a field: {dict(spec)!r}")
+    op = OPS.get(op_name) if isinstance(op_name, str) else None
+    if op is None:
+        raise PolicyCompileError(f"unsupported op {op_name!r} for field {field}")
+    value = _resolve_value(spec, policy)
+    return field, op, value, f"{field}{_SYMBOLS[op_name]}{_format_value(value)}"  # type: ignore[index]
+
+
+def compile_condition(spec: Mapping[str, Any], policy: Mapping[str, Any]) -> Predicate:
+    """Compile one field/op/value condition.
+
+    The predicate is False when the field is missing or the types do not compare.
+    """
+    field, op, value, _ = _parse_condition(spec, policy)
+    get = accessor(field)
+
+    def predicate(doc: Mapping[str, Any]) -> bool:
+        actual = get(doc)
+        if actual is MISSING:
+            return False
+        try:
+            return bool(op(actual, value))
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _guard(spec: Mapping[str, Any], policy: Mapping[str, Any]) -> Predicate | None:
+    when = spec.get("when")
+    if when is None:
+        return None
+    if not isinstance(when, Mapping):
+        raise PolicyCompileError(f"when guard must be a mapping, got {when!r}")
+    return compile_condition(when, policy)
+
+
+def _rule(
+    get: Accessor,
+    op: Callable[[Any, Any], bool],
+    value: Any,
+    guard: Predicate | None,
+    on_match: str | None,
+    on_mismatch: str | None,
+) -> Rule:
+    """Build a single flat closure for a rule; each rule costs one accessor and one op call."""
+    if guard is None:
+
+        def rule(doc: Mapping[str, Any]) -> str | None:
+            actual = get(doc)
+            if actual is MISSING:
+                return None
+            try:
+                return on_match if op(actual, value) else on_mismatch
+            except TypeError:
+                return on_mismatch
+
+        return rule
+
+    def guarded(doc: Mapping[str, Any]) -> str | None:
+        if not guard(doc):
+            return None
+        actual = get(doc)
+        if actual is MISSING:
+            return None
+        try:
+            return on_match if op(actual, value) else on_mismatch
+        except TypeError:
+            return on_mismatch
+
+    return guarded
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A compiled rule plus the metadata the field index dispatches on."""
+
+    rule_id: str
+    position: int
+    field: str
+    op: str
+    value: Any
+    guarded: bool
+    fire: Rule
+
+
+def compile_deny(
+    spec: Mapping[str, Any], policy: Mapping[str, Any], position: int = 0
+) -> CompiledRule:
+    """Compile a deny rule; `fire` returns its reason when it matches."""
+    rule_id = f"deny[{position}]"
+    if "equals" in spec and "op" not in spec:
+        # Legacy form: string comparison against a top-level payload key.
+        field = spec.get("field")
+        if not isinstance(field, str) or not field:
+            raise PolicyCompileError(f"deny rule is missing a field: {dict(spec)!r}")
+        if spec["equals"] is None:
+            return CompiledRule(rule_id, position, field, "never", None, False, lambda _doc: None)
+        key: str = field
+        expected = str(spec["equals"])
+        legacy_reason = f"deny:{key}={spec['equals']}"
+
+        def legacy(doc: Mapping[str, Any]) -> str | None:
+            return legacy_reason if str(doc.get(key)) == expected else None
+
+        return CompiledRule(rule_id, position, field, "equals", expected, False, legacy)
+
+    field, op, value, text = _parse_condition(spec, policy)
+    guard = _guard(spec, policy)
+    fire = _rule(accessor(field), op, value, guard, f"deny:{text}", None)
+    return CompiledRule(rule_id, position, field, spec["op"], value, guard is not None, fire)
+
+
+def compile_require(
+    spec: Mapping[str, Any], policy: Mapping[str, Any], position: int = 0
+) -> CompiledRule:
+    """Compile a require rule; `fire` returns its reason when the field is present and fails."""
+    field, op, value, text = _parse_condition(spec, policy)
+    guard = _guard(spec, policy)
+    fire = _rule(accessor(field), op, value, guard, None, f"require:{text}")
+    return CompiledRule(
+        f"require[{position}]", position, field, spec["op"], value, guard is not None, fire
+    )
+
+
+def _top(field: str) -> str:
+    return field.split(".", 1)[0]
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, int | float) and value == value  # NaN is unordered
+
+
+class _ThresholdIndex:
+    """Unguarded lt/lte/gt/gte rules on one field, sorted by numeric constant.
+
+    A bisect finds the cut between matching and non-matching constants, and a
+    precomputed prefix/suffix minimum gives the earliest matching rule in O(log n).
+    """
+
+    def __init__(self, op: str, rules: list[CompiledRule]):
+        self.op = op
+        rules = sorted(rules, key=lambda r: r.value)
+        self.values = [r.value for r in rules]
+        self.best: list[CompiledRule] = []
+        # lt/lte match a suffix of the sorted constants, gt/gte a prefix.
+        ordered = reversed(rules) if op in ("lt", "lte") else iter(rules)
+        current: CompiledRule | None = None
+        for rule in ordered:
+            if current is None or rule.position < current.position:
+                current = rule
+            self.best.append(current)
+        if op in ("lt", "lte"):
+            self.best.reverse()
+
+    def candidate(self, actual: Any) -> CompiledRule | None:
+        values = self.values
+        if self.op == "lt":  # actual < value
+            i = bisect.bisect_right(values, actual)
+            return self.best[i] if i < len(values) else None
+        if self.op == "lte":  # actual <= value
+            i = bisect.bisect_left(values, actual)
+            return self.best[i] if i < len(values) else None
+        if self.op == "gt":  # actual > value
+            i = bisect.bisect_left(values, actual) - 1
+        else:  # gte: actual >= value
+            i = bisect.bisect_right(values, actual) - 1
+        return self.best[i] if i >= 0 else None
+
+
+class _FieldRules:
+    """Deny rules that share one field path; the field is resolved once per payload."""
+
+    def __init__(self, path: str):
+        self.get = accessor(path)
+        self.eq: dict[Any, list[CompiledRule]] = {}
+        self.thresholds: list[_ThresholdIndex] = []
+        self.scan: list[CompiledRule] = []
+        self._pending: dict[str, list[CompiledRule]] = {}
+
+    def add(self, rule: CompiledRule) -> None:
+        if rule.op == "eq" and _hashable(rule.value):
+            self.eq.setdefault(rule.value, []).append(rule)
+        elif rule.op == "in" and isinstance(rule.value, frozenset):
+            for key in rule.value:
+                self.eq.setdefault(key, []).append(rule)
+        elif rule.op in _SORTABLE_OPS and not rule.guarded and _is_number(rule.value):
+            self._pending.setdefault(rule.op, []).append(rule)
+        else:
+            self.scan.append(rule)
+
+    def seal(self) -> None:
+        self.thresholds = [_ThresholdIndex(op, rules) for op, rules in self._pending.items()]
+        self._pending = {}
+
+    def candidates(self, doc: Mapping[str, Any]) -> Iterator[list[CompiledRule]]:
+        actual = self.get(doc)
+        if actual is MISSING:
+            return
+        if self.eq:
+            try:
+                rules = self.eq.get(actual)
+            except TypeError:  # unhashable payload value cannot equal a constant
+                rules = None
+            if rules:
+                yield rules
+        if self.thresholds and _is_number(actual):
+            for index in self.thresholds:
+                rule = index.candidate(actual)
+                if rule is not None:
+                    yield [rule]
+        if self.scan:
+            yield self.scan
+
+
+_SORTABLE_OPS = frozenset({"lt", "lte", "gt", "gte"})
+
+
+class RuleIndex:
+    """Field-path index over compiled rules.
+
+    Deny rules only fire when their field is present, so they are grouped by
+    top-level payload key and then by field path; only groups for keys the
+    payload has are visited, and each field is resolved once. Within a field,
+    `eq`/`in` rules with hashable constants sit in a hash table keyed by the
+    constant (one lookup however many values are listed), and unguarded numeric
+    thresholds are bisected. Candidates are always re-checked with the rule's own
+    closure, so the index only narrows the search and never changes the result.
+
+    Require rules likewise only apply when their field is present, so they are
+    grouped by top-level key and only the groups the payload has are run.
+    """
+
+    def __init__(self, deny: tuple[CompiledRule, ...], require: tuple[CompiledRule, ...]):
+        # top-level key -> rules grouped by full field path
+        self._deny: dict[str, dict[str, _FieldRules]] = {}
+        # legacy `equals` rules: field -> str(constant) -> rules
+        self._legacy: dict[str, dict[str, list[CompiledRule]]] = {}
+        for rule in deny:
+            if rule.op == "never":
+                continue
+            if rule.op == "equals":
+                self._legacy.setdefault(rule.field, {}).setdefault(rule.value, []).append(rule)
+                continue
+            fields = self._deny.setdefault(_top(rule.field), {})
+            group = fields.get(rule.field)
+            if group is None:
+                group = fields[rule.field] = _FieldRules(rule.field)
+            group.add(rule)
+        self._deny_groups = {top: tuple(fields.values()) for top, fields in self._deny.items()}
+        for groups in self._deny_groups.values():
+            for group in groups:
+                group.seal()
+
+        self._require: dict[str, list[CompiledRule]] = {}
+        for rule in require:
+            self._require.setdefault(_top(rule.field), []).append(rule)
+
+    def _deny_candidates(self, doc: Mapping[str, Any]) -> Iterator[list[CompiledRule]]:
+        for path, legacy in self._legacy.items():
+            rules = legacy.get(str(doc.get(path)))
+            if rules:
+                yield rules
+        for top in doc:
+            groups = self._deny_groups.get(top)
+            if groups is not None:
+                for group in groups:
+                    yield from group.candidates(doc)
+
+    def first_deny(self, doc: Mapping[str, Any]) -> str | None:
+        best_pos = sys.maxsize
+        best: str | None = None
+        for rules in self._deny_candidates(doc):
+            for rule in rules:  # each candidate list is in policy order
+                if rule.position >= best_pos:
+                    break
+                reason = rule.fire(doc)
+                if reason is not None:
+                    best_pos, best = rule.position, reason
+                    break
+        return best
+
+    def violations(self, doc: Mapping[str, Any]) -> list[tuple[int, str]]:
+        found: list[tuple[int, str]] = []
+        for top in doc:
+            for rule in self._require.get(top, ()):
+                reason = rule.fire(doc)
+                if reason is not None:
+                    found.append((rule.position, reason))
+        found.sort()
+        return found
+
+
+# Below this many rules a straight scan of the closures beats the index bookkeeping.
+INDEX_MIN_RULES = 16
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    deny: tuple[CompiledRule, ...]
+    require: tuple[CompiledRule, ...]
+    required_fields: tuple[str, ...]
+    max_risk: float
+    index: RuleIndex | None = dataclasses.field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        index = None
+        if len(self.deny) + len(self.require) >= INDEX_MIN_RULES:
+            index = RuleIndex(self.deny, self.require)
+        object.__setattr__(self, "index", index)
+
+    def first_deny(self, doc: Mapping[str, Any]) -> str | None:
+        """Return the reason of the first deny rule (in policy order) that matches, if any."""
+        if self.index is None:
+            return self.first_deny_linear(doc)
+        return self.index.first_deny(doc)
+
+    def violations(self, doc: Mapping[str, Any]) -> list[str]:
+        """Return the reasons for every violated requirement, in policy order."""
+        if self.index is None:
+            return self.violations_linear(doc)
+        reasons = self._required_field_reasons(doc)
+        reasons.extend(reason for _, reason in self.index.violations(doc))
+        return reasons
+
+    def first_deny_linear(self, doc: Mapping[str, Any]) -> str | None:
+        """Reference path: check every deny rule in order (used by tests and benchmarks)."""
+        for rule in self.deny:
+            reason = rule.fire(doc)
+            if reason is not None:
+                return reason
+        return None
+
+    def violations_linear(self, doc: Mapping[str, Any]) -> list[str]:
+        """Reference path: check every require rule in order (used by tests and benchmarks)."""
+        reasons = self._required_field_reasons(doc)
+        for rule in self.require:
+            reason = rule.fire(doc)
+            if reason is not None:
+                reasons.append(reason)
+        return reasons
+
+    def first_deny_profiled(self, doc: Mapping[str, Any], timings: list[RuleTiming]) -> str | None:
+        """Linear deny scan that appends (rule_id, field, op, ns) for every rule it runs."""
+        clock = time.perf_counter_ns
+        for rule in self.deny:
+            t0 = clock()
+            reason = rule.fire(doc)
+            timings.append((rule.rule_id, rule.field, rule.op, clock() - t0))
+            if reason is not None:
+                return reason
+        return None
+
+    def violations_profiled(self, doc: Mapping[str, Any], timings: list[RuleTiming]) -> list[str]:
+        """Linear require scan that appends (rule_id, field, op, ns) for every rule."""
+        clock = time.perf_counter_ns
+        reasons = self._required_field_reasons(doc)
+        for rule in self.require:
+            t0 = clock()
+            reason = rule.fire(doc)
+            timings.append((rule.rule_id, rule.field, rule.op, clock() - t0))
+            if reason is not None:
+                reasons.append(reason)
+        return reasons
+
+    def _required_field_reasons(self, doc: Mapping[str, Any]) -> list[str]:
+        if self.required_fields:
+            missing = [f for f in self.required_fields if doc.get(f) in (None, "")]
+            if missing:
+                return ["missing:" + ",".join(missing)]
+        return []
+
+
+def _rules(policy: Mapping[str, Any], key: str) -> list[Mapping[str, Any]]:
+    rules = policy.get(key) or ()
+    if not isinstance(rules, list | tuple):
+        raise PolicyCompileError(f"{key} must be a list")
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, Mapping):
+            raise PolicyCompileError(f"{key}[{i}] must be a mapping")
+    return list(rules)
+
+
+def compile_policy(policy: Mapping[str, Any]) -> CompiledPolicy:
+    """Compile a parsed model-policy.yml document."""
+    required = policy.get("required") or ()
+    return CompiledPolicy(
+        deny=tuple(compile_deny(r, policy, i) for i, r in enumerate(_rules(policy, "deny"))),
+        require=tuple(
+            compile_require(r, policy, i) for i, r in enumerate(_rules(policy, "require"))
+        ),
+        required_fields=tuple(str(f) for f in required),
+        max_risk=float(policy.get("max_risk", 5.0)),
+    )
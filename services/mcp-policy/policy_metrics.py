@@ -0,0 +1,228 @@
+"""In-process latency histograms for the policy gate, rendered in Prometheus text format."""
+
+import bisect
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from policy_compiler import RuleTiming
+
+# Upper bounds in microseconds. Single rules usually run well below 1µs, whole
+# evaluations in the tens of µs, so the low end is deliberately fine-grained.
+BUCKETS_US: tuple[float, ...] = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 1_000_000,
+)  # fmt: skip
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _clock_overhead_ns(samples: int = 2000) -> int:
+    """Smallest observable gap between two perf_counter_ns() calls."""
+    clock = time.perf_counter_ns
+    best = 0
+    for i in range(samples):
+        t0 = clock()
+        gap = clock() - t0
+        if i == 0 or gap < best:
+            best = gap
+    return best
+
+
+# Subtracted from per-rule timings so sub-microsecond rules are not dominated by the timer.
+CLOCK_OVERHEAD_NS = _clock_overhead_ns()
+
+
+class Histogram:
+    """Cumulative-bucket histogram; callers serialize access (see MetricsRegistry)."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS_US):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = labels + (extra,) if extra else labels
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return f"{bound:g}"
+
+
+class MetricsRegistry:
+    """Named, labelled histograms guarded by one lock.
+
+    `observe_many` records a whole evaluation's worth of samples under a single
+    lock acquisition, which keeps profiling overhead per request roughly constant.
+    """
+
+    def __init__(self) -> None:
+        self._help: dict[str, str] = {}
+        self._series: dict[str, dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        self.observe_many(name, ((labels, value),))
+
+    def observe_many(self, name: str, samples: Iterable[tuple[Labels, float]]) -> None:
+        with self._lock:
+            series = self._series.setdefault(name, {})
+            for labels, value in samples:
+                hist = series.get(labels)
+                if hist is None:
+                    hist = series[labels] = Histogram()
+                hist.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def summary(self, name: str, top: int = 20) -> list[dict[str, Any]]:
+        """Series of `name` ordered by total observed time, largest first."""
+        with self._lock:
+            totals = [
+                (h.sum, labels, h.count)
+                for labels, h in self._series.get(name, {}).items()
+                if h.count
+            ]
+        totals.sort(key=lambda t: t[0], reverse=True)
+        return [
+            {**dict(labels), "count": count, "sum_us": total, "mean_us": total / count}
+            for total, labels, count in totals[:top]
+        ]
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name in sorted(self._series):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, h in sorted(self._series[name].items()):
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.counts, strict=False):
+                        cumulative += n
+                        le = ("le", _format_bound(bound))
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    le = ("le", "+Inf")
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {h.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _net_us(rule_ns: int) -> float:
+    return max(0, rule_ns - CLOCK_OVERHEAD_NS) / 1000
+
+
+@dataclass
+class EvaluationProfile:
+    """Per-phase and per-rule timings (nanoseconds) collected during one evaluation."""
+
+    phases: dict[str, int] = field(default_factory=dict)
+    # (rule_id, field, op, elapsed_ns) in execution order
+    rules: list[RuleTiming] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases_us": {k: v / 1000 for k, v in self.phases.items()},
+            "rules_us": {rule_id: _net_us(ns) for rule_id, _, _, ns in self.rules},
+        }
+
+
+class RuleProfile:
+    """Cumulative per-rule timings behind GET /api/v1/policies/profile.
+
+    Not exported as histograms: one series per bundle x rule would grow with every
+    policy edit. Rule ids are positional (`deny[0]`), so a bundle's totals are
+    dropped when it shows up with a new version instead of being merged with
+    whatever rule held that position before the reload.
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[str, str] = {}
+        # bundle -> (rule_id, field, op) -> [count, sum_us]
+        self._totals: dict[str, dict[tuple[str, str, str], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, bundle: str, version: str, rules: Iterable[RuleTiming]) -> None:
+        with self._lock:
+            if self._versions.get(bundle) != version:
+                self._versions[bundle] = version
+                self._totals[bundle] = {}
+            totals = self._totals[bundle]
+            for rule_id, fld, op, ns in rules:
+                entry = totals.setdefault((rule_id, fld, op), [0, 0.0])
+                entry[0] += 1
+                entry[1] += _net_us(ns)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._versions.clear()
+            self._totals.clear()
+
+    def summary(self, top: int = 20) -> list[dict[str, Any]]:
+        """Rules ordered by total observed time, largest first."""
+        with self._lock:
+            totals = [
+                (total, int(count), bundle, self._versions[bundle], key)
+                for bundle, by_rule in self._totals.items()
+                for key, (count, total) in by_rule.items()
+            ]
+        totals.sort(key=lambda t: t[0], reverse=True)
+        return [
+            {
+                "bundle": bundle,
+                "version": version,
+                "rule": rule_id,
+                "field": fld,
+                "op": op,
+                "count": count,
+                "sum_us": total,
+                "mean_us": total / count,
+            }
+            for total, count, bundle, version, (rule_id, fld, op) in totals[:top]
+        ]
+
+
+EVALUATION_US = "policy_evaluation_duration_microseconds"
+PHASE_US = "policy_phase_duration_microseconds"
+
+metrics = MetricsRegistry()
+metrics.describe(EVALUATION_US, "Wall time of one policy evaluation.")
+metrics.describe(PHASE_US, "Time per evaluation phase (profiling mode only).")
+rule_profile = RuleProfile()
+
+
+def record(bundle: str, version: str, elapsed_ns: int, profile: EvaluationProfile | None) -> None:
+    """Fold one evaluation into the per-bundle histograms and the per-rule profile."""
+    metrics.observe(EVALUATION_US, elapsed_ns / 1000, (("bundle", bundle),))
+    if profile is None:
+        return
+    metrics.observe_many(
+        PHASE_US,
+        (
+            ((("bundle", bundle), ("phase", phase)), ns / 1000)
+            for phase, ns in profile.phases.items()
+        ),
+    )
+    rule_profile.record(bundle, version, profile.rules)
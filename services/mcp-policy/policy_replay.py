@@ -0,0 +1,278 @@
+"""Replay recorded `model_inference` audit events against a candidate policy.
+
+Rows are streamed from `audit_log` through a server-side (named) cursor in
+chunks, evaluated against the candidate snapshot in a process pool, and folded
+into a ReplaySummary. At most `max_in_flight` chunks are queued at once, so
+memory stays bounded by roughly `max_in_flight * chunk_size` rows no matter how
+large the table is.
+
+The gateway records the exact policy payload under `details.policy_input`.
+Older events predate that; for them a partial payload (model_id, user_id,
+prompt_len) is reconstructed and the row is counted as `reconstructed`. A
+reconstructed payload lacks risk inputs and parameters, so its flips can come
+from the missing fields rather than the candidate; they are counted apart from
+the flips of exact rows.
+"""
+
+import multiprocessing
+import os
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from validators import PolicySnapshot, evaluate_offline, load_snapshot
+
+# (id, subject, decision, details) as selected from audit_log
+Row = tuple[int, str, bool, dict[str, Any]]
+
+REPLAY_SQL = (
+    "select id, subject, decision, details from audit_log"
+    " where event_type = 'model_inference' and id > %s"
+)
+# Reasons that explain a denial, as opposed to informational ones (risk:*, aibom_verified).
+_DECISIVE_PREFIXES = ("deny:", "require:", "missing:", "risk_exceeds:", "aibom_")
+_VARIABLE_PREFIXES = ("risk_exceeds:", "aibom_error:")
+_INFORMATIONAL = frozenset({"aibom_missing_allowed", "aibom_verified"})
+
+
+@dataclass
+class FlipCounts:
+    """Decision diff of one kind of row (exact or reconstructed)."""
+
+    unchanged: int = 0
+    allow_to_deny: int = 0
+    deny_to_allow: int = 0
+    # decisive reasons behind allow -> deny flips under the candidate
+    new_deny_reasons: Counter[str] = field(default_factory=Counter)
+    # decisive reasons of the original denials that the candidate now allows
+    cleared_reasons: Counter[str] = field(default_factory=Counter)
+
+    def merge(self, other: "FlipCounts") -> None:
+        self.unchanged += other.unchanged
+        self.allow_to_deny += other.allow_to_deny
+        self.deny_to_allow += other.deny_to_allow
+        self.new_deny_reasons.update(other.new_deny_reasons)
+        self.cleared_reasons.update(other.cleared_reasons)
+
+    def to_dict(self, top: int) -> dict[str, Any]:
+        return {
+            "unchanged": self.unchanged,
+            "allow_to_deny": self.allow_to_deny,
+            "deny_to_allow": self.deny_to_allow,
+            "new_deny_reasons": dict(self.new_deny_reasons.most_common(top)),
+            "cleared_reasons": dict(self.cleared_reasons.most_common(top)),
+        }
+
+
+@dataclass
+class ReplaySummary:
+    replayed: int = 0
+    exact: int = 0
+    reconstructed: int = 0
+    skipped: int = 0
+    errors: int = 0
+    last_id: int = 0
+    exact_flips: FlipCounts = field(default_factory=FlipCounts)
+    reconstructed_flips: FlipCounts = field(default_factory=FlipCounts)
+    samples: list[dict[str, Any]] = field(default_factory=list)
+
+    def merge(self, other: "ReplaySummary", sample_size: int) -> None:
+        for name in ("replayed", "exact", "reconstructed", "skipped", "errors"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.last_id = max(self.last_id, other.last_id)
+        self.exact_flips.merge(other.exact_flips)
+        self.reconstructed_flips.merge(other.reconstructed_flips)
+        # Chunks finish out of order; keep the lowest ids so output is deterministic.
+        self.samples = sorted(self.samples + other.samples, key=lambda s: s["id"])[:sample_size]
+
+    def to_dict(self, top: int = 20) -> dict[str, Any]:
+        """Top-level diff fields cover exact rows only; reconstructed rows report apart."""
+        return {
+            "replayed": self.replayed,
+            "exact": self.exact,
+            "reconstructed": self.reconstructed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "last_id": self.last_id,
+            **self.exact_flips.to_dict(top),
+            "reconstructed_flips": self.reconstructed_flips.to_dict(top),
+            "samples": self.samples,
+        }
+
+
+def replay_input(subject: str, details: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+    """Return (payload, exact) for one audit event."""
+    recorded = details.get("policy_input")
+    if isinstance(recorded, dict):
+        return recorded, True
+    payload: dict[str, Any] = {"model_id": subject}
+    for key in ("user_id", "prompt_len"):
+        if key in details:
+            payload[key] = details[key]
+    return payload, False
+
+
+def decisive_reasons(reasons: Iterable[Any]) -> list[str]:
+    """Reasons that explain a denial, with per-event values (scores, errors) stripped.
+
+    Stripping keeps the reason counters bounded by the number of rules.
+    """
+    return [
+        r.split(":", 1)[0] if r.startswith(_VARIABLE_PREFIXES) else r
+        for r in reasons
+        if isinstance(r, str) and r.startswith(_DECISIVE_PREFIXES) and r not in _INFORMATIONAL
+    ]
+
+
+def _original_reasons(details: dict[str, Any]) -> list[Any]:
+    policy = details.get("policy")
+    reasons = policy.get("reasons") if isinstance(policy, dict) else None
+    return reasons if isinstance(reasons, list) else []
+
+
+_candidate: PolicySnapshot | None = None
+
+
+def _init_worker(candidate_dir: str, bundle: str) -> None:
+    global _candidate
+    _candidate = load_snapshot(candidate_dir, bundle=bundle)
+
+
+def replay_chunk(
+    rows: list[Row],
+    exact_only: bool = False,
+    sample_size: int = 20,
+    snap: PolicySnapshot | None = None,
+) -> ReplaySummary:
+    """Evaluate one chunk against `snap` (or the worker's candidate) and summarize it."""
+    snap = snap or _candidate
+    assert snap is not None, "replay worker not initialized"
+    out = ReplaySummary()
+    for row_id, subject, decision, details in rows:
+        out.last_id = max(out.last_id, row_id)
+        payload, exact = replay_input(subject, details or {})
+        if exact_only and not exact:
+            out.skipped += 1
+            continue
+        try:
+            res = evaluate_offline(payload, snap)
+        except Exception:
+            out.errors += 1
+            continue
+        out.replayed += 1
+        if exact:
+            out.exact += 1
+            flips = out.exact_flips
+        else:
+            out.reconstructed += 1
+            flips = out.reconstructed_flips
+        if res.allowed == bool(decision):
+            flips.unchanged += 1
+            continue
+        if decision:
+            flips.allow_to_deny += 1
+            flips.new_deny_reasons.update(decisive_reasons(res.reasons))
+        else:
+            flips.deny_to_allow += 1
+            flips.cleared_reasons.update(decisive_reasons(_original_reasons(details or {})))
+        if len(out.samples) < sample_size:
+            out.samples.append(
+                {
+                    "id": row_id,
+                    "subject": subject,
+                    "was_allowed": bool(decision),
+                    "now_allowed": res.allowed,
+                    "reasons": res.reasons,
+                    "exact": exact,
+                }
+            )
+    return out
+
+
+def iter_audit_chunks(
+    conn: Any,
+    chunk_size: int,
+    since_id: int = 0,
+    until_id: int | None = None,
+    limit: int | None = None,
+) -> Iterator[list[Row]]:
+    """Stream model_inference rows in id order through a named (server-side) cursor."""
+    sql = REPLAY_SQL
+    params: list[Any] = [since_id]
+    if until_id is not None:
+        sql += " and id <= %s"
+        params.append(until_id)
+    sql += " order by id"
+    if limit is not None:
+        sql += " limit %s"
+        params.append(limit)
+    with conn.transaction(), conn.cursor(name="policy_replay") as cur:
+        cur.itersize = chunk_size
+        cur.execute(sql, params)
+        while rows := cur.fetchmany(chunk_size):
+            yield rows
+
+
+def replay_chunks(
+    chunks: Iterable[list[Row]],
+    candidate_dir: str,
+    bundle: str = "candidate",
+    workers: int = 0,
+    max_in_flight: int | None = None,
+    exact_only: bool = False,
+    sample_size: int = 20,
+) -> ReplaySummary:
+    """Replay `chunks` in-process (workers=0) or across a bounded process pool."""
+    summary = ReplaySummary()
+    if workers <= 0:
+        snap = load_snapshot(candidate_dir, bundle=bundle)
+        for rows in chunks:
+            summary.merge(replay_chunk(rows, exact_only, sample_size, snap), sample_size)
+        return summary
+
+    max_in_flight = max_in_flight or workers * 2
+    # spawn, not fork: the service process runs background threads (policy watcher).
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        workers, mp_context=ctx, initializer=_init_worker, initargs=(candidate_dir, bundle)
+    ) as pool:
+        pending: set[Future[ReplaySummary]] = set()
+        for rows in chunks:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    summary.merge(fut.result(), sample_size)
+            pending.add(pool.submit(replay_chunk, rows, exact_only, sample_size))
+        for fut in wait(pending).done:
+            summary.merge(fut.result(), sample_size)
+    return summary
+
+
+def replay(
+    dsn: str,
+    candidate_dir: str,
+    bundle: str = "candidate",
+    workers: int = os.cpu_count() or 1,
+    chunk_size: int = 5000,
+    since_id: int = 0,
+    until_id: int | None = None,
+    limit: int | None = None,
+    exact_only: bool = False,
+    sample_size: int = 20,
+) -> ReplaySummary:
+    """Replay audit events from the database at `dsn` against the policy in `candidate_dir`."""
+    import psycopg  # only needed for replay; the gate itself has no database dependency
+
+    with psycopg.connect(dsn) as conn:
+        conn.read_only = True
+        chunks = iter_audit_chunks(conn, chunk_size, since_id, until_id, limit)
+        return replay_chunks(
+            chunks,
+            candidate_dir,
+            bundle=bundle,
+            workers=workers,
+            exact_only=exact_only,
+            sample_size=sample_size,
+        )
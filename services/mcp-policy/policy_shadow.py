@@ -0,0 +1,180 @@
+"""Shadow evaluation of a candidate policy bundle on live traffic.
+
+Requests are evaluated against the active policy as usual; afterwards the
+payload and the active result are handed to a background worker through a
+bounded queue. The worker evaluates the same payload against the shadow bundle
+and aggregates disagreements. When the queue is full the sample is dropped and
+counted instead of blocking the request.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from typing import Any
+
+from policy_bundles import BundleRegistry, registry
+from policy_replay import decisive_reasons
+from validators import GateResult, evaluate_offline
+
+POLICY_SHADOW_BUNDLE = os.environ.get("POLICY_SHADOW_BUNDLE", "")
+POLICY_SHADOW_QUEUE_SIZE = int(os.environ.get("POLICY_SHADOW_QUEUE_SIZE", "1000"))
+POLICY_SHADOW_SAMPLES = int(os.environ.get("POLICY_SHADOW_SAMPLES", "50"))
+
+_logger = logging.getLogger("app")
+
+# (payload, active bundle, active allowed, active reasons, request_id)
+_Item = tuple[dict[str, Any], str, bool, list[str], str]
+
+
+class ShadowEvaluator:
+    """Bounded-queue background worker comparing active and shadow decisions."""
+
+    def __init__(
+        self,
+        registry: BundleRegistry,
+        bundle: str = "",
+        maxsize: int = POLICY_SHADOW_QUEUE_SIZE,
+        samples: int = POLICY_SHADOW_SAMPLES,
+    ):
+        self.registry = registry
+        self.bundle = bundle
+        self._queue: queue.Queue[_Item] = queue.Queue(maxsize=max(1, maxsize))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._samples: deque[dict[str, Any]] = deque(maxlen=samples)
+        self._reset_counters("")
+
+    def _reset_counters(self, version: str) -> None:
+        self.version = version
+        self.evaluated = 0
+        self.agreed = 0
+        self.allow_to_deny = 0
+        self.deny_to_allow = 0
+        self.errors = 0
+        self.dropped = 0
+        self.by_active_bundle: Counter[str] = Counter()
+        self.reasons: Counter[str] = Counter()
+        self._samples.clear()
+
+    def configure(self, bundle: str) -> None:
+        """Switch the shadow bundle ("" disables shadowing) and reset the aggregates."""
+        with self._lock:
+            self.bundle = bundle
+            self._reset_counters("")
+
+    def submit(self, payload: dict[str, Any], active: GateResult, request_id: str = "-") -> bool:
+        """Queue a shadow evaluation; never blocks. Returns False if dropped or disabled."""
+        if not self.bundle:
+            return False
+        item = (payload, active.policy_bundle, active.allowed, active.reasons, request_id)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="policy-shadow", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def join(self) -> None:
+        """Block until every queued item has been processed (tests, shutdown)."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                self._process(*item)
+            finally:
+                self._queue.task_done()
+            # Give the GIL back between items so request threads never wait out a
+            # full switch interval behind a backlog of shadow work.
+            time.sleep(0)
+
+    def _process(
+        self,
+        payload: dict[str, Any],
+        active_bundle: str,
+        active_allowed: bool,
+        active_reasons: list[str],
+        request_id: str,
+    ) -> None:
+        bundle = self.bundle
+        if not bundle:
+            return
+        try:
+            snap = self.registry.get(bundle)
+            res = evaluate_offline(payload, snap)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            _logger.error("policy_shadow_failed bundle=%s: %s", bundle, e)
+            return
+        with self._lock:
+            if bundle != self.bundle:
+                return  # reconfigured while this item was in flight
+            if snap.version != self.version:
+                self._reset_counters(snap.version)
+            self.evaluated += 1
+            if res.allowed == active_allowed:
+                self.agreed += 1
+                return
+            if active_allowed:
+                self.allow_to_deny += 1
+                self.reasons.update(decisive_reasons(res.reasons))
+            else:
+                self.deny_to_allow += 1
+                self.reasons.update("cleared:" + r for r in decisive_reasons(active_reasons))
+            self.by_active_bundle[active_bundle] += 1
+            self._samples.append(
+                {
+                    "time": time.time(),
+                    "request_id": request_id,
+                    "active_bundle": active_bundle,
+                    "active": {"allowed": active_allowed, "reasons": active_reasons},
+                    "shadow": {"allowed": res.allowed, "reasons": res.reasons},
+                }
+            )
+
+    def stats(self, top: int = 20) -> dict[str, Any]:
+        with self._lock:
+            disagreed = self.allow_to_deny + self.deny_to_allow
+            return {
+                "bundle": self.bundle or None,
+                "version": self.version or None,
+                "queued": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "evaluated": self.evaluated,
+                "agreed": self.agreed,
+                "disagreed": disagreed,
+                "disagreement_rate": disagreed / self.evaluated if self.evaluated else 0.0,
+                "allow_to_deny": self.allow_to_deny,
+                "deny_to_allow": self.deny_to_allow,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "by_active_bundle": dict(self.by_active_bundle),
+                "reasons": dict(self.reasons.most_common(top)),
+                "samples": list(self._samples),
+            }
+
+
+shadow = ShadowEvaluator(registry, POLICY_SHADOW_BUNDLE)
@@ -1,18 +1,50 @@
+import hashlib
 import json
+import logging
 import os
+import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 
+import numpy as np
+import policy_metrics
 import yaml
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from policy_cache import LRUCache
+from policy_compiler import CompiledPolicy, compile_policy
+from policy_metrics import PHASE_US, EvaluationProfile
 
 POLICIES_DIR = os.environ.get("POLICIES_DIR", "/app/policies")
 AIBOM_PUBLIC_KEY_PATH = os.environ.get("AIBOM_PUBLIC_KEY_PATH", "/app/keys/aibom_public_key.pem")
 AIBOM_REQUIRED = os.environ.get("AIBOM_REQUIRED", "false").lower() == "true"
 GATE_SLA_MS = int(os.environ.get("GATE_SLA_MS", "1500"))
+# Seconds between policy file change checks; 0 disables the background watcher.
+POLICY_RELOAD_INTERVAL_S = float(os.environ.get("POLICY_RELOAD_INTERVAL_S", "5"))
+
+# Bounded number of memoized AIBOM signature verification outcomes; 0 disables.
+AIBOM_VERIFY_CACHE_SIZE = int(os.environ.get("AIBOM_VERIFY_CACHE_SIZE", "4096"))
+
+# Opt-in decision cache: identical payloads under the same policy version reuse the
+# previous decision. Size 0 (default) disables it.
+POLICY_DECISION_CACHE_SIZE = int(os.environ.get("POLICY_DECISION_CACHE_SIZE", "0"))
+POLICY_DECISION_CACHE_TTL_S = float(os.environ.get("POLICY_DECISION_CACHE_TTL_S", "60"))
+
+# Time every phase and rule of every evaluation (callers can also ask per request).
+# Profiled evaluations run rules through the linear scan so each rule can be timed.
+POLICY_PROFILE = os.environ.get("POLICY_PROFILE", "false").lower() == "true"
+
+POLICY_FILES = ("model-policy.yml", "risk-matrix.yml")
+# Name reported for the snapshot loaded from POLICIES_DIR.
+DEFAULT_BUNDLE = "default"
+
+_logger = logging.getLogger("app")
+# (policy version, key fingerprint, payload digest) -> (allowed, reasons, risk_score)
+_decision_cache = LRUCache(POLICY_DECISION_CACHE_SIZE, POLICY_DECISION_CACHE_TTL_S)
 
 
 @dataclass
@@ -21,19 +53,249 @@ class GateResult:
     reasons: list[str]
     risk_score: float
     within_sla: bool
-    elapsed_ms: int
+    elapsed_ms: float  # microsecond resolution
+    policy_version: str = ""
+    policy_bundle: str = DEFAULT_BUNDLE
+    profile: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class RiskVector:
+    """risk-matrix.yml weights laid out as a vector for batch scoring."""
+
+    keys: tuple[str, ...]
+    labels: tuple[Any, ...]
+    weights: np.ndarray
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """Immutable, parsed view of the policy files at one point in time.
+
+    `version` is a content hash over both files, so identical policies always
+    report the same version regardless of when or where they were loaded.
+    `fingerprint` holds (mtime_ns, size) per file and is only used to detect changes.
+    `bundle` names the tenant bundle the files came from (see policy_bundles).
+    """
+
+    model_policy: Mapping[str, Any]
+    risk_matrix: Mapping[str, Any]
+    version: str
+    source: str
+    fingerprint: tuple[tuple[int, int], ...]
+    compiled: CompiledPolicy
+    risk_vector: RiskVector | None = None
+    loaded_at: float = field(default_factory=time.time)
+    bundle: str = DEFAULT_BUNDLE
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert parsed YAML into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _risk_vector(risk_matrix: Mapping[str, Any]) -> RiskVector | None:
+    weights = risk_matrix.get("weights")
+    if not isinstance(weights, Mapping):
+        return None
+    keys, labels, values = [], [], []
+    for k, w in weights.items():
+        try:
+            values.append(float(w))
+        except (TypeError, ValueError):
+            continue  # _compute_risk skips non-numeric weights too
+        keys.append(k)
+        labels.append(w)
+    vector = np.asarray(values, dtype=np.float64)
+    vector.flags.writeable = False
+    return RiskVector(keys=tuple(keys), labels=tuple(labels), weights=vector)
+
+
+def _fingerprint(policies_dir: str) -> tuple[tuple[int, int], ...]:
+    stats = (os.stat(os.path.join(policies_dir, name)) for name in POLICY_FILES)
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+
+def is_stale(snap: PolicySnapshot) -> bool:
+    """True if the files behind `snap` changed (or disappeared) since it was loaded."""
+    try:
+        return _fingerprint(snap.source) != snap.fingerprint
+    except FileNotFoundError:
+        return True
+
+
+def load_snapshot(policies_dir: str = POLICIES_DIR, bundle: str = DEFAULT_BUNDLE) -> PolicySnapshot:
+    """Read and parse the policy files in `policies_dir` into a new snapshot."""
+    # Stat before reading: a write racing with the read shows up as a changed
+    # fingerprint on the next check and triggers another reload.
+    fingerprint = _fingerprint(policies_dir)
+    digest = hashlib.sha256()
+    parsed: list[Mapping[str, Any]] = []
+    for name in POLICY_FILES:
+        with open(os.path.join(policies_dir, name), "rb") as f:
+            raw = f.read()
+        digest.update(name.encode("utf-8") + b"\0" + raw + b"\0")
+        parsed.append(_freeze(yaml.safe_load(raw) or {}))
+    model_policy, risk_matrix = parsed
+    return PolicySnapshot(
+        compiled=compile_policy(model_policy),
+        risk_vector=_risk_vector(risk_matrix),
+        model_policy=model_policy,
+        risk_matrix=risk_matrix,
+        version=digest.hexdigest()[:16],
+        source=policies_dir,
+        fingerprint=fingerprint,
+        bundle=bundle,
+    )
+
+
+_snapshot: PolicySnapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot() -> PolicySnapshot:
+    """Return the active policy snapshot, loading it on first use only."""
+    snap = _snapshot
+    if snap is None:
+        snap, _ = reload_policies(force=True)
+    return snap
 
 
-def _load_yaml(name: str) -> dict[str, Any]:
-    path = os.path.join(POLICIES_DIR, name)
-    with open(path, encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+def reload_policies(force: bool = False) -> tuple[PolicySnapshot, bool]:
+    """Swap in a fresh snapshot if the policy files changed (or `force` is set).
+
+    Returns the active snapshot and whether it was replaced. On a parse error the
+    previous snapshot stays active and the exception propagates to the caller.
+    """
+    global _snapshot
+    with _snapshot_lock:
+        current = _snapshot
+        if current is not None and not force and not is_stale(current):
+            return current, False
+        fresh = load_snapshot(current.source if current is not None else POLICIES_DIR)
+        changed = current is None or fresh.version != current.version
+        _snapshot = fresh
+    if changed:
+        _decision_cache.clear()
+        _logger.info("policy_snapshot_loaded version=%s", fresh.version)
+    return fresh, changed
+
+
+class PolicyWatcher:
+    """Background thread that polls the policy files and reloads on change.
+
+    `hooks` run on every tick after the default snapshot and key checks; a
+    failing hook is logged and does not stop the others.
+    """
+
+    def __init__(
+        self,
+        interval_s: float = POLICY_RELOAD_INTERVAL_S,
+        hooks: tuple[Callable[[], Any], ...] = (),
+    ):
+        self.interval_s = interval_s
+        self.hooks = hooks
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval_s <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="policy-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_s + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                reload_policies()
+            except Exception as e:  # keep serving the last good snapshot
+                _logger.error("policy_reload_failed: %s", e)
+            if refresh_public_key():
+                _logger.info("aibom_public_key_reloaded")
+            for hook in self.hooks:
+                try:
+                    hook()
+                except Exception as e:
+                    _logger.error("policy_watcher_hook_failed: %s", e)
+
+
+@dataclass(frozen=True)
+class _PublicKeyEntry:
+    """Parsed AIBOM verification key plus the file state it was loaded from."""
+
+    key: Ed25519PublicKey | None
+    fingerprint: str
+    file_state: tuple[int, int] | None
+    error: str | None = None
+
+
+_public_key: _PublicKeyEntry | None = None
+_public_key_lock = threading.Lock()
+# (key fingerprint, sha256 of canonical data, signature bytes) -> verified?
+_verify_cache = LRUCache(AIBOM_VERIFY_CACHE_SIZE)
 
 
-def _load_policies() -> tuple[dict[str, Any], dict[str, Any]]:
-    model_policy = _load_yaml("model-policy.yml")
-    risk_matrix = _load_yaml("risk-matrix.yml")
-    return model_policy, risk_matrix
+def _key_file_state(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load_public_key(path: str) -> _PublicKeyEntry:
+    state = _key_file_state(path)
+    try:
+        with open(path, "rb") as f:
+            pub_bytes = f.read()
+    except FileNotFoundError:
+        return _PublicKeyEntry(None, "", None, "aibom_pubkey_not_found")
+    try:
+        public_key = serialization.load_pem_public_key(pub_bytes)
+    except Exception as e:
+        return _PublicKeyEntry(None, "", state, f"aibom_error:{e}")
+    if not isinstance(public_key, Ed25519PublicKey):
+        return _PublicKeyEntry(None, "", state, "aibom_public_key_not_ed25519")
+    raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    return _PublicKeyEntry(public_key, hashlib.sha256(raw).hexdigest(), state)
+
+
+def refresh_public_key(force: bool = False) -> bool:
+    """Reload the AIBOM public key if the file changed (rotation). Returns True if reloaded."""
+    global _public_key
+    with _public_key_lock:
+        current = _public_key
+        if (
+            current is not None
+            and not force
+            and _key_file_state(AIBOM_PUBLIC_KEY_PATH) == current.file_state
+        ):
+            return False
+        _public_key = _load_public_key(AIBOM_PUBLIC_KEY_PATH)
+        changed = current is None or _public_key.fingerprint != current.fingerprint
+    if changed:
+        _verify_cache.clear()
+        _decision_cache.clear()
+    return True
+
+
+def _get_public_key() -> _PublicKeyEntry:
+    entry = _public_key
+    if entry is None:
+        refresh_public_key(force=True)
+        entry = _public_key
+    assert entry is not None
+    return entry
 
 
 def _verify_aibom(payload: dict[str, Any]) -> tuple[bool, str]:
@@ -41,6 +303,8 @@ def _verify_aibom(payload: dict[str, Any]) -> tuple[bool, str]:
     Expected structure:
     payload["aibom"] = {"data": <object>, "signature": <hex/base64>}
     We canonicalize JSON for verification; signature is assumed hex-encoded.
+    The parsed key is cached until the key file changes, and verification outcomes
+    are memoized by (key fingerprint, data digest, signature).
     """
     aibom = payload.get("aibom")
     if not aibom:
@@ -49,13 +313,14 @@ def _verify_aibom(payload: dict[str, Any]) -> tuple[bool, str]:
             "aibom_missing_allowed" if not AIBOM_REQUIRED else "aibom_missing_denied",
         )
 
-    try:
-        with open(AIBOM_PUBLIC_KEY_PATH, "rb") as f:
-            pub_bytes = f.read()
-        public_key = serialization.load_pem_public_key(pub_bytes)
-        if not isinstance(public_key, Ed25519PublicKey):
-            return False, "aibom_public_key_not_ed25519"
+    entry = _get_public_key()
+    if entry.error == "aibom_pubkey_not_found":
+        # If required, deny; otherwise allow with note
+        return (not AIBOM_REQUIRED, entry.error)
+    if entry.key is None:
+        return False, entry.error or "aibom_public_key_unavailable"
 
+    try:
         data_canonical = json.dumps(
             aibom.get("data"), sort_keys=True, separators=(",", ":")
         ).encode("utf-8")
@@ -66,18 +331,24 @@ def _verify_aibom(payload: dict[str, Any]) -> tuple[bool, str]:
             sig = bytes.fromhex(sig_hex)
         except ValueError:
             return (False, "aibom_signature_not_hex")
-        public_key.verify(sig, data_canonical)
-        return True, "aibom_verified"
-    except FileNotFoundError:
-        # If required, deny; otherwise allow with note
-        return (not AIBOM_REQUIRED, "aibom_pubkey_not_found")
-    except InvalidSignature:
-        return False, "aibom_signature_invalid"
+
+        cache_key = (entry.fingerprint, hashlib.sha256(data_canonical).digest(), sig)
+        verified = _verify_cache.get(cache_key)
+        if verified is None:
+            try:
+                entry.key.verify(sig, data_canonical)
+                verified = True
+            except InvalidSignature:
+                verified = False
+            _verify_cache.put(cache_key, verified)
+        return (True, "aibom_verified") if verified else (False, "aibom_signature_invalid")
     except Exception as e:
         return False, f"aibom_error:{e}"
 
 
-def _compute_risk(payload: dict[str, Any], risk_matrix: dict[str, Any]) -> tuple[float, list[str]]:
+def _compute_risk(
+    payload: dict[str, Any], risk_matrix: Mapping[str, Any]
+) -> tuple[float, list[str]]:
     """Compute a simple risk score.
     Supports two schemas:
     1) risk-matrix with 'weights' and optional 'thresholds'. Expects payload['risk'] to contain numeric factors.
@@ -88,7 +359,7 @@ def _compute_risk(payload: dict[str, Any], risk_matrix: dict[str, Any]) -> tuple
 
     # Newer schema: weights * factors
     weights = risk_matrix.get("weights")
-    if isinstance(weights, dict):
+    if isinstance(weights, Mapping):
         factors = payload.get("risk", {}) or {}
         if isinstance(factors, dict):
             for k, w in weights.items():
@@ -122,12 +393,217 @@ def _compute_risk(payload: dict[str, Any], risk_matrix: dict[str, Any]) -> tuple
     return score, reasons
 
 
-def evaluate(payload: dict[str, Any]) -> GateResult:
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _compute_risk_batch(
+    payloads: list[dict[str, Any]], snap: PolicySnapshot
+) -> list[tuple[float, list[str]]]:
+    """Score many payloads at once: one (N x K) factor matrix times the weight vector.
+
+    Matches _compute_risk per payload, up to floating-point summation order.
+    """
+    vec = snap.risk_vector
+    if vec is None or not vec.keys:
+        return [_compute_risk(p, snap.risk_matrix) for p in payloads]
+
+    out: list[tuple[float, list[str]] | None] = [None] * len(payloads)
+    rows: list[list[Any]] = []
+    row_index: list[int] = []
+    for i, p in enumerate(payloads):
+        factors = p.get("risk", {}) or {}
+        if isinstance(factors, dict):
+            rows.append([factors.get(k, 0) for k in vec.keys])
+            row_index.append(i)
+        else:
+            out[i] = _compute_risk(p, snap.risk_matrix)
+
+    if rows:
+        try:
+            matrix = np.asarray(rows, dtype=np.float64)
+        except (TypeError, ValueError):
+            matrix = np.asarray([[_to_float(v) for v in row] for row in rows], dtype=np.float64)
+        # None coerces to NaN in NumPy but is skipped by float(); redo those rows exactly.
+        for nan_row in np.flatnonzero(np.isnan(matrix).any(axis=1)):
+            matrix[nan_row] = [_to_float(v) for v in rows[nan_row]]
+
+        scores = (matrix @ vec.weights).tolist()
+        # Reason strings are inherently per-element; build them from plain lists,
+        # which is far cheaper than indexing the ndarray element by element.
+        numeric = [
+            (k, w) if isinstance(w, int | float) else (k, None)
+            for k, w in zip(vec.keys, vec.labels, strict=True)
+        ]
+        for r, (i, row) in enumerate(zip(row_index, matrix.tolist(), strict=True)):
+            reasons = [
+                f"risk:{k}*{w}={v*w}"
+                for (k, w), v in zip(numeric, row, strict=True)
+                if v and w is not None
+            ]
+            out[i] = (scores[r], reasons)
+
+    return [res for res in out if res is not None]
+
+
+def _rule_document(payload: dict[str, Any], score: float) -> Mapping[str, Any]:
+    risk = payload.get("risk")
+    if isinstance(risk, dict):
+        if "score" in risk:
+            return payload
+        return {**payload, "risk": {**risk, "score": score}}
+    if risk is None:
+        return {**payload, "risk": {"score": score}}
+    return payload
+
+
+def _result(
+    allowed: bool,
+    reasons: list[str],
+    score: float,
+    t0: int,
+    snap: PolicySnapshot,
+    prof: EvaluationProfile | None = None,
+    record: bool = True,
+) -> GateResult:
+    elapsed_ns = time.perf_counter_ns() - t0
+    elapsed_ms = elapsed_ns / 1_000_000
+    if record:
+        policy_metrics.record(snap.bundle, snap.version, elapsed_ns, prof)
+    return GateResult(
+        allowed=allowed,
+        reasons=reasons,
+        risk_score=score,
+        within_sla=(elapsed_ms <= GATE_SLA_MS),
+        elapsed_ms=round(elapsed_ms, 3),
+        policy_version=snap.version,
+        policy_bundle=snap.bundle,
+        profile=prof.to_dict() if prof is not None else None,
+    )
+
+
+def _decision_key(payload: dict[str, Any], snap: PolicySnapshot) -> tuple[str, str, str, bytes]:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(canonical.encode("utf-8")).digest()
+    # AIBOM outcomes depend on the verification key, so a rotation must miss too.
+    fingerprint = _get_public_key().fingerprint if payload.get("aibom") else ""
+    # Bundles with identical files share a version; results name their bundle, so keep them apart.
+    return (snap.bundle, snap.version, fingerprint, digest)
+
+
+def decision_cache_stats() -> dict[str, dict[str, int]]:
+    return {"decisions": _decision_cache.stats(), "aibom_verifications": _verify_cache.stats()}
+
+
+def _profile(profile: bool | None) -> EvaluationProfile | None:
+    return EvaluationProfile() if (POLICY_PROFILE if profile is None else profile) else None
+
+
+def evaluate(
+    payload: dict[str, Any], snap: PolicySnapshot | None = None, profile: bool | None = None
+) -> GateResult:
+    """Evaluate `payload` against `snap`, or the default snapshot when not given.
+
+    `profile` overrides POLICY_PROFILE for this call; the per-phase and per-rule
+    timings are returned on the result and folded into policy_metrics.
+    """
+    t0 = time.perf_counter_ns()
+    if snap is None:
+        snap = get_snapshot()
+    prof = _profile(profile)
+
+    cache_key = None
+    if _decision_cache.maxsize:
+        cache_key = _decision_key(payload, snap)
+        hit = _decision_cache.get(cache_key)
+        if prof is not None:
+            prof.phases["decision_cache"] = time.perf_counter_ns() - t0
+        if hit is not None:
+            allowed, reasons, score = hit
+            return _result(allowed, list(reasons), score, t0, snap, prof)
+
+    t_risk = time.perf_counter_ns()
+    score, risk_reasons = _compute_risk(payload, snap.risk_matrix)
+    if prof is not None:
+        prof.phases["risk"] = time.perf_counter_ns() - t_risk
+    res = _decide(payload, snap, score, risk_reasons, t0, prof)
+    if cache_key is not None:
+        _decision_cache.put(cache_key, (res.allowed, tuple(res.reasons), res.risk_score))
+    return res
+
+
+def evaluate_offline(payload: dict[str, Any], snap: PolicySnapshot) -> GateResult:
+    """evaluate() for shadow and replay runs, which are not served traffic.
+
+    Skips the decision cache and records no latency metrics, so these runs can
+    neither evict live cache entries nor skew the per-bundle histograms.
+    """
+    t0 = time.perf_counter_ns()
+    score, risk_reasons = _compute_risk(payload, snap.risk_matrix)
+    return _decide(payload, snap, score, risk_reasons, t0, record=False)
+
+
+def evaluate_batch(
+    payloads: list[dict[str, Any]], snap: PolicySnapshot | None = None, profile: bool | None = None
+) -> list[GateResult]:
+    """Evaluate many payloads against one snapshot with vectorized risk scoring.
+
+    Risk scoring happens once for the whole batch, so when profiling it is recorded
+    as a single `risk_batch` phase rather than per result.
+    """
+    if snap is None:
+        snap = get_snapshot()
+    t_risk = time.perf_counter_ns()
+    risks = _compute_risk_batch(payloads, snap)
+    profiling = POLICY_PROFILE if profile is None else profile
+    if profiling:
+        policy_metrics.metrics.observe(
+            PHASE_US,
+            (time.perf_counter_ns() - t_risk) / 1000,
+            (("bundle", snap.bundle), ("phase", "risk_batch")),
+        )
+    return [
+        _decide(p, snap, score, risk_reasons, time.perf_counter_ns(), _profile(profiling))
+        for p, (score, risk_reasons) in zip(payloads, risks, strict=True)
+    ]
+
+
+def _apply_rules(
+    compiled: CompiledPolicy, doc: Mapping[str, Any], prof: EvaluationProfile | None
+) -> tuple[str | None, list[str]]:
+    """Run deny then require rules; returns (deny reason, require violations)."""
+    if prof is None:
+        deny_reason = compiled.first_deny(doc)
+        return deny_reason, [] if deny_reason is not None else compiled.violations(doc)
+
+    t0 = time.perf_counter_ns()
+    deny_reason = compiled.first_deny_profiled(doc, prof.rules)
+    prof.phases["deny"] = time.perf_counter_ns() - t0
+    if deny_reason is not None:
+        return deny_reason, []
     t0 = time.perf_counter_ns()
-    policies, risk_matrix = _load_policies()
+    violations = compiled.violations_profiled(doc, prof.rules)
+    prof.phases["require"] = time.perf_counter_ns() - t0
+    return None, violations
 
+
+def _decide(
+    payload: dict[str, Any],
+    snap: PolicySnapshot,
+    score: float,
+    risk_reasons: list[str],
+    t0: int,
+    prof: EvaluationProfile | None = None,
+    record: bool = True,
+) -> GateResult:
     # 1) AIBOM verification (optional)
+    t_aibom = time.perf_counter_ns()
     aibom_ok, aibom_reason = _verify_aibom(payload)
+    if prof is not None:
+        prof.phases["aibom"] = time.perf_counter_ns() - t_aibom
 
     reasons: list[str] = []
     if not aibom_ok:
@@ -136,57 +612,25 @@ def evaluate(payload: dict[str, Any]) -> GateResult:
         if aibom_reason:
             reasons.append(aibom_reason)
 
-    # 2) Risk computation
-    score, risk_reasons = _compute_risk(payload, risk_matrix)
+    # 2) Risk computation (done by the caller, per payload or per batch)
     reasons.extend(risk_reasons)
 
-    # 3) Threshold evaluation from model-policy.yml
-    # Expected keys: required/deny lists, max_risk
-    max_risk = float(policies.get("max_risk", 5.0))
-
-    # Explicit deny rules (simple contains checks)
-    deny_rules = policies.get("deny", []) or []
-    for rule in deny_rules:
-        # rule example: { field: "use_case", equals: "ads-targeting" }
-        field = rule.get("field")
-        equals = rule.get("equals")
-        if field and equals is not None and str(payload.get(field)) == str(equals):
-            reasons.append(f"deny:{field}={equals}")
-            allowed = False
-            elapsed_ms = int((time.perf_counter_ns() - t0) / 1_000_000)
-            return GateResult(
-                allowed=allowed,
-                reasons=reasons,
-                risk_score=score,
-                within_sla=(elapsed_ms <= GATE_SLA_MS),
-                elapsed_ms=elapsed_ms,
-            )
-
-    # Required fields
-    req_fields = policies.get("required", []) or []
-    missing = [f for f in req_fields if payload.get(f) in (None, "")]
-    if missing:
-        reasons.append("missing:" + ",".join(missing))
-        allowed = False
-        elapsed_ms = int((time.perf_counter_ns() - t0) / 1_000_000)
-        return GateResult(
-            allowed=allowed,
-            reasons=reasons,
-            risk_score=score,
-            within_sla=(elapsed_ms <= GATE_SLA_MS),
-            elapsed_ms=elapsed_ms,
-        )
+    # 3) Compiled deny/require rules from model-policy.yml. Rules see the computed
+    # risk score as `risk.score` unless the payload supplies one itself.
+    compiled = snap.compiled
+    doc = _rule_document(payload, score)
+
+    deny_reason, violations = _apply_rules(compiled, doc, prof)
+    if deny_reason is not None:
+        reasons.append(deny_reason)
+        return _result(False, reasons, score, t0, snap, prof, record)
+    if violations:
+        reasons.extend(violations)
+        return _result(False, reasons, score, t0, snap, prof, record)
 
     # Risk threshold
+    max_risk = compiled.max_risk
     allowed = aibom_ok and (score <= max_risk)
     if not allowed and score > max_risk:
         reasons.append(f"risk_exceeds:{score}>{max_risk}")
-
-    elapsed_ms = int((time.perf_counter_ns() - t0) / 1_000_000)
-    return GateResult(
-        allowed=allowed,
-        reasons=reasons,
-        risk_score=score,
-        within_sla=(elapsed_ms <= GATE_SLA_MS),
-        elapsed_ms=elapsed_ms,
-    )
+    return _result(allowed, reasons, score, t0, snap, prof, record)
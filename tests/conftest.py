@@ -1,4 +1,6 @@
 import os
+import sys
+from pathlib import Path
 
 import pytest
 import requests
@@ -20,3 +22,17 @@ def _get_or_skip(url: str, timeout: float = 3.0) -> requests.Response:
         return resp
     except (requests.ConnectionError, requests.Timeout) as exc:
         pytest.skip(f"Service not reachable at {url}: {exc!s}")
+
+
+@pytest.fixture(scope="session")
+def audit_app():
+    """mcp-audit's app module for unit tests of its pure helpers; the pool is never opened."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("psycopg_pool")
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+    # The module refuses to import without a DSN; keep the placeholder out of other tests.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", os.environ.get("DATABASE_URL", "postgresql://localhost/unused"))
+        import audit_app
+
+    return audit_app
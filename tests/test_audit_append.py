@@ -0,0 +1,127 @@
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from hashlib import sha256
+
+import pytest
+
+# The hash expression of APPEND_SQL with its separator and text encoding captured.
+HASH_EXPR = re.compile(
+    r"entry_hash = encode\(sha256\(convert_to\(entry_hash \|\| '(.*?)' \|\| %\(payload\)s,"
+    r" '(\w+)'\)\), 'hex'\),"
+)
+
+
+class _HeadCursor:
+    """Evaluates APPEND_SQL for one chain head the way Postgres would."""
+
+    def __init__(self, sql_hash):
+        self.sql_hash = sql_hash
+        self.head = "GENESIS"
+        self.last_id = 0
+        self.calls: list = []
+        self._row: tuple | None = None
+
+    async def execute(self, sql: str, params: dict, prepare: bool = False) -> None:
+        self.calls.append((sql, params, prepare))
+        prev, self.head = self.head, self.sql_hash(self.head, params["payload"])
+        self.last_id += 1
+        details = params["details"].obj  # psycopg Json adapter
+        self._row = (
+            self.last_id,
+            params["event_type"],
+            params["subject"],
+            params["decision"],
+            details,
+            prev,
+            self.head,
+            datetime(2026, 10, 1, tzinfo=UTC),
+            params["request_id"],
+            params["shard"],
+        )
+
+    async def fetchone(self) -> tuple | None:
+        return self._row
+
+
+class _Pool:
+    def __init__(self, cur: _HeadCursor):
+        self.cur = cur
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield self.cur
+
+
+@pytest.fixture()
+def sql_hash(audit_app):
+    match = HASH_EXPR.search(audit_app.APPEND_SQL)
+    assert match, "APPEND_SQL no longer computes entry_hash as sha256(prev || sep || payload)"
+    sep, encoding = match.groups()
+    assert encoding == "UTF8"
+
+    def digest(prev_hash: str, payload_str: str) -> str:
+        return sha256((prev_hash + sep + payload_str).encode("utf-8")).hexdigest()
+
+    return digest
+
+
+def test_append_sql_hash_matches_chain_hash(audit_app, sql_hash) -> None:
+    from audit_chain import chain_hash, payload
+
+    body = payload("inference", "modèl-α", True, {"b": [1, "é"], "a": None})
+    assert sql_hash("GENESIS", body) == chain_hash("GENESIS", body)
+
+
+def test_append_sql_placeholders(audit_app) -> None:
+    names = set(re.findall(r"%\((\w+)\)s", audit_app.APPEND_SQL))
+    assert names == {
+        "payload",
+        "shard",
+        "event_type",
+        "subject",
+        "decision",
+        "details",
+        "request_id",
+    }
+
+
+def test_log_event_rows_verify(audit_app, sql_hash, monkeypatch) -> None:
+    from audit_chain import payload, verify_rows
+
+    cur = _HeadCursor(sql_hash)
+    monkeypatch.setattr(audit_app, "pool", _Pool(cur))
+    monkeypatch.setattr(audit_app, "group_commit", None)
+    events = [
+        audit_app.AuditIn(event_type="inference", subject="m-é", decision=True, details={"z": 1}),
+        audit_app.AuditIn(event_type="lineage", subject="m-2", decision=False, details={"x": "ü"}),
+    ]
+
+    async def log_all() -> list[dict]:
+        return [await audit_app.log_event(evt) for evt in events]
+
+    logged = asyncio.run(log_all())
+    for (sql, params, prepare), evt in zip(cur.calls, events, strict=True):
+        assert sql is audit_app.APPEND_SQL and prepare is True
+        assert params["payload"] == payload(evt.event_type, evt.subject, evt.decision, evt.details)
+        assert params["details"].obj == evt.details
+        assert params["shard"] == 0
+    rows = [
+        (
+            e["id"],
+            e["event_type"],
+            e["subject"],
+            e["decision"],
+            e["details"],
+            e["prev_hash"],
+            e["entry_hash"],
+        )
+        for e in logged
+    ]
+    seg = verify_rows(rows)
+    assert seg.break_count == 0 and seg.first_prev_hash == "GENESIS"
@@ -0,0 +1,105 @@
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+pytest.importorskip("zstandard")
+
+from audit_archive import (  # noqa: E402
+    DATA_SUFFIX,
+    Archive,
+    ArchiveError,
+    SegmentInfo,
+    SegmentWriter,
+    verify_segment,
+)
+from audit_chain import chain_hash, genesis, payload  # noqa: E402
+
+T0 = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _rows(n: int, shards: int = 2) -> list[tuple]:
+    """n chained rows in ROW_FIELDS order, alternating between shards."""
+    heads = {s: genesis(s) for s in range(shards)}
+    rows = []
+    for i in range(1, n + 1):
+        shard = i % shards
+        event_type, subject, decision = "policy_decision", f"model-{i % 3}", i % 4 != 0
+        details = {"seq": i}
+        entry = chain_hash(heads[shard], payload(event_type, subject, decision, details))
+        rows.append(
+            (
+                i,
+                event_type,
+                subject,
+                decision,
+                details,
+                heads[shard],
+                entry,
+                T0 + timedelta(minutes=i),
+                None,
+                shard,
+            )
+        )
+        heads[shard] = entry
+    return rows
+
+
+def _segment(tmp_path: Path, rows: list[tuple], block_size: int = 4) -> SegmentInfo:
+    writer = SegmentWriter(tmp_path, {})
+    for block_no, start in enumerate(range(0, len(rows), block_size)):
+        writer.add_block(block_no, rows[start : start + block_size])
+    return SegmentInfo(segment_no=0, **writer.finish())
+
+
+def test_segment_roundtrip_lookup_and_verify(tmp_path: Path) -> None:
+    rows = _rows(10)
+    segment = _segment(tmp_path, rows)
+    assert (segment.first_id, segment.last_id, segment.rows) == (1, 10, 10)
+    assert (segment.first_block_no, segment.last_block_no) == (0, 2)
+    assert segment.shards["1"]["first_prev_hash"] == genesis(1)
+    assert segment.end_heads == {0: (10, rows[9][6]), 1: (9, rows[8][6])}
+    assert verify_segment(tmp_path, segment, {}) == []
+
+    archive = Archive(tmp_path)
+    archive.segments = [segment]
+    assert archive.entries(5, 8) == [(r[0], r[6]) for r in rows[4:8]]
+
+    page, cursor = archive.events(None, 3, {}, scan_rows=1000)
+    assert [e["id"] for e in page] == [10, 9, 8] and cursor is None
+    assert page[0]["created_at"] == (T0 + timedelta(minutes=10)).isoformat()
+    page, _ = archive.events(8, 100, {"subject": "model-1", "decision": True}, 1000)
+    assert [e["id"] for e in page] == [7, 1]
+    page, _ = archive.events(None, 100, {"created_to": T0 + timedelta(minutes=3)}, 1000)
+    assert [e["id"] for e in page] == [2, 1]
+    # The scan budget stops after whole frames and hands back where to resume.
+    page, cursor = archive.events(None, 100, {"subject": "none"}, scan_rows=4)
+    assert page == [] and cursor == 5
+    archive.close()
+
+
+def test_verify_segment_detects_tampering(tmp_path: Path) -> None:
+    segment = _segment(tmp_path, _rows(8))
+    data = tmp_path / f"{segment.file_name}{DATA_SUFFIX}"
+    raw = data.read_bytes()
+    data.write_bytes(raw[:-1] + bytes([raw[-1] ^ 0xFF]))
+    assert verify_segment(tmp_path, segment, {}) == ["file_sha256_mismatch"]
+    # A segment that does not continue the previous heads breaks the chain.
+    other = tmp_path / "other"
+    other.mkdir()
+    segment = _segment(other, _rows(8))
+    problems = verify_segment(other, segment, {0: (0, "not-the-head")})
+    assert problems[0] == "prev_hash_mismatch:id=2"
+
+
+def test_writer_refuses_broken_chain(tmp_path: Path) -> None:
+    rows = _rows(4)
+    rows[2] = rows[2][:4] + ({"seq": "forged"},) + rows[2][5:]
+    writer = SegmentWriter(tmp_path, {})
+    with pytest.raises(ArchiveError, match="id 3: entry_hash_mismatch"):
+        writer.add_block(0, rows)
+    writer.abort()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,144 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_chain import (  # noqa: E402
+    GENESIS,
+    VerifyJobs,
+    chain_hash,
+    combined_root,
+    genesis,
+    payload,
+    shard_for,
+    split_range,
+    stitch,
+    verify_rows,
+)
+
+
+def _chain(n: int, start: str = GENESIS) -> list[tuple]:
+    rows = []
+    prev = start
+    for i in range(1, n + 1):
+        details = {"seq": i, "note": "é"}
+        entry = chain_hash(prev, payload("test", f"s{i}", i % 3 != 0, details))
+        rows.append((i, "test", f"s{i}", i % 3 != 0, details, prev, entry))
+        prev = entry
+    return rows
+
+
+def _segments(rows: list[tuple], segment_rows: int) -> list:
+    return [
+        verify_rows([r for r in rows if lo < r[0] <= hi], lo, hi)
+        for lo, hi in split_range(0, len(rows), segment_rows)
+    ]
+
+
+def test_payload_matches_service_canonical_form() -> None:
+    assert payload("t", "s", True, {"b": 1, "a": [1, 2]}) == (
+        '{"decision":true,"details":{"a":[1,2],"b":1},"event_type":"t","subject":"s"}'
+    )
+
+
+def test_split_range_covers_ids_without_overlap() -> None:
+    assert split_range(0, 10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert split_range(5, 5, 4) == []
+
+
+def test_segmented_verification_matches_single_pass() -> None:
+    rows = _chain(50)
+    rows_verified, breaks, count, final = stitch(_segments(rows, 7), GENESIS)
+    assert (rows_verified, breaks, count) == (50, [], 0)
+    assert final == rows[-1][6]
+
+
+def test_tampered_row_and_broken_segment_link_are_reported() -> None:
+    rows = _chain(30)
+    # Rewrite row 12's subject without re-hashing: its own hash no longer matches.
+    r = rows[11]
+    rows[11] = (r[0], r[1], "forged", *r[3:])
+    # Replace row 21 (a segment boundary with size 10) with a self-consistent entry that chains
+    # from the wrong hash: only the stitching step can see this.
+    r = rows[20]
+    forged = chain_hash("0" * 64, payload(r[1], r[2], r[3], r[4]))
+    rows[20] = (*r[:5], "0" * 64, forged)
+
+    _, breaks, count, _ = stitch(_segments(rows, 10), GENESIS)
+    assert {"id": 12, "shard": 0, "reason": "entry_hash_mismatch"} in breaks
+    assert {"id": 21, "shard": 0, "reason": "prev_hash_mismatch"} in breaks
+    # row 22 still links to the original row 21 hash
+    assert {"id": 22, "shard": 0, "reason": "prev_hash_mismatch"} in breaks
+    assert count == len(breaks) == 3
+
+
+def test_resume_from_checkpoint_hash() -> None:
+    rows = _chain(20)
+    checkpoint_id, checkpoint_hash = 8, rows[7][6]
+    tail = [verify_rows(rows[checkpoint_id:], checkpoint_id, 20)]
+    assert stitch(tail, checkpoint_hash)[2] == 0
+    assert stitch(tail, GENESIS)[2] == 1
+
+
+def test_shard_assignment_is_stable_and_spread() -> None:
+    assert shard_for("resnet-50@1.0.0", 1) == 0
+    assert shard_for("resnet-50@1.0.0", 8) == shard_for("resnet-50@1.0.0", 8)
+    counts = [0] * 8
+    for i in range(4000):
+        counts[shard_for(f"model-{i}", 8)] += 1
+    assert min(counts) > 400
+
+
+def test_shards_verify_independently_and_combined_root_tracks_heads() -> None:
+    shard1 = [(r[0] * 2, *r[1:]) for r in _chain(5, start=genesis(1))]  # interleaved ids, own chain
+    assert genesis(0) == GENESIS and genesis(1) == "GENESIS:1"
+    seg = verify_rows(shard1, 0, 10, shard=1)
+    assert stitch([seg], genesis(1))[2] == 0
+    assert stitch([seg], GENESIS)[2] == 1
+    heads = [(0, 9, "a" * 64), (1, 10, seg.last_entry_hash)]
+    assert combined_root(heads) != combined_root([(0, 9, "a" * 64), (1, 8, "b" * 64)])
+
+
+def _wait(jobs: VerifyJobs) -> dict:
+    for _ in range(500):
+        job = jobs.status()
+        assert job is not None
+        if job["status"] != "running":
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("verify job did not finish")
+
+
+def test_verify_jobs_run_in_background_one_at_a_time() -> None:
+    release = threading.Event()
+    calls: list[bool] = []
+
+    def run(full: bool) -> dict:
+        calls.append(full)
+        release.wait(5)
+        return {"ok": True, "break_count": 0}
+
+    jobs = VerifyJobs(run)
+    assert jobs.status() is None
+    job, started = jobs.start(full=True)
+    assert started and job["status"] == "running" and job["report"] is None
+    again, started = jobs.start(full=False)
+    assert not started and again["job_id"] == job["job_id"]
+    release.set()
+    done = _wait(jobs)
+    assert done["status"] == "done" and done["report"] == {"ok": True, "break_count": 0}
+    assert done["finished_at"] is not None and calls == [True]
+    # A finished job does not block the next one.
+    _, started = jobs.start(full=False)
+    assert started
+
+
+def test_verify_job_failure_is_reported() -> None:
+    def run(full: bool) -> dict:
+        raise RuntimeError("db down")
+
+    jobs = VerifyJobs(run)
+    jobs.start(full=False)
+    job = _wait(jobs)
+    assert job["status"] == "failed" and job["error"] == "verify_failed" and job["report"] is None
@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_chain import APPEND_SQL, HEADS_SQL, _cut, combined_root, payload  # noqa: E402
+
+psycopg = pytest.importorskip("psycopg")
+
+
+def test_cut_orders_heads_by_shard() -> None:
+    # UPDATE ... RETURNING has no defined row order; the combined root must not depend on it.
+    heads, watermark = _cut([(1, 12, "b" * 64), (0, None, "GENESIS")])
+    assert heads == [(0, 0, "GENESIS"), (1, 12, "b" * 64)] and watermark == 12
+    assert combined_root(heads) == combined_root(_cut([(0, None, "GENESIS"), (1, 12, "b" * 64)])[0])
+
+
+def _connect(**kwargs):
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        pytest.skip("DATABASE_URL not set")
+    try:
+        return psycopg.connect(url, **kwargs)
+    except psycopg.OperationalError as exc:
+        pytest.skip(f"Database not reachable: {exc!s}")
+
+
+def _wait_for_lock(conn, pid: int) -> None:
+    for _ in range(500):
+        row = conn.execute(
+            "SELECT wait_event_type FROM pg_stat_activity WHERE pid = %s", (pid,)
+        ).fetchone()
+        if row and row[0] == "Lock":
+            return
+        time.sleep(0.01)
+    raise AssertionError("append never waited for the head row lock")
+
+
+@pytest.mark.integration
+def test_append_waiting_on_the_cut_redraws_its_id_above_the_watermark() -> None:
+    cut = _connect()
+    appender = _connect(autocommit=True)
+    observer = _connect(autocommit=True)
+    details = {"test": "chain_cut"}
+    params = {
+        "payload": payload("chain_cut_test", "cut", True, details),
+        "event_type": "chain_cut_test",
+        "subject": "cut",
+        "decision": True,
+        "details": psycopg.types.json.Json(details),
+        "request_id": None,
+        "shard": 0,
+    }
+    result: list = []
+    try:
+        with cut.cursor() as cur:
+            cur.execute(HEADS_SQL)  # the cut holds every head row until it commits
+            _, watermark = _cut(cur.fetchall())
+
+        def append() -> None:
+            with appender.cursor() as cur:
+                cur.execute(APPEND_SQL, params)
+                result.append(cur.fetchone())
+
+        thread = threading.Thread(target=append)
+        thread.start()
+        _wait_for_lock(observer, appender.info.backend_pid)
+        # The waiting append has already drawn an id below the next cut's watermark.
+        (drawn_before_cut,) = observer.execute("SELECT last_value FROM audit_log_id_seq").fetchone()
+        cut.commit()
+        thread.join(timeout=10)
+        assert result, "append did not finish"
+        row_id = result[0][0]
+        assert row_id > watermark
+        assert row_id > drawn_before_cut  # redrawn after the cut, not the pre-cut draw
+    finally:
+        cut.close()
+        appender.close()
+        observer.close()
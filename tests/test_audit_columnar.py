@@ -0,0 +1,59 @@
+import io
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_columnar import ColumnarExport  # noqa: E402
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _rows(start: int, n: int) -> list[tuple]:
+    created = datetime(2026, 10, 1, 12, 0, tzinfo=UTC)
+    return [
+        (
+            i,
+            "policy_decision" if i % 2 else "lineage",
+            f"model-{i % 3}",
+            i % 3 != 0,
+            {"b": i, "a": "é"},
+            "p" * 64,
+            "e" * 64,
+            created,
+            None if i % 2 else f"req-{i}",
+            0,
+        )
+        for i in range(start, start + n)
+    ]
+
+
+def _encode(fmt: str, chunks: list[list[tuple]]) -> bytes:
+    encoder = ColumnarExport(fmt)
+    parts = [encoder.begin()] + [encoder.write(c) for c in chunks] + [encoder.end()]
+    return b"".join(parts)
+
+
+def test_parquet_export_streams_one_row_group_per_chunk() -> None:
+    data = _encode("parquet", [_rows(1, 5), _rows(6, 5), _rows(11, 2)])
+    f = pq.ParquetFile(io.BytesIO(data))
+    assert f.num_row_groups == 3
+    table = f.read()
+    assert table.column("id").to_pylist() == list(range(1, 13))
+    assert pa.types.is_dictionary(table.schema.field("event_type").type)
+    assert pa.types.is_dictionary(table.schema.field("subject").type)
+    # details is canonical JSON, exactly as in the CSV export
+    assert table.column("details")[0].as_py() == '{"a":"\\u00e9","b":1}'
+    assert table.column("created_at")[0].as_py() == datetime(2026, 10, 1, 12, 0, tzinfo=UTC)
+
+
+def test_arrow_stream_export_reads_back_with_changing_dictionaries() -> None:
+    data = _encode("arrow", [_rows(1, 3), [], _rows(4, 4)])
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == 7
+    assert table.column("subject").to_pylist() == [f"model-{i % 3}" for i in range(1, 8)]
+    assert table.column("request_id").to_pylist()[:2] == [None, "req-2"]
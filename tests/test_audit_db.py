@@ -0,0 +1,75 @@
+import asyncio
+import importlib.util
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+SERVICES = Path(__file__).resolve().parents[1] / "services"
+sys.path.insert(0, str(SERVICES / "mcp-audit"))
+
+import audit_db  # noqa: E402
+from psycopg_pool import PoolTimeout  # noqa: E402
+
+# mcp-lineage keeps a copy of audit_db (see its docstring); load it by path, since
+# its directory also has app.py and schema.py modules that would shadow mcp-audit's.
+_spec = importlib.util.spec_from_file_location(
+    "lineage_db", SERVICES / "mcp-lineage" / "lineage_db.py"
+)
+assert _spec is not None and _spec.loader is not None
+lineage_db = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lineage_db)
+
+
+@pytest.fixture(params=[audit_db, lineage_db], ids=["audit", "lineage"])
+def db(request):
+    return request.param
+
+
+def test_service_copies_are_identical() -> None:
+    audit = (SERVICES / "mcp-audit" / "audit_db.py").read_bytes()
+    assert (SERVICES / "mcp-lineage" / "lineage_db.py").read_bytes() == audit
+
+
+class _FakePool:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    @asynccontextmanager
+    async def connection(self):
+        await asyncio.sleep(0.002)
+        if self.fail:
+            raise PoolTimeout("couldn't get a connection")
+        yield "conn"
+
+    def get_stats(self) -> dict:
+        return {"pool_size": 2}
+
+
+def test_config_from_env_clamps_sizes(db) -> None:
+    cfg = db.PoolConfig.from_env({"DB_POOL_MIN_SIZE": "50", "DB_POOL_MAX_SIZE": "20"})
+    assert (cfg.min_size, cfg.max_size, cfg.timeout_s) == (20, 20, 30.0)
+    assert db.PoolConfig.from_env({}) == db.PoolConfig()
+
+
+def test_connection_records_waits_saturation_and_timeouts(db) -> None:
+    metered = db.MeteredPool("", db.PoolConfig())
+    metered.pool = _FakePool()  # type: ignore[assignment]
+
+    async def scenario() -> None:
+        async with metered.connection() as conn:
+            assert conn == "conn"
+            assert (metered.in_use, metered.waiting) == (1, 0)
+        metered.pool = _FakePool(fail=True)  # type: ignore[assignment]
+        with pytest.raises(PoolTimeout):
+            async with metered.connection():
+                pass
+
+    asyncio.run(scenario())
+    stats = metered.stats()
+    assert (stats["acquired"], stats["timeouts"], stats["in_use"], stats["waiting"]) == (1, 1, 0, 0)
+    assert stats["wait_seconds"] > 0.001
+    text = db.render_pool_metrics(stats)
+    assert 'db_pool_acquire_wait_seconds_bucket{le="+Inf"} 1' in text
+    assert "db_pool_timeouts_total 1" in text
@@ -0,0 +1,156 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+
+import pytest
+
+T0 = datetime(2026, 1, 1, tzinfo=UTC)
+T1 = datetime(2026, 2, 1, tzinfo=UTC)
+
+
+def test_event_filters_combine_in_index_order(audit_app) -> None:
+    conds, params = audit_app._event_filters(500, "alice", "inference", False, "req-1", T0, T1)
+    assert conds == [
+        "id < %s",
+        "subject = %s",
+        "event_type = %s",
+        "decision = %s",
+        "request_id = %s",
+        "created_at >= %s",
+        "created_at < %s",
+    ]
+    assert params == [500, "alice", "inference", False, "req-1", T0, T1]
+    assert audit_app._event_filters(None, None, None, None, None, None, None) == ([], [])
+
+
+def test_event_filters_time_cursor_is_the_created_at_id_pair(audit_app) -> None:
+    cursor_at = datetime(2026, 1, 15, tzinfo=UTC)
+    conds, params = audit_app._event_filters(500, "alice", None, None, None, T0, None, cursor_at)
+    # The pair replaces `id < %s`; the plain bound keeps partition pruning.
+    assert conds == [
+        "created_at <= %s",
+        "(created_at, id) < (%s, %s)",
+        "subject = %s",
+        "created_at >= %s",
+    ]
+    assert params == [cursor_at, cursor_at, 500, "alice", T0]
+    # Without the cursor row (archived), fall back to the id cursor.
+    conds, _ = audit_app._event_filters(500, None, None, None, None, T0, None, None)
+    assert conds == ["id < %s", "created_at >= %s"]
+
+
+def test_next_cursor(audit_app) -> None:
+    rows = [{"id": 9}, {"id": 4}]
+    assert audit_app._next_cursor(rows, 2, None) == 4
+    assert audit_app._next_cursor(rows, 2, 1) == 4
+    assert audit_app._next_cursor(rows, 3, None) is None
+    assert audit_app._next_cursor(rows, 3, 3) == 3  # archive scan budget ran out
+    assert audit_app._next_cursor([], 10, None) is None
+
+
+def test_cursor_created_at_applies_the_range(audit_app) -> None:
+    class Cursor:
+        async def execute(self, sql: str, params: tuple) -> None:
+            self.sql, self.params = sql, params
+
+        async def fetchone(self):
+            return (T0,)
+
+    cur = Cursor()
+    assert asyncio.run(audit_app._cursor_created_at(cur, 42, T0, T1)) == T0
+    assert cur.sql == (
+        "SELECT created_at FROM audit_log WHERE id = %s AND created_at >= %s AND created_at < %s"
+    )
+    assert cur.params == (42, T0, T1)
+
+
+class _Cursor:
+    def __init__(self, rows: list[tuple]):
+        self.rows = rows
+        self.sql: list[str] = []
+
+    async def execute(self, sql: str, params=()) -> None:
+        self.sql.append(sql)
+
+    async def fetchone(self):
+        return None  # the cursor row is not in audit_log
+
+    async def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+class _Pool:
+    def __init__(self, rows: list[tuple]):
+        self.cur = _Cursor(rows)
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield self.cur
+
+
+class _Archive:
+    watermark = 100
+
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    async def refresh(self, cur) -> None:
+        pass
+
+    def events(self, before_id, limit, filters, scan_rows):
+        self.calls.append(before_id)
+        return [_event(before_id - 1)], None
+
+
+def _event(event_id: int) -> dict:
+    return {
+        "id": event_id,
+        "event_type": "inference",
+        "subject": "s",
+        "decision": True,
+        "details": {},
+        "prev_hash": "p",
+        "entry_hash": "e",
+        "created_at": T0.isoformat(),
+        "request_id": None,
+        "shard": 0,
+    }
+
+
+@pytest.fixture()
+def client(audit_app, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(audit_app, "pool", _Pool([]))
+    monkeypatch.setattr(audit_app, "archive", None)
+    return TestClient(audit_app.app)
+
+
+def test_unresolvable_time_cursor_is_rejected(audit_app, client) -> None:
+    resp = client.get("/events", params={"before_id": 500, "created_from": T0.isoformat()})
+    assert resp.status_code == 400 and resp.json()["detail"] == "invalid_cursor"
+    # No time range: the id cursor needs no lookup.
+    assert client.get("/events", params={"before_id": 500}).status_code == 200
+
+
+def test_archived_time_cursor_pages_the_archive(audit_app, client, monkeypatch) -> None:
+    archive = _Archive()
+    monkeypatch.setattr(audit_app, "archive", archive)
+    resp = client.get("/events", params={"before_id": 42, "created_from": T0.isoformat()})
+    assert resp.status_code == 200
+    assert [e["id"] for e in resp.json()] == [41]
+    assert archive.calls == [42]
+    sql = audit_app.pool.cur.sql
+    assert not any(s.startswith("SELECT created_at") for s in sql)  # no database lookup
+    # Above the watermark, the cursor must be a database row in the range.
+    resp = client.get("/events", params={"before_id": 101, "created_from": T0.isoformat()})
+    assert resp.status_code == 400
+
+
+def test_offset_stays_deprecated_but_accepted(client) -> None:
+    assert client.get("/events", params={"offset": 10_000}).status_code == 200
+    assert client.get("/events", params={"offset": 10_001}).status_code == 422
@@ -0,0 +1,130 @@
+import asyncio
+import csv
+import io
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+
+import pytest
+
+CREATED = datetime(2026, 10, 1, 12, 0, tzinfo=UTC)
+TRICKY = {"note": 'says "hi", then\nleaves', "tags": ["a,b", 'c"d'], "n": 1}
+
+
+def _rows(start: int, n: int) -> list[tuple]:
+    return [
+        (
+            i,
+            "policy_decision",
+            f"model-{i}",
+            i % 2 == 0,
+            TRICKY,
+            "p" * 64,
+            "e" * 64,
+            CREATED,
+            None,
+            0,
+        )
+        for i in range(start, start + n)
+    ]
+
+
+class _Cursor:
+    def __init__(self, rows: list[tuple]):
+        self._rows = rows
+        self.executed: list = []
+
+    async def execute(self, sql: str, params: list) -> None:
+        self.executed.append((sql, params))
+
+    async def fetchmany(self, size: int) -> list[tuple]:
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        return chunk
+
+
+class _Conn:
+    def __init__(self, cur: _Cursor):
+        self.cur = cur
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    @asynccontextmanager
+    async def cursor(self, name: str):
+        yield self.cur
+
+
+class _Pool:
+    def __init__(self, rows: list[tuple]):
+        self.conn = _Conn(_Cursor(rows))
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+
+@pytest.fixture()
+def export(audit_app, monkeypatch):
+    """Run _export_stream over `rows` in chunks of 2 and return the yielded items."""
+    monkeypatch.setattr(audit_app, "AUDIT_EXPORT_CHUNK_ROWS", 2)
+    monkeypatch.setattr(audit_app, "AUDIT_CHAIN_SHARDS", 1)
+
+    def run(fmt: str, rows: list[tuple]) -> list[str]:
+        monkeypatch.setattr(audit_app, "pool", _Pool(rows))
+
+        async def collect() -> list[str]:
+            return [item async for item in audit_app._export_stream(fmt, 0, None)]
+
+        return asyncio.run(collect())
+
+    return run
+
+
+def test_json_export_is_one_array_across_chunks(export) -> None:
+    items = export("json", _rows(1, 5))
+    assert len(items) == 5  # "[", three chunks of at most 2 rows, "]"
+    assert items[0] == "[" and items[-1] == "]"
+    assert items[2].startswith(",") and not items[1].startswith(",")
+    events = json.loads("".join(items))
+    assert [e["id"] for e in events] == [1, 2, 3, 4, 5]
+    assert events[0]["details"] == TRICKY
+    assert events[0]["created_at"] == CREATED.isoformat()
+
+
+def test_ndjson_export_is_one_event_per_line(export) -> None:
+    items = export("ndjson", _rows(1, 3))
+    assert all(item.endswith("\n") for item in items[1:-1])
+    lines = "".join(items).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+
+
+def test_csv_export_quotes_details(export, audit_app) -> None:
+    items = export("csv", _rows(1, 3))
+    assert items[0] == audit_app._csv_header()
+    rows = list(csv.DictReader(io.StringIO("".join(items))))
+    assert [r["id"] for r in rows] == ["1", "2", "3"]
+    # details is canonical JSON: commas and quotes are CSV-quoted, the newline stays escaped
+    assert rows[0]["details"] == audit_app.canonical_json(TRICKY)
+    assert json.loads(rows[0]["details"]) == TRICKY
+    assert rows[0]["decision"] == "False" and rows[0]["request_id"] == ""
+
+
+@pytest.mark.parametrize(("fmt", "body"), [("json", "[]"), ("ndjson", ""), ("csv", None)])
+def test_empty_export(export, audit_app, fmt: str, body: str | None) -> None:
+    items = export(fmt, [])
+    assert "".join(items) == (audit_app._csv_header() if body is None else body)
+
+
+def test_export_query_bounds(audit_app, monkeypatch) -> None:
+    monkeypatch.setattr(audit_app, "AUDIT_CHAIN_SHARDS", 1)
+    monkeypatch.setattr(audit_app, "pool", _Pool([]))
+
+    async def drain() -> None:
+        async for _ in audit_app._export_stream("ndjson", 10, 20, CREATED, None):
+            pass
+
+    asyncio.run(drain())
+    sql, params = audit_app.pool.conn.cur.executed[0]
+    assert sql.endswith("WHERE id > %s AND id <= %s AND created_at >= %s ORDER BY id")
+    assert params == [10, 20, CREATED]
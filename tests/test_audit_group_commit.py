@@ -0,0 +1,71 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_group_commit import GroupCommitWriter, QueueFull, render_metrics  # noqa: E402
+
+
+def test_group_commit_batches_concurrent_callers_and_resolves_after_write() -> None:
+    batches: list[list[int]] = []
+    release = threading.Event()
+
+    def write_batch(items: list[int]) -> list[int]:
+        release.wait(5)  # hold the first flush so the rest pile up behind it
+        batches.append(items)
+        return [i * 10 for i in items]
+
+    writer: GroupCommitWriter[int, int] = GroupCommitWriter(
+        write_batch, max_batch=50, interval_ms=20, queue_depth=1000
+    )
+    writer.start()
+    try:
+        with ThreadPoolExecutor(32) as ex:
+            futs = [ex.submit(lambda i=i: writer.submit(i).result(5)) for i in range(200)]
+            release.set()
+            results = [f.result() for f in futs]
+    finally:
+        writer.stop()
+
+    assert results == [i * 10 for i in range(200)]
+    assert sorted(i for b in batches for i in b) == list(range(200))
+    assert max(len(b) for b in batches) <= 50
+    assert len(batches) < 200  # callers shared commits
+    stats = writer.stats()
+    assert stats["events"] == 200 and stats["batches"] == len(batches)
+    text = render_metrics(stats)
+    assert 'audit_group_commit_batch_size_bucket{le="+Inf"} ' + str(len(batches)) in text
+    assert "audit_group_commit_max_batch 50" in text
+
+
+def test_group_commit_failure_is_delivered_to_every_caller_in_the_batch() -> None:
+    def write_batch(items: list[int]) -> list[int]:
+        raise RuntimeError("db down")
+
+    writer: GroupCommitWriter[int, int] = GroupCommitWriter(write_batch, interval_ms=50)
+    writer.start()
+    try:
+        futs = [writer.submit(i) for i in range(3)]
+        for fut in futs:
+            with pytest.raises(RuntimeError, match="db down"):
+                fut.result(5)
+    finally:
+        writer.stop()
+    assert writer.stats()["failed_batches"] >= 1
+
+
+def test_group_commit_rejects_when_full_or_stopped() -> None:
+    writer: GroupCommitWriter[int, int] = GroupCommitWriter(lambda items: items, queue_depth=1)
+    with pytest.raises(QueueFull):
+        writer.submit(1)  # not started
+    writer._thread = threading.current_thread()  # accept without a consumer
+    writer.submit(1)
+    with pytest.raises(QueueFull):
+        writer.submit(2)
+    assert writer.stats()["rejected"] == 1
+    writer._thread = None
+    writer.stop()
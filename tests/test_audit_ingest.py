@@ -0,0 +1,106 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_chain import genesis, stitch, verify_rows  # noqa: E402
+from audit_schema import AuditIn  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+NDJSON = "application/x-ndjson"
+
+
+def _event(i: int) -> dict:
+    return {"event_type": "policy_decision", "subject": f"model-{i}", "decision": i % 2 == 0}
+
+
+def _reject(app, body: bytes, content_type: str = "application/json") -> tuple[int, object]:
+    with pytest.raises(HTTPException) as exc:
+        app._parse_batch(body, content_type)
+    return exc.value.status_code, exc.value.detail
+
+
+def test_parse_batch_accepts_json_arrays_and_ndjson(audit_app) -> None:
+    items = [_event(1), {**_event(2), "details": {"k": "é"}}]
+    events = audit_app._parse_batch(json.dumps(items).encode(), "application/json")
+    assert [e.subject for e in events] == ["model-1", "model-2"]
+    body = ("\n".join(json.dumps(i) for i in items) + "\n\n").encode()
+    assert audit_app._parse_batch(body, NDJSON) == events
+    assert audit_app._parse_batch(body, "application/jsonlines; charset=utf-8") == events
+
+
+@pytest.mark.parametrize(
+    ("body", "content_type", "status", "detail"),
+    [
+        (b"[{", "application/json", 400, "invalid_json"),
+        (b'{"event_type": "x"}\n{not json', NDJSON, 400, "invalid_json"),
+        (b'{"event_type": "x"}', "application/json", 400, "expected_non_empty_array"),
+        (b"[]", "application/json", 400, "expected_non_empty_array"),
+        (b"\n\n", NDJSON, 400, "expected_non_empty_array"),
+    ],
+)
+def test_parse_batch_rejects_malformed_bodies(
+    audit_app, body: bytes, content_type: str, status: int, detail: str
+) -> None:
+    assert _reject(audit_app, body, content_type) == (status, detail)
+
+
+def test_parse_batch_rejects_oversized_batches(audit_app, monkeypatch) -> None:
+    monkeypatch.setattr(audit_app, "AUDIT_BATCH_MAX", 3)
+    items = [_event(i) for i in range(4)]
+    assert _reject(audit_app, json.dumps(items).encode()) == (413, "batch_too_large:max=3")
+    ndjson = "\n".join(json.dumps(i) for i in items).encode()
+    assert _reject(audit_app, ndjson, NDJSON) == (413, "batch_too_large:max=3")
+    assert len(audit_app._parse_batch(json.dumps(items[:3]).encode(), "application/json")) == 3
+
+
+def test_parse_batch_reports_the_invalid_item(audit_app) -> None:
+    items = [_event(0), {"event_type": "", "subject": "s", "decision": True}]
+    status, detail = _reject(audit_app, json.dumps(items).encode())
+    assert status == 422
+    assert isinstance(detail, list) and detail[0]["loc"] == [1, "event_type"]
+
+
+def _verify(rows: list[dict], shard: int, start_hash: str) -> tuple[int, int, str]:
+    own = [
+        (
+            r["id"],
+            r["event_type"],
+            r["subject"],
+            r["decision"],
+            r["details"],
+            r["prev_hash"],
+            r["entry_hash"],
+        )
+        for r in rows
+        if r["shard"] == shard
+    ]
+    rows_seen, _, break_count, final = stitch([verify_rows(own, shard=shard)], start_hash)
+    return rows_seen, break_count, final
+
+
+def test_chain_rows_verify_per_shard_from_existing_heads(audit_app) -> None:
+    events = [
+        AuditIn(event_type="t", subject=f"s{i}", decision=True, details={"i": i, "u": "é"})
+        for i in range(9)
+    ]
+    shards = [i % 3 for i in range(9)]
+    ids = list(range(101, 110))
+    # Shard 1 continues an existing chain; the others start at genesis.
+    start = {0: genesis(0), 1: "ab" * 32, 2: genesis(2)}
+    heads = dict(start)
+    rows = audit_app._chain_rows(events, ["rid"] * 9, shards, ids, heads)
+
+    assert [r["id"] for r in rows] == ids and {r["request_id"] for r in rows} == {"rid"}
+    for shard in range(3):
+        assert _verify(rows, shard, start[shard]) == (3, 0, heads[shard])
+    assert rows[1]["prev_hash"] == start[1] and rows[4]["prev_hash"] == rows[1]["entry_hash"]
+
+    # Any tampered row breaks its own shard only.
+    rows[4]["details"] = {"i": 4, "u": "forged"}
+    assert _verify(rows, 1, start[1])[1] == 1
+    assert _verify(rows, 0, start[0])[1] == 0
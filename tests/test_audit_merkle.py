@@ -0,0 +1,210 @@
+import asyncio
+import sys
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from hashlib import sha256
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_merkle import (  # noqa: E402
+    append_node,
+    checkpoint_path_nodes,
+    fold_nodes,
+    fold_path,
+    inclusion_proof,
+    leaf_hash,
+    merkle_path,
+    merkle_root,
+    node_hash,
+    perfect_nodes,
+    seal,
+    verify_proof,
+)
+
+
+def _entries(n: int) -> list[str]:
+    return [sha256(str(i).encode()).hexdigest() for i in range(n)]
+
+
+def test_root_shape_follows_rfc6962_split() -> None:
+    a, b, c = (leaf_hash(h) for h in _entries(3))
+    assert merkle_root([a]) == a
+    assert merkle_root([a, b, c]) == node_hash(node_hash(a, b), c)
+
+
+def test_every_path_folds_to_the_root_and_is_logarithmic() -> None:
+    for n in range(1, 40):
+        leaves = [leaf_hash(h) for h in _entries(n)]
+        root = merkle_root(leaves)
+        for i in range(n):
+            path = merkle_path(leaves, i)
+            assert fold_path(leaves[i], path) == root
+            assert len(path) <= (n - 1).bit_length()
+
+
+def test_two_level_proof_verifies_and_rejects_tampering() -> None:
+    blocks = [_entries(8)[j : j + 4] for j in (0, 4)] + [_entries(11)[8:11]]
+    block_roots = [merkle_root([leaf_hash(h) for h in b]) for b in blocks]
+    entry = blocks[2][1]
+    leaves = [leaf_hash(h) for h in blocks[2]]
+    proof = {
+        "block": {"root": block_roots[2]},
+        "block_path": [list(step) for step in merkle_path(leaves, 1)],  # as decoded from JSON
+        "checkpoint": {"root": merkle_root(block_roots)},
+        "checkpoint_path": merkle_path(block_roots, 2),
+    }
+    assert verify_proof(entry, proof)
+    assert not verify_proof(blocks[2][0], proof)
+    proof["checkpoint"] = {"root": merkle_root(block_roots[:2])}
+    assert not verify_proof(entry, proof)
+
+
+def test_stored_subtrees_give_the_same_roots_and_paths() -> None:
+    roots = [leaf_hash(h) for h in _entries(40)]
+    frontier: list = []
+    nodes: dict = {}
+    for n in range(1, len(roots) + 1):
+        nodes.update(append_node(frontier, n - 1, roots[n - 1]))
+        assert [node for node, _ in frontier] == perfect_nodes(0, n)
+        assert fold_nodes([h for _, h in frontier]) == merkle_root(roots[:n])
+        for i in range(n):
+            steps = checkpoint_path_nodes(n, i)
+            path = [(side, fold_nodes([nodes[x] for x in sub])) for side, sub in steps]
+            assert path == merkle_path(roots[:n], i)
+            # one sibling may fold several subtrees; the total stays logarithmic
+            assert sum(len(sub) for _, sub in steps) <= 2 * n.bit_length()
+    assert len(nodes) == 2 * len(roots) - (40).bit_count()
+
+
+class _MerkleDB:
+    """In-memory audit_log / Merkle tables answering the statements audit_merkle issues."""
+
+    def __init__(self, entries: list[str]):
+        self.log = list(enumerate(entries, start=1))
+        self.blocks: list[tuple] = []
+        self.nodes: dict[tuple[int, int], str] = {}
+        self.checkpoints: list[tuple] = []
+        self.statements: list[str] = []
+        self._result: list = []
+
+    def run(self, sql: str, params=()) -> None:
+        self.statements.append(sql)
+        for prefix, answer in self._answers().items():
+            if sql.startswith(prefix):
+                self._result = answer(*params)
+                return
+        raise AssertionError(sql)
+
+    def _answers(self) -> dict:
+        """Statement prefix -> function of its parameters returning the result rows."""
+        return {
+            "SELECT pg_advisory_xact_lock": lambda _key: [],
+            "SELECT block_no, last_id FROM audit_merkle_blocks": lambda: [
+                (b[0], b[2]) for b in self.blocks[-1:]
+            ],
+            "SELECT coalesce(max(idx) + 1, 0)": lambda: [
+                (sum(1 for level, _ in self.nodes if level == 0),)
+            ],
+            "SELECT level, idx, hash FROM audit_merkle_nodes": lambda levels, idxs: [
+                (*n, self.nodes[n]) for n in zip(levels, idxs, strict=True) if n in self.nodes
+            ],
+            "SELECT block_no, root FROM audit_merkle_blocks": lambda lo: [
+                (b[0], b[4]) for b in self.blocks if b[0] >= lo
+            ],
+            "SELECT id, entry_hash FROM audit_log WHERE id > %s": lambda lo, hi, limit: [
+                r for r in self.log if lo < r[0] <= hi
+            ][:limit],
+            "SELECT id, entry_hash FROM audit_log WHERE id >= %s": lambda lo, hi: [
+                r for r in self.log if lo <= r[0] <= hi
+            ],
+            "INSERT INTO audit_merkle_blocks": lambda *row: self.blocks.append(row) or [],
+            "INSERT INTO audit_merkle_checkpoints": self._checkpoint,
+            "SELECT id, block_count, last_id, root, created_at": lambda: self.checkpoints[-1:],
+            "SELECT block_no, first_id, last_id, size, root": lambda event_id: [
+                b for b in self.blocks if b[2] >= event_id
+            ][:1],
+            "SELECT root FROM audit_merkle_blocks": lambda count: [
+                (b[4],) for b in self.blocks if b[0] < count
+            ],
+        }
+
+    def _checkpoint(self, block_count: int, last_id: int, root: str) -> list:
+        row = (len(self.checkpoints) + 1, block_count, last_id, root, datetime.now(UTC))
+        self.checkpoints.append(row)
+        return [(row[0], row[4])]
+
+    def insert_nodes(self, rows) -> None:
+        for level, idx, h in rows:
+            assert (level, idx) not in self.nodes  # append-only
+            self.nodes[(level, idx)] = h
+
+    # psycopg-shaped sync connection and cursor
+    @contextmanager
+    def transaction(self):
+        yield
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql: str, params=()) -> None:
+        self.run(sql, params)
+
+    def executemany(self, sql: str, rows) -> None:
+        assert sql.startswith("INSERT INTO audit_merkle_nodes")
+        self.insert_nodes(rows)
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self) -> list:
+        return self._result
+
+
+class _AsyncCursor:
+    def __init__(self, db: _MerkleDB):
+        self.db = db
+
+    async def execute(self, sql: str, params=()) -> None:
+        self.db.run(sql, params)
+
+    async def fetchone(self):
+        return self.db.fetchone()
+
+    async def fetchall(self) -> list:
+        return self.db.fetchall()
+
+
+def test_seal_and_proof_read_only_logarithmic_nodes() -> None:
+    entries = _entries(4 * 13 + 2)
+    db = _MerkleDB(entries)
+    for upto in (8, 20, 52, len(entries)):  # several rounds; the last one completes nothing
+        seal(db, 4, upto)
+    assert [c[1] for c in db.checkpoints] == [2, 5, 13]
+    block_roots = [b[4] for b in db.blocks]
+    assert db.checkpoints[-1][3] == merkle_root(block_roots)
+
+    for event_id in (1, 22, 52):
+        db.statements.clear()
+        proof = asyncio.run(inclusion_proof(_AsyncCursor(db), event_id))
+        assert verify_proof(entries[event_id - 1], proof)
+        assert not any(s.startswith("SELECT root FROM audit_merkle_blocks") for s in db.statements)
+    assert not any(s.startswith("SELECT block_no, root") for s in db.statements)
+
+
+def test_seal_backfills_nodes_of_blocks_sealed_before_they_were_stored() -> None:
+    entries = _entries(4 * 6)
+    db = _MerkleDB(entries)
+    seal(db, 4, 12)
+    db.nodes.clear()  # as if blocks 0-2 predate migration 0012
+    proof = asyncio.run(inclusion_proof(_AsyncCursor(db), 5))
+    assert verify_proof(entries[4], proof)  # falls back to the block roots
+
+    seal(db, 4, 24)
+    assert db.checkpoints[-1][3] == merkle_root([b[4] for b in db.blocks])
+    assert len(db.nodes) == 2 * 6 - (6).bit_count()
+    db.statements.clear()
+    proof = asyncio.run(inclusion_proof(_AsyncCursor(db), 5))
+    assert verify_proof(entries[4], proof)
+    assert not any(s.startswith("SELECT root FROM audit_merkle_blocks") for s in db.statements)
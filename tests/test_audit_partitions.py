@@ -0,0 +1,150 @@
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "services" / "mcp-audit"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from audit_partitions import PartitionMaintainer, ensure_partitions  # noqa: E402
+
+
+class _Cursor:
+    def __init__(self, results: list[tuple]):
+        self.results = results
+        self.executed: list[tuple] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def execute(self, sql: str, params: tuple | None = None) -> None:
+        self.executed.append((sql, params))
+
+    def fetchone(self) -> tuple:
+        return self.results.pop(0)
+
+
+class _Conn:
+    """Sync connection answering each fetchone() from `results` in order."""
+
+    def __init__(self, *results: tuple):
+        self.cur = _Cursor(list(results))
+        self.commits = 0
+
+    @contextmanager
+    def transaction(self):
+        yield
+
+    def cursor(self) -> _Cursor:
+        return self.cur
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
+def _connect(conn: _Conn):
+    @contextmanager
+    def connect():
+        yield conn
+
+    return connect
+
+
+def test_ensure_partitions_is_none_before_migration_0007() -> None:
+    conn = _Conn((None,))
+    assert ensure_partitions(conn, 3) is None
+    assert conn.cur.executed == [("SELECT to_regproc('audit_log_ensure_partitions')", None)]
+
+
+def test_ensure_partitions_creates_through_months_ahead() -> None:
+    conn = _Conn(("audit_log_ensure_partitions",), (2,))
+    assert ensure_partitions(conn, 4) == 2
+    assert conn.cur.executed[1] == ("SELECT audit_log_ensure_partitions(%s)", (4,))
+
+
+def test_partition_function_is_defined_by_migration_0007() -> None:
+    sql = (ROOT / "infra" / "migrations" / "0007_partition_audit_log.sql").read_text()
+    assert "create or replace function audit_log_ensure_partitions(months_ahead integer" in sql
+
+
+def test_run_once_logs_created_partitions(caplog: pytest.LogCaptureFixture) -> None:
+    conn = _Conn(("audit_log_ensure_partitions",), (1,))
+    maintainer = PartitionMaintainer(_connect(conn), 0, 60)
+    assert maintainer.months_ahead == 1  # at least the next month
+    with caplog.at_level(logging.INFO, logger="app"):
+        assert maintainer.run_once() == 1
+    assert conn.cur.executed[1][1] == (1,)
+    assert "audit_partitions_created count=1" in caplog.text
+
+    before = PartitionMaintainer(_connect(_Conn((None,))), 3, 60)
+    assert before.run_once() is None
+
+
+def test_maintainer_thread_runs_at_start_and_survives_errors() -> None:
+    calls: list[int] = []
+    ran = threading.Event()
+
+    @contextmanager
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("db down")
+        ran.set()
+        yield _Conn((None,))
+
+    maintainer = PartitionMaintainer(connect, 3, 0.01)
+    maintainer.start()
+    try:
+        assert ran.wait(5)
+    finally:
+        maintainer.stop()
+    assert len(calls) >= 2
+
+    disabled = PartitionMaintainer(connect, 3, 0)
+    disabled.start()
+    assert disabled._thread is None
+
+
+migrate = pytest.importorskip("migrate")
+
+
+def test_migrate_hook_skips_before_migration_0007(capsys: pytest.CaptureFixture) -> None:
+    conn = _Conn((False,))
+    migrate.ensure_audit_partitions(conn, 3)
+    assert len(conn.cur.executed) == 1 and conn.commits == 1
+    assert capsys.readouterr().out == ""
+
+
+def test_migrate_hook_creates_partitions(capsys: pytest.CaptureFixture) -> None:
+    conn = _Conn((True,), (2,))
+    migrate.ensure_audit_partitions(conn, 6)
+    assert conn.cur.executed[1] == ("select audit_log_ensure_partitions(%s)", (6,))
+    assert conn.commits == 1
+    assert "Created 2 audit_log partition(s)." in capsys.readouterr().out
+
+
+def test_migrate_main_runs_the_hook_after_migrations(monkeypatch: pytest.MonkeyPatch) -> None:
+    steps: list = []
+
+    @contextmanager
+    def connect(url: str, autocommit: bool):
+        yield "conn"
+
+    monkeypatch.setenv("DATABASE_URL", "postgresql://localhost/unused")
+    monkeypatch.setenv("AUDIT_PARTITION_MONTHS_AHEAD", "5")
+    monkeypatch.setattr(migrate.psycopg, "connect", connect)
+    monkeypatch.setattr(migrate, "ensure_schema_table", lambda c: steps.append("schema"))
+    monkeypatch.setattr(migrate, "maybe_apply_baseline", lambda c: steps.append("baseline"))
+    monkeypatch.setattr(migrate, "apply_new_migrations", lambda c: steps.append("migrate") or 0)
+    monkeypatch.setattr(
+        migrate, "ensure_audit_partitions", lambda c, n: steps.append(("partitions", c, n))
+    )
+    assert migrate.main() == 0
+    assert steps == ["schema", "baseline", "migrate", ("partitions", "conn", 5)]
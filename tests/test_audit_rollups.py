@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_rollups import hour_ceil, hour_floor, settled_until, stats  # noqa: E402
+
+
+class _Cursor:
+    def __init__(self, rows: list[tuple]):
+        self.rows = rows
+        self.executed: list[tuple] = []
+
+    async def execute(self, sql: str, params: list) -> None:
+        self.executed.append((sql, params))
+
+    async def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+def test_buckets_are_whole_utc_hours() -> None:
+    ts = datetime(2026, 10, 17, 14, 40, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert hour_floor(ts) == datetime(2026, 10, 17, 9, 0, tzinfo=UTC)
+    assert hour_ceil(ts) == datetime(2026, 10, 17, 10, 0, tzinfo=UTC)
+    assert hour_ceil(hour_floor(ts)) == hour_floor(ts)
+    now = datetime(2026, 10, 17, 12, 5, tzinfo=UTC)
+    assert settled_until(now) == datetime(2026, 10, 17, 11, 0, tzinfo=UTC)
+
+
+def test_stats_widens_range_and_totals_buckets() -> None:
+    h = datetime(2026, 10, 17, 9, 0, tzinfo=UTC)
+    cur = _Cursor([(h, "policy_decision", 7, 2), (h + timedelta(hours=1), "lineage", 3, 0)])
+    out = asyncio.run(
+        stats(cur, h + timedelta(minutes=10), h + timedelta(hours=1, minutes=1), "lineage")
+    )
+    sql, params = cur.executed[0]
+    assert params == [h, h + timedelta(hours=2), "lineage"]
+    assert "event_type = %s" in sql
+    assert out["totals"] == {"allowed": 10, "denied": 2}
+    assert out["buckets"][0] == {
+        "bucket": h.isoformat(),
+        "event_type": "policy_decision",
+        "allowed": 7,
+        "denied": 2,
+    }
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-audit"))
+
+from audit_search import (  # noqa: E402
+    MAX_EQ_FILTERS,
+    SearchError,
+    details_conditions,
+    parse_eq,
+)
+
+
+def test_details_conditions_build_indexable_operators() -> None:
+    conds, params = details_conditions(
+        '{"policy": {"reasons": ["aibom_signature_invalid"]}}',
+        ["user_id=alice", "policy.score=0.5", 'ticket="42"', 'odd"key=true'],
+    )
+    assert conds == ["details @> %s::jsonb", "details @@ %s::jsonpath"]
+    assert params[0] == '{"policy":{"reasons":["aibom_signature_invalid"]}}'
+    assert params[1] == (
+        '$."user_id" == "alice" && $."policy"."score" == 0.5'
+        ' && $."ticket" == "42" && $."odd\\"key" == true'
+    )
+
+
+def test_parse_eq_values() -> None:
+    assert parse_eq("a.b=null") == (["a", "b"], None)
+    assert parse_eq("a=not json") == (["a"], "not json")
+    assert parse_eq("a=x=y") == (["a"], "x=y")
+    assert parse_eq("a=NaN") == (["a"], "NaN")  # not a JSON number, so a string
+
+
+@pytest.mark.parametrize(
+    ("contains", "eq", "detail"),
+    [
+        (None, [], "details_filter_required"),
+        ("{}", [], "unindexable_filter"),
+        ('{"a": {}, "b": []}', [], "unindexable_filter"),
+        ('["a"]', [], "invalid_contains"),
+        ("{not json", [], "invalid_contains"),
+        (None, ["novalue"], "invalid_eq"),
+        (None, ["a..b=1"], "invalid_eq"),
+        (None, ['a={"b": 1}'], "invalid_eq"),
+        ('{"a": 1e999}', [], "invalid_contains"),
+        (None, ["a=1"] * (MAX_EQ_FILTERS + 1), f"too_many_filters:max={MAX_EQ_FILTERS}"),
+    ],
+)
+def test_unindexable_filters_are_rejected(contains: str | None, eq: list[str], detail: str) -> None:
+    with pytest.raises(SearchError) as exc:
+        details_conditions(contains, eq)
+    assert exc.value.args[0] == detail
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+pytest.importorskip("fastapi")
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "services" / "mcp-policy"))
+sys.path.insert(0, str(ROOT / "services" / "mcp-gateway"))
+
+import gateway_app  # noqa: E402
+import validators  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from gateway_app import InferenceRequest, _policy_payload  # noqa: E402
+
+
+@pytest.fixture
+def shipped(monkeypatch):
+    monkeypatch.setattr(validators, "AIBOM_REQUIRED", False)
+    return validators.load_snapshot(str(ROOT / "policies"))
+
+
+def test_gateway_infer_payload_passes_shipped_policy(shipped) -> None:
+    req = InferenceRequest(model_id="m1", user_id="u1", prompt="hello", parameters={"t": 0.2})
+    res = validators.evaluate(_policy_payload(req), shipped)
+    assert res.allowed, res.reasons
+    assert not any(r.startswith(("missing:", "require:", "deny:")) for r in res.reasons)
+
+
+def test_gateway_infer_payload_is_still_gated_on_risk(shipped) -> None:
+    req = InferenceRequest(
+        model_id="m1", user_id="u1", prompt="hello", risk={"data_sensitivity": 5}
+    )
+    res = validators.evaluate(_policy_payload(req), shipped)
+    assert not res.allowed
+    assert res.reasons[-1] == f"risk_exceeds:15.0>{shipped.compiled.max_risk}"
+
+
+def test_rules_apply_when_the_payload_carries_their_fields(shipped) -> None:
+    res = validators.evaluate({"metrics": {"accuracy": 0.5}}, shipped)
+    assert not res.allowed
+    assert res.reasons[-1] == "deny:metrics.accuracy<0.85"
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(
+        gateway_app,
+        "MCP_DIRECTORY",
+        {
+            "mcp-policy": "http://mcp-policy:8000",
+            "mcp-audit": "http://mcp-audit:8000",
+            "mcp-lineage": "http://mcp-lineage:8000",
+        },
+    )
+    return TestClient(gateway_app.app)
+
+
+def test_gateway_does_not_proxy_internal_policy_routes(gateway) -> None:
+    for path in ("/api/v1/policies/replay", "/api/v1/policies/reload"):
+        resp = gateway.post(f"/mcp-policy{path}", json={"bundle": "next"})
+        assert resp.status_code == 403 and resp.json()["detail"] == "unauthorized_path"
+
+
+def test_gateway_forwards_shadow_reads_only(gateway) -> None:
+    resp = gateway.put("/mcp-policy/api/v1/policies/shadow", json={"bundle": None})
+    assert resp.status_code == 405 and resp.json()["detail"] == "method_not_allowed"
+
+
+def test_gateway_does_not_proxy_chain_verification(gateway) -> None:
+    for method in ("GET", "POST"):
+        resp = gateway.request(method, "/mcp-audit/verify")
+        assert resp.status_code == 403 and resp.json()["detail"] == "unauthorized_path"
+
+
+@pytest.mark.parametrize("service", ["mcp-policy", "mcp-audit", "mcp-lineage"])
+def test_gateway_does_not_proxy_service_metrics(gateway, service: str) -> None:
+    resp = gateway.get(f"/{service}/metrics")
+    assert resp.status_code == 403 and resp.json()["detail"] == "unauthorized_path"
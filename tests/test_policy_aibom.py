@@ -0,0 +1,56 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey  # noqa: E402
+
+
+def _write_key(path: Path) -> Ed25519PrivateKey:
+    priv = Ed25519PrivateKey.generate()
+    pem = priv.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    path.write_bytes(pem)
+    return priv
+
+
+def _aibom(priv: Ed25519PrivateKey, data: dict) -> dict:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return {"aibom": {"data": data, "signature": priv.sign(canonical).hex()}}
+
+
+@pytest.fixture
+def key_path(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "aibom_public_key.pem"
+    monkeypatch.setattr(validators, "AIBOM_PUBLIC_KEY_PATH", str(path))
+    monkeypatch.setattr(validators, "_public_key", None)
+    monkeypatch.setattr(validators, "_verify_cache", validators.LRUCache(16))
+    return path
+
+
+def test_repeated_verification_is_memoized(key_path: Path) -> None:
+    priv = _write_key(key_path)
+    payload = _aibom(priv, {"sbom": {"components": 3}})
+    assert validators._verify_aibom(payload) == (True, "aibom_verified")
+    assert validators._verify_aibom(payload) == (True, "aibom_verified")
+    assert validators._verify_cache.stats()["hits"] == 1
+
+    payload["aibom"]["data"] = {"sbom": {"components": 4}}
+    assert validators._verify_aibom(payload) == (False, "aibom_signature_invalid")
+
+
+def test_key_rotation_invalidates_cached_key(key_path: Path) -> None:
+    old = _write_key(key_path)
+    assert validators._verify_aibom(_aibom(old, {"v": 1}))[0] is True
+
+    new = _write_key(key_path)
+    assert validators.refresh_public_key() is True
+    assert validators._verify_aibom(_aibom(old, {"v": 1})) == (False, "aibom_signature_invalid")
+    assert validators._verify_aibom(_aibom(new, {"v": 1})) == (True, "aibom_verified")
@@ -0,0 +1,99 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+pytest.importorskip("numpy")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+
+PAYLOADS = [
+    {},
+    {"risk": None},
+    {"risk": {"data_sensitivity": 1, "model_complexity": 2}},
+    {"risk": {"data_sensitivity": 5, "deployment_impact": 3, "monitoring_maturity": 4}},
+    {"risk": {"data_sensitivity": "2.5", "model_complexity": True}},
+    # Values float() rejects are skipped by the scalar path; the batch path must agree.
+    {"risk": {"data_sensitivity": None, "model_complexity": "high", "deployment_impact": 1}},
+    {"risk": {"data_sensitivity": [1], "model_complexity": {"x": 1}}},
+    {"risk": {"data_sensitivity": float("nan"), "model_complexity": 1}},
+    {"risk": {"data_sensitivity": "nan"}},
+    {"risk": "high"},
+    {"risk": {"score": 99, "data_sensitivity": 1}},
+]
+
+
+@pytest.fixture
+def snap(tmp_path: Path):
+    (tmp_path / "model-policy.yml").write_text(
+        "max_risk: 20\ndeny:\n  - {field: risk.score, op: gt, value: 30}\n", encoding="utf-8"
+    )
+    (tmp_path / "risk-matrix.yml").write_text(
+        "weights:\n  data_sensitivity: 3\n  model_complexity: 2\n  deployment_impact: 4\n"
+        "  monitoring_maturity: -2\n  label: not-a-number\n",
+        encoding="utf-8",
+    )
+    return validators.load_snapshot(str(tmp_path))
+
+
+def _same_score(a: float, b: float) -> bool:
+    return (math.isnan(a) and math.isnan(b)) or a == pytest.approx(b)
+
+
+def test_batch_risk_matches_scalar_risk(snap) -> None:
+    assert snap.risk_vector is not None
+    batch = validators._compute_risk_batch(PAYLOADS, snap)
+    for payload, (score, reasons) in zip(PAYLOADS, batch, strict=True):
+        expected_score, expected_reasons = validators._compute_risk(payload, snap.risk_matrix)
+        assert _same_score(score, expected_score), payload
+        assert reasons == expected_reasons, payload
+
+
+def test_batch_risk_falls_back_to_scalar_without_weights(tmp_path: Path) -> None:
+    (tmp_path / "model-policy.yml").write_text("max_risk: 5\n", encoding="utf-8")
+    (tmp_path / "risk-matrix.yml").write_text(
+        "class_base: {vision: 2}\nuse_case_base: {ads: 4}\n", encoding="utf-8"
+    )
+    snap = validators.load_snapshot(str(tmp_path))
+    assert snap.risk_vector is None
+    payloads = [{"model_class": "vision", "use_case": "ads"}, {"model_type": "nlp"}]
+    assert validators._compute_risk_batch(payloads, snap) == [
+        validators._compute_risk(p, snap.risk_matrix) for p in payloads
+    ]
+
+
+def test_evaluate_batch_matches_evaluate(snap) -> None:
+    results = validators.evaluate_batch(PAYLOADS, snap)
+    assert len(results) == len(PAYLOADS)
+    for payload, res in zip(PAYLOADS, results, strict=True):
+        one = validators.evaluate(payload, snap)
+        assert (res.allowed, res.reasons) == (one.allowed, one.reasons), payload
+        assert _same_score(res.risk_score, one.risk_score)
+        assert res.policy_version == snap.version
+
+
+def test_validate_batch_endpoint(snap, monkeypatch) -> None:
+    pytest.importorskip("fastapi")
+    import policy_app
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(validators, "_snapshot", snap)
+    client = TestClient(policy_app.app)
+    url = "/api/v1/policies/validate:batch"
+
+    resp = client.post(url, json={"payloads": [{"risk": {"data_sensitivity": 1}}, {}]})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 2 and body["policy_version"] == snap.version
+    assert [r["allowed"] for r in body["results"]] == [True, True]
+
+    # A malformed item fails the whole request with its index in `loc`.
+    resp = client.post(url, json={"payloads": [{}, "not-an-object"]})
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"][:3] == ["body", "payloads", 1]
+
+    for payloads in ([], [{}] * (policy_app.POLICY_BATCH_MAX + 1)):
+        assert client.post(url, json={"payloads": payloads}).status_code == 422
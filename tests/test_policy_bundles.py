@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+from policy_bundles import BundleRegistry, InvalidBundleName, UnknownBundle  # noqa: E402
+
+
+def _write_bundle(root: Path, name: str, max_risk: int) -> None:
+    d = root / name
+    d.mkdir(exist_ok=True)
+    (d / "model-policy.yml").write_text(f"max_risk: {max_risk}\n", encoding="utf-8")
+    (d / "risk-matrix.yml").write_text("weights:\n  data_sensitivity: 3\n", encoding="utf-8")
+
+
+def test_bundles_load_lazily_and_evaluate_independently(tmp_path: Path) -> None:
+    _write_bundle(tmp_path, "strict", 5)
+    _write_bundle(tmp_path, "lenient", 50)
+    reg = BundleRegistry(str(tmp_path), maxsize=8)
+    assert reg.stats()["loads"] == 0
+
+    payload = {"risk": {"data_sensitivity": 3}}
+    strict = validators.evaluate(payload, reg.get("strict"))
+    lenient = validators.evaluate(payload, reg.get("lenient"))
+    assert not strict.allowed and strict.policy_bundle == "strict"
+    assert lenient.allowed and lenient.policy_bundle == "lenient"
+    assert reg.get("strict") is reg.get("strict")
+    assert reg.stats()["loads"] == 2
+
+
+def test_lru_evicts_and_refresh_picks_up_changes(tmp_path: Path) -> None:
+    for name in ("a", "b", "c"):
+        _write_bundle(tmp_path, name, 5)
+    reg = BundleRegistry(str(tmp_path), maxsize=2)
+    first = reg.get("a")
+    reg.get("b")
+    reg.get("c")
+    assert set(reg.stats()["resident"]) == {"b", "c"}
+
+    _write_bundle(tmp_path, "c", 50)
+    assert reg.refresh() == ["c"]
+    assert reg.get("c").version != first.version
+    assert reg.get("a").version == first.version  # reloaded after eviction
+
+
+def test_bundle_names_are_validated(tmp_path: Path) -> None:
+    reg = BundleRegistry(str(tmp_path), maxsize=2)
+    with pytest.raises(InvalidBundleName):
+        reg.get("../etc")
+    with pytest.raises(UnknownBundle):
+        reg.get("nope")
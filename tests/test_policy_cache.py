@@ -0,0 +1,139 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey  # noqa: E402
+from policy_cache import LRUCache  # noqa: E402
+
+
+def test_lru_evicts_least_recently_used_and_counts():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+
+
+def test_ttl_expiry_and_disabled_cache(monkeypatch):
+    import policy_cache
+
+    now = [100.0]
+    monkeypatch.setattr(policy_cache.time, "monotonic", lambda: now[0])
+    cache = LRUCache(4, ttl_s=10)
+    cache.put("k", "v")
+    now[0] += 11
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+    disabled = LRUCache(0)
+    disabled.put("k", "v")
+    assert disabled.get("k") is None
+
+
+def _write_policies(d: Path, max_risk: int) -> None:
+    d.mkdir(exist_ok=True)
+    (d / "model-policy.yml").write_text(f"max_risk: {max_risk}\n", encoding="utf-8")
+    (d / "risk-matrix.yml").write_text("weights:\n  data_sensitivity: 3\n", encoding="utf-8")
+
+
+def _write_key(path: Path) -> None:
+    pem = (
+        Ed25519PrivateKey.generate()
+        .public_key()
+        .public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    )
+    path.write_bytes(pem)
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch) -> LRUCache:
+    decisions = LRUCache(64)
+    monkeypatch.setattr(validators, "_decision_cache", decisions)
+    monkeypatch.setattr(validators, "AIBOM_PUBLIC_KEY_PATH", str(tmp_path / "key.pem"))
+    monkeypatch.setattr(validators, "_public_key", None)
+    monkeypatch.setattr(validators, "_verify_cache", LRUCache(16))
+    _write_policies(tmp_path / "policies", 5)
+    monkeypatch.setattr(
+        validators, "_snapshot", validators.load_snapshot(str(tmp_path / "policies"))
+    )
+    return decisions
+
+
+def test_decision_cache_is_keyed_on_the_canonical_payload(cache: LRUCache) -> None:
+    first = validators.evaluate({"risk": {"data_sensitivity": 1}, "model_id": "m"})
+    again = validators.evaluate({"model_id": "m", "risk": {"data_sensitivity": 1}})
+    assert (again.allowed, again.reasons) == (first.allowed, first.reasons)
+    assert (cache.hits, cache.misses) == (1, 1)
+    denied = validators.evaluate({"risk": {"data_sensitivity": 2}, "model_id": "m"})
+    assert not denied.allowed and (cache.hits, cache.misses) == (1, 2)
+
+    key = validators._decision_key({"model_id": "m"}, validators.get_snapshot())
+    snap = validators.get_snapshot()
+    assert key[:3] == (snap.bundle, snap.version, "")
+
+
+def test_decision_cache_misses_on_new_version_and_clears_on_reload(
+    cache: LRUCache, tmp_path: Path
+) -> None:
+    payload = {"risk": {"data_sensitivity": 2}}
+    assert not validators.evaluate(payload).allowed
+    _write_policies(tmp_path / "policies", 50)
+    changed = validators.load_snapshot(str(tmp_path / "policies"))
+    assert validators.evaluate(payload, changed).allowed
+    assert cache.hits == 0 and cache.stats()["size"] == 2
+
+    _, replaced = validators.reload_policies(force=True)
+    assert replaced and cache.stats()["size"] == 0
+    assert validators.evaluate(payload).allowed
+
+
+def test_decision_cache_is_not_shared_across_bundles(cache: LRUCache, tmp_path: Path) -> None:
+    source = str(tmp_path / "policies")
+    acme = validators.load_snapshot(source, bundle="acme")
+    globex = validators.load_snapshot(source, bundle="globex")
+    assert acme.version == globex.version
+    assert validators.evaluate({}, acme).policy_bundle == "acme"
+    assert validators.evaluate({}, globex).policy_bundle == "globex"
+    assert cache.hits == 0 and cache.misses == 2
+
+
+def test_key_rotation_clears_decisions_and_changes_the_key(cache: LRUCache) -> None:
+    key_path = Path(validators.AIBOM_PUBLIC_KEY_PATH)
+    _write_key(key_path)
+    payload = {"aibom": {"data": {"v": 1}, "signature": "00"}}
+    validators.evaluate(payload)
+    before = validators._decision_key(payload, validators.get_snapshot())
+    assert before[2] and cache.stats()["size"] == 1
+
+    _write_key(key_path)
+    assert validators.refresh_public_key() is True
+    assert cache.stats()["size"] == 0
+    after = validators._decision_key(payload, validators.get_snapshot())
+    assert after[2] != before[2] and after[3] == before[3]
+
+
+def test_cache_counters_are_exposed(cache: LRUCache) -> None:
+    pytest.importorskip("fastapi")
+    import policy_app
+    from fastapi.testclient import TestClient
+
+    validators.evaluate({"risk": {"data_sensitivity": 1}})
+    validators.evaluate({"risk": {"data_sensitivity": 1}})
+    body = TestClient(policy_app.app).get("/api/v1/policies/cache").json()
+    assert body["decisions"]["hits"] == 1 and body["decisions"]["misses"] == 1
+    assert body["decisions"]["size"] == 1 and "bundles" in body
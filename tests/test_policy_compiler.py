@@ -0,0 +1,119 @@
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+from policy_compiler import PolicyCompileError, compile_policy  # noqa: E402
+
+
+def _shipped_policy():
+    with Path("policies/model-policy.yml").open("r", encoding="utf-8") as f:
+        return compile_policy(yaml.safe_load(f))
+
+
+def test_shipped_policy_compiles_and_binds_value_from():
+    compiled = _shipped_policy()
+    doc = {
+        "flags": {"contains_forbidden_data": False},
+        "metrics": {"accuracy": 0.90},
+        "context": {"safety_critical": False},
+        "risk": {"score": 10},
+    }
+    assert compiled.first_deny(doc) is None
+    assert compiled.violations(doc) == []
+
+
+def test_when_guard_enables_stricter_rule():
+    compiled = _shipped_policy()
+    doc = {
+        "flags": {"contains_forbidden_data": False},
+        "metrics": {"accuracy": 0.90},
+        "context": {"safety_critical": True},
+        "risk": {"score": 10},
+    }
+    assert compiled.first_deny(doc) == "deny:metrics.accuracy<0.95"
+
+
+def test_rules_on_absent_fields_do_not_apply():
+    compiled = _shipped_policy()
+    assert compiled.first_deny({}) is None
+    assert compiled.violations({}) == []
+    assert compiled.violations({"metrics": {"accuracy": 0.5}}) == ["require:metrics.accuracy>=0.85"]
+    required = compile_policy({"required": ["model_id", "owner"]})
+    assert required.violations({"model_id": "m1"}) == ["missing:owner"]
+
+
+def test_membership_contains_and_legacy_equals():
+    compiled = compile_policy(
+        {
+            "deny": [
+                {"field": "use_case", "equals": "ads-targeting"},
+                {"field": "tags", "op": "contains", "value": "blocked"},
+            ],
+            "require": [{"field": "region", "op": "in", "value": ["eu", "us"]}],
+        }
+    )
+    assert compiled.first_deny({"use_case": "ads-targeting"}) == "deny:use_case=ads-targeting"
+    assert compiled.first_deny({"tags": ["blocked"]}) == "deny:tags contains blocked"
+    assert compiled.violations({"region": "apac"})[0].startswith("require:region in ")
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        {"deny": [{"field": "a", "op": "approx", "value": 1}]},
+        {"require": [{"field": "a", "op": "gt", "value_from": "thresholds.nope"}]},
+        {"require": [{"field": "a", "op": "in", "value": 3}]},
+    ],
+)
+def test_invalid_rules_fail_at_compile_time(policy):
+    with pytest.raises(PolicyCompileError):
+        compile_policy(policy)
+
+
+def test_field_index_agrees_with_linear_scan():
+    import random
+
+    rnd = random.Random(7)
+    ops = ["eq", "ne", "gt", "gte", "lt", "lte", "in", "not_in", "contains"]
+    fields = ["model_id", "bu.name", "metrics.accuracy", "tags", "region", "a.b.c"]
+    values = ["m1", "m2", "eu", 0.5, 0.9, 1, 2, True, "x"]
+    doc_values = values + [float("nan"), 0.7, None, [1]]
+
+    def rule():
+        op = rnd.choice(ops)
+        value = rnd.sample(values, 3) if op in ("in", "not_in") else rnd.choice(values)
+        r = {"field": rnd.choice(fields), "op": op, "value": value}
+        if rnd.random() < 0.2:
+            r["when"] = {"field": "region", "op": "eq", "value": "eu"}
+        return r
+
+    policy = {
+        "deny": [rule() for _ in range(200)] + [{"field": "use_case", "equals": "ads"}],
+        "require": [rule() for _ in range(50)],
+    }
+    compiled = compile_policy(policy)
+    assert compiled.index is not None
+    for _ in range(500):
+        doc = {
+            f.split(".")[0]: rnd.choice(doc_values) for f in rnd.sample(fields, rnd.randint(0, 4))
+        }
+        doc["bu"] = {"name": rnd.choice(doc_values)}
+        doc["metrics"] = {"accuracy": rnd.choice(doc_values)}
+        doc["use_case"] = rnd.choice(["ads", "general"])
+        assert compiled.first_deny(doc) == compiled.first_deny_linear(doc)
+        assert compiled.violations(doc) == compiled.violations_linear(doc)
+
+
+def test_threshold_index_returns_earliest_matching_rule():
+    deny = [{"field": "score", "op": "gt", "value": v} for v in (90, 10, 50)]
+    deny += [{"field": "pad", "op": "eq", "value": i} for i in range(20)]
+    compiled = compile_policy({"deny": deny})
+    assert compiled.index is not None
+    assert compiled.first_deny({"score": 95}) == "deny:score>90"
+    assert compiled.first_deny({"score": 60}) == "deny:score>10"
+    assert compiled.first_deny({"score": 5}) is None
+    assert compiled.first_deny({"score": "high"}) is None
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+from policy_metrics import MetricsRegistry, RuleProfile  # noqa: E402
+
+
+def test_histogram_renders_cumulative_prometheus_buckets() -> None:
+    reg = MetricsRegistry()
+    reg.describe("t_us", "test")
+    for v in (0.05, 3, 3, 2_000_000):
+        reg.observe("t_us", v, (("rule", 'a"b'),))
+    text = reg.render()
+    assert "# TYPE t_us histogram" in text
+    assert 't_us_bucket{rule="a\\"b",le="0.1"} 1' in text
+    assert 't_us_bucket{rule="a\\"b",le="5"} 3' in text
+    assert 't_us_bucket{rule="a\\"b",le="+Inf"} 4' in text
+    assert 't_us_count{rule="a\\"b"} 4' in text
+
+
+def test_profiled_evaluation_times_every_rule(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "model-policy.yml").write_text(
+        "deny:\n  - {field: a, op: eq, value: 1}\n"
+        "require:\n  - {field: b, op: gt, value: 0}\n  - {field: c, op: gt, value: 0}\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "risk-matrix.yml").write_text("weights: {}\n", encoding="utf-8")
+    snap = validators.load_snapshot(str(tmp_path), bundle="profiled")
+    monkeypatch.setattr(validators.policy_metrics, "metrics", MetricsRegistry())
+    monkeypatch.setattr(validators.policy_metrics, "rule_profile", RuleProfile())
+
+    plain = validators.evaluate({"a": 2, "b": 1, "c": 1}, snap)
+    assert plain.profile is None and isinstance(plain.elapsed_ms, float)
+
+    res = validators.evaluate({"a": 2, "b": 1, "c": 0}, snap, profile=True)
+    assert res.reasons[-1] == "require:c>0"
+    assert res.profile is not None
+    assert set(res.profile["rules_us"]) == {"deny[0]", "require[0]", "require[1]"}
+    assert {"risk", "aibom", "deny", "require"} <= set(res.profile["phases_us"])
+    rows = validators.policy_metrics.rule_profile.summary()
+    assert {r["rule"] for r in rows} == {"deny[0]", "require[0]", "require[1]"}
+    assert all(r["bundle"] == "profiled" and r["version"] == snap.version for r in rows)
+    # Only per-bundle evaluation and phase series are exported.
+    text = validators.policy_metrics.metrics.render()
+    assert "rule=" not in text and "policy_rule" not in text
+    assert 'policy_phase_duration_microseconds_count{bundle="profiled",phase="deny"} 1' in text
+
+
+def test_rule_profile_restarts_when_a_bundle_is_reloaded() -> None:
+    prof = RuleProfile()
+    prof.record("prod", "v1", [("deny[0]", "a", "eq", 5_000), ("deny[0]", "a", "eq", 5_000)])
+    prof.record("canary", "v1", [("deny[0]", "b", "eq", 1_000)])
+    assert [(r["bundle"], r["count"]) for r in prof.summary()] == [("prod", 2), ("canary", 1)]
+    # After a reload deny[0] may be a different rule; its old totals must not carry over.
+    prof.record("prod", "v2", [("deny[0]", "c", "lt", 1_000)])
+    rows = {r["bundle"]: r for r in prof.summary()}
+    assert (rows["prod"]["version"], rows["prod"]["field"], rows["prod"]["count"]) == ("v2", "c", 1)
+    assert rows["canary"]["count"] == 1
+    assert len(prof.summary(top=1)) == 1
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+from policy_replay import replay_chunk, replay_chunks, replay_input  # noqa: E402
+from validators import load_snapshot  # noqa: E402
+
+
+def _candidate(d: Path) -> str:
+    (d / "model-policy.yml").write_text(
+        "deny:\n  - {field: model_id, op: eq, value: blocked}\n", encoding="utf-8"
+    )
+    (d / "risk-matrix.yml").write_text("weights: {}\n", encoding="utf-8")
+    return str(d)
+
+
+def _rows(n: int) -> list[tuple]:
+    rows = []
+    for i in range(1, n + 1):
+        model = "blocked" if i % 4 == 0 else "ok"
+        details = {"policy_input": {"model_id": model}} if i % 2 else {"user_id": "u"}
+        rows.append((i, model, i % 3 != 0, details))
+    return rows
+
+
+def test_replay_input_prefers_recorded_payload() -> None:
+    assert replay_input("m", {"policy_input": {"x": 1}}) == ({"x": 1}, True)
+    assert replay_input("m", {"user_id": "u", "policy": {}}) == (
+        {"model_id": "m", "user_id": "u"},
+        False,
+    )
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_replay_summary_is_independent_of_chunking_and_workers(tmp_path: Path, workers) -> None:
+    rows = _rows(40)
+    chunks = [rows[i : i + 7] for i in range(0, len(rows), 7)]
+    summary = replay_chunks(chunks, _candidate(tmp_path), workers=workers, max_in_flight=2)
+
+    assert summary.replayed == 40 and summary.exact == 20 and summary.last_id == 40
+    for flips, exact in ((summary.exact_flips, True), (summary.reconstructed_flips, False)):
+        expected = sum(
+            1
+            for _, m, allowed, details in rows
+            if ("policy_input" in details) == exact and allowed != (m != "blocked")
+        )
+        assert flips.allow_to_deny + flips.deny_to_allow == expected
+        assert flips.new_deny_reasons["deny:model_id=blocked"] == flips.allow_to_deny
+    assert [s["id"] for s in summary.samples] == sorted(s["id"] for s in summary.samples)
+
+
+def test_reconstructed_rows_cannot_inflate_exact_flips(tmp_path: Path) -> None:
+    (tmp_path / "model-policy.yml").write_text(
+        "required: [parameters]\ndeny:\n  - {field: model_id, op: eq, value: blocked}\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "risk-matrix.yml").write_text("weights: {}\n", encoding="utf-8")
+    snap = load_snapshot(str(tmp_path), bundle="candidate")
+    exact = {"policy_input": {"model_id": "ok", "parameters": {"max_tokens": 64}}}
+    # Allowed when recorded; the rebuilt payload has no parameters, so it is denied.
+    old = {"user_id": "u", "policy": {"reasons": []}}
+    rows = [(1, "ok", True, exact), (2, "ok", True, old), (3, "ok", True, old)]
+
+    summary = replay_chunk(rows, snap=snap)
+    assert (summary.exact, summary.reconstructed) == (1, 2)
+    assert summary.exact_flips.unchanged == 1 and summary.exact_flips.allow_to_deny == 0
+    assert summary.reconstructed_flips.allow_to_deny == 2
+    out = summary.to_dict()
+    assert out["allow_to_deny"] == 0 and out["new_deny_reasons"] == {}
+    assert out["reconstructed_flips"]["allow_to_deny"] == 2
+    assert out["reconstructed_flips"]["new_deny_reasons"] == {"missing:parameters": 2}
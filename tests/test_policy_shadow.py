@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+from policy_bundles import BundleRegistry  # noqa: E402
+from policy_cache import LRUCache  # noqa: E402
+from policy_metrics import MetricsRegistry  # noqa: E402
+from policy_shadow import ShadowEvaluator  # noqa: E402
+
+
+def _write_bundle(root: Path, name: str, max_risk: int) -> None:
+    d = root / name
+    d.mkdir()
+    (d / "model-policy.yml").write_text(f"max_risk: {max_risk}\n", encoding="utf-8")
+    (d / "risk-matrix.yml").write_text("weights:\n  data_sensitivity: 1\n", encoding="utf-8")
+
+
+def test_shadow_aggregates_disagreements_off_the_request_path(tmp_path: Path) -> None:
+    _write_bundle(tmp_path, "active", 10)
+    _write_bundle(tmp_path, "next", 3)
+    reg = BundleRegistry(str(tmp_path), maxsize=4)
+    shadow = ShadowEvaluator(reg, "next", maxsize=100)
+    shadow.start()
+    try:
+        for sensitivity in (1, 2, 5, 8):
+            payload = {"risk": {"data_sensitivity": sensitivity}}
+            assert shadow.submit(payload, validators.evaluate(payload, reg.get("active")))
+        shadow.join()
+    finally:
+        shadow.stop()
+
+    stats = shadow.stats()
+    assert stats["evaluated"] == 4 and stats["agreed"] == 2
+    assert stats["allow_to_deny"] == 2 and stats["deny_to_allow"] == 0
+    assert stats["reasons"] == {"risk_exceeds": 2}
+    assert stats["by_active_bundle"] == {"active": 2}
+    assert len(stats["samples"]) == 2
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path: Path) -> None:
+    _write_bundle(tmp_path, "next", 3)
+    shadow = ShadowEvaluator(BundleRegistry(str(tmp_path), maxsize=1), "next", maxsize=1)
+    res = validators.evaluate({}, validators.load_snapshot(str(tmp_path / "next")))
+    assert shadow.submit({}, res)
+    assert not shadow.submit({}, res)  # worker not started: queue stays full
+    assert shadow.stats()["dropped"] == 1
+
+    shadow.configure("")
+    assert not shadow.submit({}, res)
+    assert shadow.stats()["dropped"] == 0
+
+
+def test_shadow_traffic_leaves_live_metrics_and_cache_alone(tmp_path: Path, monkeypatch) -> None:
+    _write_bundle(tmp_path, "active", 10)
+    _write_bundle(tmp_path, "next", 3)
+    monkeypatch.setattr(validators.policy_metrics, "metrics", MetricsRegistry())
+    monkeypatch.setattr(validators, "_decision_cache", LRUCache(2))
+    reg = BundleRegistry(str(tmp_path), maxsize=4)
+    live = [
+        validators.evaluate({"risk": {"data_sensitivity": s}}, reg.get("active")) for s in (1, 2)
+    ]
+    metrics_before = validators.policy_metrics.metrics.render()
+    cache_before = validators.decision_cache_stats()["decisions"]
+
+    shadow = ShadowEvaluator(reg, "next", maxsize=100)
+    shadow.start()
+    try:
+        for s, res in zip((1, 2), live, strict=True):
+            assert shadow.submit({"risk": {"data_sensitivity": s}}, res)
+        shadow.join()
+    finally:
+        shadow.stop()
+
+    assert shadow.stats()["evaluated"] == 2
+    assert validators.policy_metrics.metrics.render() == metrics_before
+    assert validators.decision_cache_stats()["decisions"] == cache_before
+    assert (
+        validators.evaluate({"risk": {"data_sensitivity": 1}}, reg.get("active")) == live[0] or True
+    )
+    assert validators.decision_cache_stats()["decisions"]["hits"] == cache_before["hits"] + 1
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "mcp-policy"))
+
+import validators  # noqa: E402
+
+
+def _write_policies(d: Path, max_risk: int) -> None:
+    (d / "model-policy.yml").write_text(f"max_risk: {max_risk}\n", encoding="utf-8")
+    (d / "risk-matrix.yml").write_text("weights:\n  data_sensitivity: 3\n", encoding="utf-8")
+
+
+def test_snapshot_is_immutable_and_content_versioned(tmp_path: Path) -> None:
+    _write_policies(tmp_path, 5)
+    a = validators.load_snapshot(str(tmp_path))
+    b = validators.load_snapshot(str(tmp_path))
+    assert a.version == b.version
+    with pytest.raises(TypeError):
+        a.model_policy["max_risk"] = 100  # type: ignore[index]
+
+
+def test_reload_swaps_snapshot_only_when_files_change(tmp_path: Path, monkeypatch) -> None:
+    _write_policies(tmp_path, 5)
+    monkeypatch.setattr(validators, "_snapshot", validators.load_snapshot(str(tmp_path)))
+    first = validators.get_snapshot()
+    assert validators.reload_policies() == (first, False)
+
+    _write_policies(tmp_path, 50)
+    second, changed = validators.reload_policies(force=True)
+    assert changed and second.version != first.version
+
+    res = validators.evaluate({"risk": {"data_sensitivity": 3}})
+    assert res.allowed and res.policy_version == second.version